@@ -0,0 +1,16 @@
+from __future__ import annotations
+
+from typing import Any
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without numpy installed
+    np = None
+
+HAS_NUMPY = np is not None
+
+
+def require_numpy() -> Any:
+    if np is None:
+        raise RuntimeError("NumPy is required for this backend; install numpy to enable it")
+    return np
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import multiprocessing
+from typing import Any, Callable, Iterable
+
+
+def _serve(connection: Any, factory: Callable[..., Any], args: tuple[Any, ...], quiet: frozenset[str]) -> None:
+    shard = factory(*args)
+    while True:
+        command, payload = connection.recv()
+        if command == "close":
+            connection.close()
+            return
+        reply = shard.handle(command, payload)
+        if command not in quiet:
+            connection.send(reply)
+
+
+class WorkerProcess:
+    # Keeps `factory(*args)` resident in a child process and forwards (command, payload) pairs to its
+    # handle(); commands in `quiet` are fire-and-forget and send no reply.
+    def __init__(self, factory: Callable[..., Any], *args: Any, quiet: Iterable[str] = ()) -> None:
+        self.connection, child = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(
+            target=_serve, args=(child, factory, args, frozenset(quiet)), daemon=True
+        )
+        self.process.start()
+        child.close()
+
+    def send(self, command: str, payload: Any = None) -> None:
+        self.connection.send((command, payload))
+
+    def receive(self) -> Any:
+        return self.connection.recv()
+
+    def close(self) -> None:
+        if self.process.is_alive():
+            self.send("close")
+            self.process.join()
+        self.connection.close()
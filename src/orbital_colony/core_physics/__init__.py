@@ -1,10 +1,32 @@
+from .barnes_hut import QuadTree, build_quadtree, compute_body_accelerations_barnes_hut
 from .engine import (
     PhysicsEngine,
     compute_body_accelerations,
     compute_gravity_at_point,
     compute_stability_index,
+    compute_total_energy,
 )
+from .ensemble import EnsembleResult, PhysicsEnsemble, perturb_states
+from .fields import (
+    FieldCache,
+    FieldGrid,
+    FieldSample,
+    compute_gravity_field,
+    compute_stability_field,
+    sample_fields,
+    sample_grid,
+)
+from .integrators import INTEGRATORS, ParticleSystem
+from .kepler import advance_pair, find_isolated_pairs, isolation_horizons, propagate_kepler
 from .models import CelestialBody, ColonyNode, PhysicsConfig, PhysicsState
+from .prediction import Trajectory, TrajectoryPredictor
+from .vectorized import (
+    HAS_NUMPY,
+    compute_body_accelerations_array,
+    compute_gravity_at_points_array,
+    compute_stability_at_points_array,
+    pack_bodies,
+)
 
 __all__ = [
     "CelestialBody",
@@ -15,4 +37,31 @@ __all__ = [
     "compute_body_accelerations",
     "compute_gravity_at_point",
     "compute_stability_index",
+    "compute_total_energy",
+    "EnsembleResult",
+    "PhysicsEnsemble",
+    "perturb_states",
+    "FieldCache",
+    "FieldGrid",
+    "FieldSample",
+    "compute_gravity_field",
+    "compute_stability_field",
+    "sample_fields",
+    "sample_grid",
+    "advance_pair",
+    "find_isolated_pairs",
+    "isolation_horizons",
+    "propagate_kepler",
+    "Trajectory",
+    "TrajectoryPredictor",
+    "INTEGRATORS",
+    "ParticleSystem",
+    "HAS_NUMPY",
+    "compute_body_accelerations_array",
+    "compute_gravity_at_points_array",
+    "compute_stability_at_points_array",
+    "pack_bodies",
+    "QuadTree",
+    "build_quadtree",
+    "compute_body_accelerations_barnes_hut",
 ]
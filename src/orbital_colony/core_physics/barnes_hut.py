@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+from math import sqrt
+
+from .models import CelestialBody, PhysicsConfig, Vector2
+
+_MAX_DEPTH = 48
+
+
+class QuadNode:
+    __slots__ = ("center", "half_size", "mass", "com", "children", "indices")
+
+    def __init__(self, center: Vector2, half_size: float) -> None:
+        self.center = center
+        self.half_size = half_size
+        self.mass = 0.0
+        self.com: Vector2 = center
+        self.children: list[QuadNode] = []
+        self.indices: list[int] = []
+
+    @property
+    def is_leaf(self) -> bool:
+        return not self.children
+
+
+class QuadTree:
+    def __init__(
+        self,
+        positions: list[Vector2],
+        masses: list[float],
+        leaf_capacity: int = 1,
+    ) -> None:
+        if len(positions) != len(masses):
+            raise ValueError("positions and masses must have the same length")
+        if leaf_capacity < 1:
+            raise ValueError("leaf_capacity must be at least 1")
+        self.positions = positions
+        self.masses = masses
+        self.leaf_capacity = leaf_capacity
+        self.node_count = 0
+        self.root = self._build_root()
+
+    def _build_root(self) -> QuadNode:
+        if not self.positions:
+            self.node_count = 1
+            return QuadNode((0.0, 0.0), 0.0)
+        xs = [p[0] for p in self.positions]
+        ys = [p[1] for p in self.positions]
+        min_x, max_x = min(xs), max(xs)
+        min_y, max_y = min(ys), max(ys)
+        half_size = max(max_x - min_x, max_y - min_y) * 0.5
+        half_size = half_size * (1.0 + 1e-9) + 1e-12
+        center = ((min_x + max_x) * 0.5, (min_y + max_y) * 0.5)
+        return self._build(list(range(len(self.positions))), center, half_size, 0)
+
+    def _build(self, indices: list[int], center: Vector2, half_size: float, depth: int) -> QuadNode:
+        node = QuadNode(center, half_size)
+        self.node_count += 1
+        positions = self.positions
+        masses = self.masses
+
+        if len(indices) <= self.leaf_capacity or depth >= _MAX_DEPTH:
+            node.indices = indices
+            mass = 0.0
+            mx = 0.0
+            my = 0.0
+            for index in indices:
+                m = masses[index]
+                mass += m
+                mx += m * positions[index][0]
+                my += m * positions[index][1]
+            node.mass = mass
+            if mass > 0.0:
+                node.com = (mx / mass, my / mass)
+            return node
+
+        cx, cy = center
+        quadrants: tuple[list[int], list[int], list[int], list[int]] = ([], [], [], [])
+        for index in indices:
+            px, py = positions[index]
+            quadrants[(px >= cx) + 2 * (py >= cy)].append(index)
+
+        quarter = half_size * 0.5
+        mass = 0.0
+        mx = 0.0
+        my = 0.0
+        for quadrant, members in enumerate(quadrants):
+            if not members:
+                continue
+            child_center = (
+                cx + (quarter if quadrant & 1 else -quarter),
+                cy + (quarter if quadrant & 2 else -quarter),
+            )
+            child = self._build(members, child_center, quarter, depth + 1)
+            node.children.append(child)
+            mass += child.mass
+            mx += child.mass * child.com[0]
+            my += child.mass * child.com[1]
+        node.mass = mass
+        if mass > 0.0:
+            node.com = (mx / mass, my / mass)
+        return node
+
+    def acceleration_at(
+        self,
+        point: Vector2,
+        config: PhysicsConfig,
+        exclude_index: int | None = None,
+    ) -> Vector2:
+        gm = config.gravitational_constant
+        softening_sq = config.softening * config.softening
+        theta_sq = config.opening_angle * config.opening_angle
+        positions = self.positions
+        masses = self.masses
+        px, py = point
+        ax = 0.0
+        ay = 0.0
+
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if node.mass == 0.0:
+                continue
+            if node.is_leaf:
+                for index in node.indices:
+                    if index == exclude_index:
+                        continue
+                    dx = positions[index][0] - px
+                    dy = positions[index][1] - py
+                    dist_sq = dx * dx + dy * dy + softening_sq
+                    inv_dist = 1.0 / sqrt(dist_sq)
+                    scale = gm * masses[index] * inv_dist * inv_dist * inv_dist
+                    ax += dx * scale
+                    ay += dy * scale
+                continue
+
+            half_size = node.half_size
+            contains_point = abs(px - node.center[0]) <= half_size and abs(py - node.center[1]) <= half_size
+            dx = node.com[0] - px
+            dy = node.com[1] - py
+            raw_dist_sq = dx * dx + dy * dy
+            width = 2.0 * half_size
+            if not contains_point and width * width < theta_sq * raw_dist_sq:
+                dist_sq = raw_dist_sq + softening_sq
+                inv_dist = 1.0 / sqrt(dist_sq)
+                scale = gm * node.mass * inv_dist * inv_dist * inv_dist
+                ax += dx * scale
+                ay += dy * scale
+            else:
+                stack.extend(node.children)
+        return (ax, ay)
+
+
+def build_quadtree(bodies: list[CelestialBody], leaf_capacity: int = 1) -> QuadTree:
+    return QuadTree(
+        [body.position for body in bodies],
+        [body.mass for body in bodies],
+        leaf_capacity=leaf_capacity,
+    )
+
+
+def compute_body_accelerations_barnes_hut(
+    bodies: list[CelestialBody],
+    config: PhysicsConfig,
+) -> list[Vector2]:
+    if config.opening_angle < 0.0:
+        raise ValueError("opening_angle must be non-negative")
+    tree = build_quadtree(bodies, config.quadtree_leaf_capacity)
+    return [tree.acceleration_at(body.position, config, exclude_index=index) for index, body in enumerate(bodies)]
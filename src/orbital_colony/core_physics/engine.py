@@ -1,9 +1,27 @@
 from __future__ import annotations
 
 from dataclasses import replace
-from math import sqrt
+from math import floor, sqrt
+from typing import Any, TypeVar
 
+from .barnes_hut import QuadTree, compute_body_accelerations_barnes_hut
+from .integrators import INTEGRATOR_ORDERS, INTEGRATORS, ParticleSystem, integrate
+from .kepler import isolation_horizons, split_pair
 from .models import CelestialBody, ColonyNode, PhysicsConfig, PhysicsState, Vector2
+from .vectorized import (
+    HAS_NUMPY,
+    compute_body_accelerations_array,
+    compute_gravity_at_points_array,
+    compute_stability_at_points_array,
+    pack_bodies,
+    require_numpy,
+    unpack_vectors,
+)
+
+_BACKENDS = ("auto", "python", "numpy")
+_GRAVITY_SOLVERS = ("direct", "barnes_hut")
+
+_Particle = TypeVar("_Particle", CelestialBody, ColonyNode)
 
 
 def _add(a: Vector2, b: Vector2) -> Vector2:
@@ -35,22 +53,23 @@ def _acceleration_from_source(
     return _scale(delta, accel_scale)
 
 
-def compute_body_accelerations(
-    bodies: list[CelestialBody],
+def _accelerations_from_positions(
+    positions: list[Vector2],
+    masses: list[float],
     config: PhysicsConfig,
 ) -> list[Vector2]:
     accelerations: list[Vector2] = []
-    for i, target in enumerate(bodies):
+    for i, target_position in enumerate(positions):
         total = (0.0, 0.0)
-        for j, source in enumerate(bodies):
+        for j, (source_mass, source_position) in enumerate(zip(masses, positions)):
             if i == j:
                 continue
             total = _add(
                 total,
                 _acceleration_from_source(
-                    source.mass,
-                    source.position,
-                    target.position,
+                    source_mass,
+                    source_position,
+                    target_position,
                     config,
                 ),
             )
@@ -58,70 +77,401 @@ def compute_body_accelerations(
     return accelerations
 
 
+def _gravity_at_points(
+    points: list[Vector2],
+    source_positions: list[Vector2],
+    source_masses: list[float],
+    config: PhysicsConfig,
+) -> list[Vector2]:
+    accelerations: list[Vector2] = []
+    for point in points:
+        total = (0.0, 0.0)
+        for source_mass, source_position in zip(source_masses, source_positions):
+            total = _add(
+                total,
+                _acceleration_from_source(
+                    source_mass,
+                    source_position,
+                    point,
+                    config,
+                ),
+            )
+        accelerations.append(total)
+    return accelerations
+
+
+def compute_body_accelerations(
+    bodies: list[CelestialBody],
+    config: PhysicsConfig,
+) -> list[Vector2]:
+    return _accelerations_from_positions(
+        [body.position for body in bodies],
+        [body.mass for body in bodies],
+        config,
+    )
+
+
 def compute_gravity_at_point(
     point: Vector2,
     bodies: list[CelestialBody],
     config: PhysicsConfig,
 ) -> Vector2:
-    total = (0.0, 0.0)
-    for body in bodies:
-        total = _add(
-            total,
-            _acceleration_from_source(
-                body.mass,
-                body.position,
-                point,
-                config,
-            ),
-        )
-    return total
+    return _gravity_at_points(
+        [point],
+        [body.position for body in bodies],
+        [body.mass for body in bodies],
+        config,
+    )[0]
 
 
-def compute_stability_index(
-    colony: ColonyNode,
+def compute_total_energy(
     bodies: list[CelestialBody],
     config: PhysicsConfig,
+) -> float:
+    kinetic = sum(0.5 * body.mass * (body.velocity[0] ** 2 + body.velocity[1] ** 2) for body in bodies)
+    potential = 0.0
+    softening_sq = config.softening * config.softening
+    for i, first in enumerate(bodies):
+        for second in bodies[i + 1 :]:
+            delta = _sub(first.position, second.position)
+            dist = sqrt(delta[0] * delta[0] + delta[1] * delta[1] + softening_sq)
+            potential -= config.gravitational_constant * first.mass * second.mass / dist
+    return kinetic + potential
+
+
+def _stability_at_point(
+    point: Vector2,
+    anchor: Vector2,
+    source_positions: list[Vector2],
+    source_masses: list[float],
+    config: PhysicsConfig,
 ) -> float:
     tidal_stress = 0.0
-    for body in bodies:
-        offset = _sub(body.position, colony.position)
+    for source_mass, source_position in zip(source_masses, source_positions):
+        offset = _sub(source_position, point)
         dist_sq = offset[0] * offset[0] + offset[1] * offset[1] + config.softening * config.softening
         dist = sqrt(dist_sq)
-        tidal_stress += config.gravitational_constant * body.mass / (dist_sq * dist)
+        tidal_stress += config.gravitational_constant * source_mass / (dist_sq * dist)
 
-    drift = _norm(_sub(colony.position, colony.anchor_position))
+    drift = _norm(_sub(point, anchor))
     penalty = config.tidal_scale * tidal_stress + config.drift_scale * drift
     normalized_penalty = min(max(penalty / config.max_penalty, 0.0), 1.0)
     return 1.0 - normalized_penalty
 
 
+def compute_stability_index(
+    colony: ColonyNode,
+    bodies: list[CelestialBody],
+    config: PhysicsConfig,
+) -> float:
+    return _stability_at_point(
+        colony.position,
+        colony.anchor_position,
+        [body.position for body in bodies],
+        [body.mass for body in bodies],
+        config,
+    )
+
+
 class PhysicsEngine:
     def __init__(self, config: PhysicsConfig | None = None) -> None:
         self.config = config or PhysicsConfig()
+        if self.config.backend not in _BACKENDS:
+            raise ValueError(f"Unknown physics backend: {self.config.backend}")
+        if self.config.gravity_solver not in _GRAVITY_SOLVERS:
+            raise ValueError(f"Unknown gravity solver: {self.config.gravity_solver}")
+        if self.config.opening_angle < 0.0:
+            raise ValueError("opening_angle must be non-negative")
+        if self.config.integrator not in INTEGRATORS:
+            raise ValueError(f"Unknown integrator: {self.config.integrator}")
+        if self.config.adaptive_base_integrator not in INTEGRATOR_ORDERS:
+            raise ValueError(f"Unknown adaptive base integrator: {self.config.adaptive_base_integrator}")
+        if self.config.adaptive_tolerance <= 0.0:
+            raise ValueError("adaptive_tolerance must be positive")
+        if self.config.max_substeps < 1:
+            raise ValueError("max_substeps must be at least 1")
+        if self.config.backend == "numpy":
+            require_numpy()
+
+    def uses_numpy(self, body_count: int, tracer_count: int = 0) -> bool:
+        if self.config.gravity_solver != "direct":
+            return False
+        if self.config.backend == "numpy":
+            return True
+        if self.config.backend == "python" or not HAS_NUMPY:
+            return False
+        return body_count + tracer_count >= self.config.numpy_min_bodies
+
+    def compute_body_accelerations(self, bodies: list[CelestialBody]) -> list[Vector2]:
+        if self.config.gravity_solver == "barnes_hut":
+            return compute_body_accelerations_barnes_hut(bodies, self.config)
+        if self.uses_numpy(len(bodies)):
+            positions, _, masses = pack_bodies(bodies)
+            return unpack_vectors(compute_body_accelerations_array(positions, masses, self.config))
+        return compute_body_accelerations(bodies, self.config)
+
+    def build_system(self, bodies: list[CelestialBody], colonies: list[ColonyNode]) -> ParticleSystem:
+        config = self.config
+        if self.uses_numpy(len(bodies), len(colonies)):
+            positions, velocities, masses = pack_bodies(bodies)
+            tracer_positions, tracer_velocities, _ = pack_bodies(colonies)
+            return ParticleSystem(
+                body_positions=positions,
+                body_velocities=velocities,
+                tracer_positions=tracer_positions,
+                tracer_velocities=tracer_velocities,
+                body_masses=masses,
+                body_accelerations=lambda xs: compute_body_accelerations_array(xs, masses, config),
+                tracer_accelerations=lambda ps, xs: compute_gravity_at_points_array(ps, xs, masses, config),
+            )
+
+        mass_list = [body.mass for body in bodies]
+        if config.gravity_solver == "barnes_hut":
+
+            def body_accelerations(xs: list[Vector2]) -> list[Vector2]:
+                tree = QuadTree(xs, mass_list, config.quadtree_leaf_capacity)
+                return [tree.acceleration_at(x, config, exclude_index=index) for index, x in enumerate(xs)]
+
+            def tracer_accelerations(ps: list[Vector2], xs: list[Vector2]) -> list[Vector2]:
+                if not ps:
+                    return []
+                tree = QuadTree(xs, mass_list, config.quadtree_leaf_capacity)
+                return [tree.acceleration_at(p, config) for p in ps]
+
+        else:
+
+            def body_accelerations(xs: list[Vector2]) -> list[Vector2]:
+                return _accelerations_from_positions(xs, mass_list, config)
+
+            def tracer_accelerations(ps: list[Vector2], xs: list[Vector2]) -> list[Vector2]:
+                return _gravity_at_points(ps, xs, mass_list, config)
+
+        return ParticleSystem(
+            body_positions=[body.position for body in bodies],
+            body_velocities=[body.velocity for body in bodies],
+            tracer_positions=[colony.position for colony in colonies],
+            tracer_velocities=[colony.velocity for colony in colonies],
+            body_masses=mass_list,
+            body_accelerations=body_accelerations,
+            tracer_accelerations=tracer_accelerations,
+        )
 
     def step(self, state: PhysicsState, dt_seconds: float) -> PhysicsState:
+        if self.config.kepler_fast_path:
+            return self.fast_forward(state, dt_seconds, dt_seconds)
+        return self._step_numerical(state, dt_seconds)
+
+    def _step_numerical(self, state: PhysicsState, dt_seconds: float) -> PhysicsState:
+        system, substeps = self._integrate(state, dt_seconds)
+
+        next_bodies = _rebuild(state.bodies, system.body_positions, system.body_velocities)
+        next_colonies = _rebuild(state.colonies, system.tracer_positions, system.tracer_velocities)
+        colony_stability = self._colony_stability(system, next_colonies)
+
+        return PhysicsState(
+            bodies=next_bodies,
+            colony=next_colonies[0] if next_colonies else None,
+            time_seconds=state.time_seconds + dt_seconds,
+            stability_index=colony_stability[0] if colony_stability else state.stability_index,
+            substeps=substeps,
+            colonies=next_colonies,
+            colony_stability=colony_stability,
+        )
+
+    def step_in_place(self, state: PhysicsState, dt_seconds: float) -> PhysicsState:
+        if self.config.kepler_fast_path:
+            return _assign_state(state, self.fast_forward(state, dt_seconds, dt_seconds))
+
+        system, substeps = self._integrate(state, dt_seconds)
+
+        _write_back(state.bodies, system.body_positions, system.body_velocities)
+        _write_back(state.colonies, system.tracer_positions, system.tracer_velocities)
+        state.colony_stability[:] = self._colony_stability(system, state.colonies)
+        if state.colony_stability:
+            state.stability_index = state.colony_stability[0]
+        state.time_seconds += dt_seconds
+        state.substeps = substeps
+        return state
+
+    def fast_forward(
+        self,
+        state: PhysicsState,
+        span_seconds: float,
+        dt_seconds: float | None = None,
+    ) -> PhysicsState:
+        if span_seconds <= 0:
+            raise ValueError("span_seconds must be positive")
+        dt_seconds = span_seconds if dt_seconds is None else dt_seconds
         if dt_seconds <= 0:
             raise ValueError("dt_seconds must be positive")
 
-        next_bodies = [replace(body) for body in state.bodies]
-        body_accels = compute_body_accelerations(next_bodies, self.config)
-        for body, accel in zip(next_bodies, body_accels):
-            body.velocity = _add(body.velocity, _scale(accel, dt_seconds))
-            body.position = _add(body.position, _scale(body.velocity, dt_seconds))
-
-        next_colony = None
-        if state.colony is not None:
-            next_colony = replace(state.colony)
-            colony_accel = compute_gravity_at_point(next_colony.position, next_bodies, self.config)
-            next_colony.velocity = _add(next_colony.velocity, _scale(colony_accel, dt_seconds))
-            next_colony.position = _add(next_colony.position, _scale(next_colony.velocity, dt_seconds))
-            stability_index = compute_stability_index(next_colony, next_bodies, self.config)
+        result = state
+        substeps = 0
+        remaining = span_seconds
+        while remaining > 1e-12 * span_seconds:
+            pairs: list[tuple[int, int]] = []
+            span = remaining
+            if self.config.kepler_fast_path:
+                # Pairs are only propagated analytically for as long as no other body or colony can close in on
+                # them at its current velocity; the pairs are then re-detected, so a perturber approaching
+                # mid-span ends the analytic stretch instead of being ignored.
+                horizons = {
+                    pair: horizon
+                    for pair, horizon in isolation_horizons(result.bodies, self.config, result.colonies).items()
+                    if horizon >= dt_seconds
+                }
+                pairs = list(horizons)
+                if pairs and min(horizons.values()) < remaining:
+                    span = dt_seconds * floor(min(horizons.values()) / dt_seconds)
+            result = self._fast_forward_pairs(result, pairs, span, dt_seconds)
+            substeps += result.substeps
+            remaining -= span
+        result.substeps = substeps
+        return result
+
+    def _fast_forward_pairs(
+        self,
+        state: PhysicsState,
+        pairs: list[tuple[int, int]],
+        span_seconds: float,
+        dt_seconds: float,
+    ) -> PhysicsState:
+        paired = {index for pair in pairs for index in pair}
+        singles = [index for index in range(len(state.bodies)) if index not in paired]
+        reduced = replace(
+            state,
+            bodies=[state.bodies[index] for index in singles]
+            + [_barycenter(state.bodies[i], state.bodies[j]) for i, j in pairs],
+            colony=None,
+            colonies=list(state.colonies),
+            colony_stability=list(state.colony_stability),
+        )
+
+        substeps = 0
+        if len(reduced.bodies) <= 1 and not reduced.colonies:
+            reduced.bodies = [
+                replace(
+                    body,
+                    position=_add(body.position, _scale(body.velocity, span_seconds)),
+                )
+                for body in reduced.bodies
+            ]
         else:
-            stability_index = state.stability_index
+            remaining = span_seconds
+            while remaining > 1e-12 * span_seconds:
+                h = min(dt_seconds, remaining)
+                reduced = self._step_numerical(reduced, h)
+                substeps += reduced.substeps
+                remaining -= h
+
+        bodies = list(state.bodies)
+        for reduced_index, index in enumerate(singles):
+            bodies[index] = reduced.bodies[reduced_index]
+        for pair_index, (i, j) in enumerate(pairs):
+            barycenter = reduced.bodies[len(singles) + pair_index]
+            bodies[i], bodies[j] = split_pair(
+                state.bodies[i],
+                state.bodies[j],
+                barycenter.position,
+                barycenter.velocity,
+                span_seconds,
+                self.config,
+            )
 
+        colonies = reduced.colonies
+        colony_stability = self.compute_colony_stability(colonies, bodies)
         return PhysicsState(
-            bodies=next_bodies,
-            colony=next_colony,
-            time_seconds=state.time_seconds + dt_seconds,
-            stability_index=stability_index,
+            bodies=bodies,
+            colony=colonies[0] if colonies else None,
+            time_seconds=state.time_seconds + span_seconds,
+            stability_index=colony_stability[0] if colony_stability else state.stability_index,
+            substeps=substeps,
+            colonies=colonies,
+            colony_stability=colony_stability,
         )
+
+    def _integrate(self, state: PhysicsState, dt_seconds: float) -> tuple[ParticleSystem, int]:
+        if dt_seconds <= 0:
+            raise ValueError("dt_seconds must be positive")
+        system = self.build_system(state.bodies, state.colonies)
+        substeps = integrate(system, dt_seconds, self.config, max(1, state.substeps // 2))
+        return system, substeps
+
+    def compute_colony_stability(
+        self,
+        colonies: list[ColonyNode],
+        bodies: list[CelestialBody],
+    ) -> list[float]:
+        return self._colony_stability(self.build_system(bodies, colonies), colonies)
+
+    def _colony_stability(self, system: ParticleSystem, colonies: list[ColonyNode]) -> list[float]:
+        if not colonies:
+            return []
+        if isinstance(system.tracer_positions, list):
+            return [
+                _stability_at_point(
+                    position,
+                    colony.anchor_position,
+                    system.body_positions,
+                    system.body_masses,
+                    self.config,
+                )
+                for position, colony in zip(system.tracer_positions, colonies)
+            ]
+        anchors = [colony.anchor_position for colony in colonies]
+        return compute_stability_at_points_array(
+            system.tracer_positions,
+            system.body_positions,
+            system.body_masses,
+            self.config,
+            anchors,
+        ).tolist()
+
+
+def _rebuild(items: list[_Particle], positions: Any, velocities: Any) -> list[_Particle]:
+    if not isinstance(positions, list):
+        positions = unpack_vectors(positions)
+        velocities = unpack_vectors(velocities)
+    return [
+        replace(item, position=position, velocity=velocity)
+        for item, position, velocity in zip(items, positions, velocities)
+    ]
+
+
+def _write_back(items: list[_Particle], positions: Any, velocities: Any) -> None:
+    if not isinstance(positions, list):
+        positions = unpack_vectors(positions)
+        velocities = unpack_vectors(velocities)
+    for item, position, velocity in zip(items, positions, velocities):
+        item.position = position
+        item.velocity = velocity
+
+
+def _barycenter(first: CelestialBody, second: CelestialBody) -> CelestialBody:
+    total_mass = first.mass + second.mass
+    return CelestialBody(
+        name=f"{first.name}+{second.name}",
+        mass=total_mass,
+        position=(
+            (first.mass * first.position[0] + second.mass * second.position[0]) / total_mass,
+            (first.mass * first.position[1] + second.mass * second.position[1]) / total_mass,
+        ),
+        velocity=(
+            (first.mass * first.velocity[0] + second.mass * second.velocity[0]) / total_mass,
+            (first.mass * first.velocity[1] + second.mass * second.velocity[1]) / total_mass,
+        ),
+    )
+
+
+def _assign_state(target: PhysicsState, source: PhysicsState) -> PhysicsState:
+    for item, updated in zip(target.bodies, source.bodies):
+        item.position = updated.position
+        item.velocity = updated.velocity
+    for item, updated in zip(target.colonies, source.colonies):
+        item.position = updated.position
+        item.velocity = updated.velocity
+    target.colony_stability[:] = source.colony_stability
+    target.stability_index = source.stability_index
+    target.time_seconds = source.time_seconds
+    target.substeps = source.substeps
+    return target
@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass, replace
+from typing import Any
+
+from .integrators import INTEGRATOR_ORDERS, INTEGRATORS, ParticleSystem, integrate
+from .models import PhysicsConfig, PhysicsState
+from .vectorized import (
+    compute_batched_gravity_array,
+    compute_batched_stability_array,
+    require_numpy,
+    unpack_vectors,
+)
+
+
+@dataclass
+class EnsembleResult:
+    states: list[PhysicsState]
+    stability_traces: Any
+    substeps: list[int]
+
+    @property
+    def primary_stability_traces(self) -> Any:
+        return self.stability_traces[:, :, 0]
+
+
+def perturb_states(
+    base: PhysicsState,
+    count: int,
+    position_sigma: float = 0.0,
+    velocity_sigma: float = 0.0,
+    seed: int = 0,
+) -> list[PhysicsState]:
+    if count <= 0:
+        raise ValueError("count must be positive")
+    rng = random.Random(seed)
+
+    def jitter(vector: tuple[float, float], sigma: float) -> tuple[float, float]:
+        if sigma <= 0.0:
+            return vector
+        return (vector[0] + rng.gauss(0.0, sigma), vector[1] + rng.gauss(0.0, sigma))
+
+    states: list[PhysicsState] = []
+    for _ in range(count):
+        bodies = [
+            replace(
+                body,
+                position=jitter(body.position, position_sigma),
+                velocity=jitter(body.velocity, velocity_sigma),
+            )
+            for body in base.bodies
+        ]
+        states.append(
+            replace(
+                base,
+                bodies=bodies,
+                colony=None,
+                colonies=[replace(colony) for colony in base.colonies],
+                colony_stability=list(base.colony_stability),
+            )
+        )
+    return states
+
+
+class PhysicsEnsemble:
+    def __init__(self, states: list[PhysicsState], config: PhysicsConfig | None = None) -> None:
+        numpy = require_numpy()
+        self.config = config or PhysicsConfig()
+        if not states:
+            raise ValueError("an ensemble needs at least one scenario")
+        if self.config.gravity_solver != "direct":
+            raise ValueError("ensembles only support the direct gravity solver")
+        if self.config.integrator not in INTEGRATORS:
+            raise ValueError(f"Unknown integrator: {self.config.integrator}")
+        if self.config.adaptive_base_integrator not in INTEGRATOR_ORDERS:
+            raise ValueError(f"Unknown adaptive base integrator: {self.config.adaptive_base_integrator}")
+
+        body_count = len(states[0].bodies)
+        colony_count = len(states[0].colonies)
+        for state in states:
+            if len(state.bodies) != body_count or len(state.colonies) != colony_count:
+                raise ValueError("all scenarios must have the same body and colony counts")
+
+        self.templates = states
+        self.time_seconds = numpy.array([state.time_seconds for state in states], dtype=float)
+        self.masses = numpy.array(
+            [[body.mass for body in state.bodies] for state in states],
+            dtype=float,
+        ).reshape(len(states), body_count)
+        self.positions = self._stack([[body.position for body in state.bodies] for state in states], body_count)
+        self.velocities = self._stack([[body.velocity for body in state.bodies] for state in states], body_count)
+        self.colony_positions = self._stack(
+            [[colony.position for colony in state.colonies] for state in states],
+            colony_count,
+        )
+        self.colony_velocities = self._stack(
+            [[colony.velocity for colony in state.colonies] for state in states],
+            colony_count,
+        )
+        self.anchors = self._stack(
+            [[colony.anchor_position for colony in state.colonies] for state in states],
+            colony_count,
+        )
+        self.substeps = [state.substeps for state in states]
+        self.stability = numpy.array(
+            [
+                state.colony_stability if len(state.colony_stability) == colony_count else [1.0] * colony_count
+                for state in states
+            ],
+            dtype=float,
+        ).reshape(len(states), colony_count)
+
+    @property
+    def size(self) -> int:
+        return len(self.templates)
+
+    def _stack(self, vectors: list[list[tuple[float, float]]], count: int) -> Any:
+        numpy = require_numpy()
+        return numpy.array(vectors, dtype=float).reshape(len(vectors), count, 2)
+
+    def _system(self) -> ParticleSystem:
+        masses = self.masses
+        config = self.config
+        return ParticleSystem(
+            body_positions=self.positions,
+            body_velocities=self.velocities,
+            tracer_positions=self.colony_positions,
+            tracer_velocities=self.colony_velocities,
+            body_masses=masses,
+            body_accelerations=lambda xs: compute_batched_gravity_array(xs, xs, masses, config, exclude_self=True),
+            tracer_accelerations=lambda ps, xs: compute_batched_gravity_array(ps, xs, masses, config),
+        )
+
+    def step(self, dt_seconds: float) -> Any:
+        if dt_seconds <= 0:
+            raise ValueError("dt_seconds must be positive")
+        system = self._system()
+        substeps = integrate(system, dt_seconds, self.config, max(1, max(self.substeps) // 2))
+        self.positions = system.body_positions
+        self.velocities = system.body_velocities
+        self.colony_positions = system.tracer_positions
+        self.colony_velocities = system.tracer_velocities
+        self.substeps = [substeps] * self.size
+        self.time_seconds = self.time_seconds + dt_seconds
+        self.stability = compute_batched_stability_array(
+            self.colony_positions,
+            self.positions,
+            self.masses,
+            self.config,
+            self.anchors,
+        )
+        return self.stability
+
+    def run(self, dt_seconds: float, steps: int) -> EnsembleResult:
+        numpy = require_numpy()
+        if steps <= 0:
+            raise ValueError("steps must be positive")
+        traces = numpy.empty((self.size, steps, self.anchors.shape[1]))
+        substeps: list[int] = []
+        for index in range(steps):
+            traces[:, index, :] = self.step(dt_seconds)
+            substeps.append(self.substeps[0])
+        return EnsembleResult(states=self.to_states(), stability_traces=traces, substeps=substeps)
+
+    def to_states(self) -> list[PhysicsState]:
+        states: list[PhysicsState] = []
+        for index, template in enumerate(self.templates):
+            bodies = [
+                replace(body, position=position, velocity=velocity)
+                for body, position, velocity in zip(
+                    template.bodies,
+                    unpack_vectors(self.positions[index]),
+                    unpack_vectors(self.velocities[index]),
+                )
+            ]
+            colonies = [
+                replace(colony, position=position, velocity=velocity)
+                for colony, position, velocity in zip(
+                    template.colonies,
+                    unpack_vectors(self.colony_positions[index]),
+                    unpack_vectors(self.colony_velocities[index]),
+                )
+            ]
+            colony_stability = self.stability[index].tolist()
+            states.append(
+                PhysicsState(
+                    bodies=bodies,
+                    colony=colonies[0] if colonies else None,
+                    time_seconds=float(self.time_seconds[index]),
+                    stability_index=colony_stability[0] if colony_stability else template.stability_index,
+                    substeps=self.substeps[index],
+                    colonies=colonies,
+                    colony_stability=colony_stability,
+                )
+            )
+        return states
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from math import floor
+from typing import Any, Callable, Hashable
+
+from orbital_colony._numeric import np
+
+from .engine import _gravity_at_points, _stability_at_point
+from .models import CelestialBody, PhysicsConfig, PhysicsState, Vector2
+from .vectorized import (
+    HAS_NUMPY,
+    compute_gravity_at_points_array,
+    compute_stability_at_points_array,
+    pack_bodies,
+)
+
+
+@dataclass(frozen=True)
+class FieldGrid:
+    origin: Vector2
+    spacing: float
+    columns: int
+    rows: int
+
+    def __post_init__(self) -> None:
+        if self.spacing <= 0.0:
+            raise ValueError("spacing must be positive")
+        if self.columns <= 0 or self.rows <= 0:
+            raise ValueError("columns and rows must be positive")
+
+    def points(self) -> Any:
+        if HAS_NUMPY:
+            xs = self.origin[0] + self.spacing * np.arange(self.columns)
+            ys = self.origin[1] + self.spacing * np.arange(self.rows)
+            grid_x, grid_y = np.meshgrid(xs, ys)
+            return np.column_stack((grid_x.ravel(), grid_y.ravel()))
+        return [
+            (self.origin[0] + self.spacing * column, self.origin[1] + self.spacing * row)
+            for row in range(self.rows)
+            for column in range(self.columns)
+        ]
+
+
+@dataclass(frozen=True)
+class FieldSample:
+    points: Any
+    gravity: Any
+    stability: Any
+    grid: FieldGrid | None = None
+
+
+def compute_gravity_field(points: Any, bodies: list[CelestialBody], config: PhysicsConfig) -> Any:
+    if HAS_NUMPY:
+        positions, _, masses = pack_bodies(bodies)
+        return compute_gravity_at_points_array(points, positions, masses, config)
+    return _gravity_at_points(
+        list(points),
+        [body.position for body in bodies],
+        [body.mass for body in bodies],
+        config,
+    )
+
+
+def compute_stability_field(
+    points: Any,
+    bodies: list[CelestialBody],
+    config: PhysicsConfig,
+    anchors: Any = None,
+) -> Any:
+    if HAS_NUMPY:
+        positions, _, masses = pack_bodies(bodies)
+        return compute_stability_at_points_array(points, positions, masses, config, anchors)
+    positions = [body.position for body in bodies]
+    masses = [body.mass for body in bodies]
+    points = list(points)
+    anchors = points if anchors is None else list(anchors)
+    return [
+        _stability_at_point(point, anchor, positions, masses, config)
+        for point, anchor in zip(points, anchors)
+    ]
+
+
+def sample_fields(
+    points: Any,
+    bodies: list[CelestialBody],
+    config: PhysicsConfig,
+    grid: FieldGrid | None = None,
+) -> FieldSample:
+    if HAS_NUMPY:
+        points = np.array(points, dtype=float).reshape(-1, 2)
+        positions, _, masses = pack_bodies(bodies)
+        gravity = compute_gravity_at_points_array(points, positions, masses, config)
+        stability = compute_stability_at_points_array(points, positions, masses, config)
+        for array in (points, gravity, stability):
+            array.flags.writeable = False
+        return FieldSample(points=points, gravity=gravity, stability=stability, grid=grid)
+
+    points = [tuple(point) for point in points]
+    return FieldSample(
+        points=tuple(points),
+        gravity=tuple(compute_gravity_field(points, bodies, config)),
+        stability=tuple(compute_stability_field(points, bodies, config)),
+        grid=grid,
+    )
+
+
+def sample_grid(grid: FieldGrid, bodies: list[CelestialBody], config: PhysicsConfig) -> FieldSample:
+    return sample_fields(grid.points(), bodies, config, grid=grid)
+
+
+class FieldCache:
+    def __init__(
+        self,
+        config: PhysicsConfig | None = None,
+        max_entries: int = 32,
+        time_quantum: float | None = None,
+    ) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        if time_quantum is not None and time_quantum <= 0.0:
+            raise ValueError("time_quantum must be positive")
+        self.config = config or PhysicsConfig()
+        self.max_entries = max_entries
+        self.time_quantum = time_quantum
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, FieldSample] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def body_signature(self, bodies: list[CelestialBody]) -> tuple[tuple[float, float, float], ...]:
+        return tuple((body.mass, body.position[0], body.position[1]) for body in bodies)
+
+    def time_bucket(self, time_seconds: float) -> int | None:
+        if self.time_quantum is None:
+            return None
+        return floor(time_seconds / self.time_quantum)
+
+    def sample_grid(self, grid: FieldGrid, state: PhysicsState) -> FieldSample:
+        key = ("grid", grid, self.body_signature(state.bodies), self.time_bucket(state.time_seconds))
+        return self._lookup(key, lambda: sample_grid(grid, state.bodies, self.config))
+
+    def sample_points(self, points: Any, state: PhysicsState) -> FieldSample:
+        if HAS_NUMPY:
+            points = np.asarray(points, dtype=float).reshape(-1, 2)
+            point_key: Hashable = (points.shape, points.tobytes())
+        else:
+            points = [tuple(point) for point in points]
+            point_key = tuple(points)
+        key = ("points", point_key, self.body_signature(state.bodies), self.time_bucket(state.time_seconds))
+        return self._lookup(key, lambda: sample_fields(points, state.bodies, self.config))
+
+    def _lookup(self, key: Hashable, compute: Callable[[], FieldSample]) -> FieldSample:
+        sample = self._entries.get(key)
+        if sample is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return sample
+
+        self.misses += 1
+        sample = compute()
+        self._entries[key] = sample
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return sample
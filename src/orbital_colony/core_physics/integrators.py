@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from .models import PhysicsConfig
+
+_YOSHIDA_W1 = 1.0 / (2.0 - 2.0 ** (1.0 / 3.0))
+_YOSHIDA_W0 = -(2.0 ** (1.0 / 3.0)) * _YOSHIDA_W1
+_YOSHIDA_DRIFTS = (
+    _YOSHIDA_W1 / 2.0,
+    (_YOSHIDA_W0 + _YOSHIDA_W1) / 2.0,
+    (_YOSHIDA_W0 + _YOSHIDA_W1) / 2.0,
+    _YOSHIDA_W1 / 2.0,
+)
+_YOSHIDA_KICKS = (_YOSHIDA_W1, _YOSHIDA_W0, _YOSHIDA_W1)
+
+INTEGRATOR_ORDERS = {
+    "euler": 1,
+    "leapfrog": 2,
+    "yoshida4": 4,
+    "rk4": 4,
+}
+INTEGRATORS = (*INTEGRATOR_ORDERS, "adaptive")
+
+
+@dataclass
+class ParticleSystem:
+    body_positions: Any
+    body_velocities: Any
+    tracer_positions: Any
+    tracer_velocities: Any
+    body_masses: Any
+    body_accelerations: Callable[[Any], Any]
+    tracer_accelerations: Callable[[Any, Any], Any]
+    force_evaluations: int = 0
+
+    def accelerations(self, body_positions: Any, tracer_positions: Any) -> tuple[Any, Any]:
+        self.force_evaluations += 1
+        return (
+            self.body_accelerations(body_positions),
+            self.tracer_accelerations(tracer_positions, body_positions),
+        )
+
+
+def _axpy(y: Any, x: Any, a: float) -> Any:
+    if isinstance(y, list):
+        return [(yi[0] + xi[0] * a, yi[1] + xi[1] * a) for yi, xi in zip(y, x)]
+    return y + x * a
+
+
+def _copy(vectors: Any) -> Any:
+    return list(vectors) if isinstance(vectors, list) else vectors.copy()
+
+
+def _drift(system: ParticleSystem, h: float) -> None:
+    system.body_positions = _axpy(system.body_positions, system.body_velocities, h)
+    system.tracer_positions = _axpy(system.tracer_positions, system.tracer_velocities, h)
+
+
+def _kick(system: ParticleSystem, h: float) -> None:
+    body_accels, tracer_accels = system.accelerations(system.body_positions, system.tracer_positions)
+    system.body_velocities = _axpy(system.body_velocities, body_accels, h)
+    system.tracer_velocities = _axpy(system.tracer_velocities, tracer_accels, h)
+
+
+def step_euler(system: ParticleSystem, h: float) -> None:
+    # Bodies move first and tracers then feel the updated bodies, matching the original engine.
+    system.force_evaluations += 1
+    body_accels = system.body_accelerations(system.body_positions)
+    system.body_velocities = _axpy(system.body_velocities, body_accels, h)
+    system.body_positions = _axpy(system.body_positions, system.body_velocities, h)
+    tracer_accels = system.tracer_accelerations(system.tracer_positions, system.body_positions)
+    system.tracer_velocities = _axpy(system.tracer_velocities, tracer_accels, h)
+    system.tracer_positions = _axpy(system.tracer_positions, system.tracer_velocities, h)
+
+
+def step_leapfrog(system: ParticleSystem, h: float) -> None:
+    _drift(system, h * 0.5)
+    _kick(system, h)
+    _drift(system, h * 0.5)
+
+
+def step_yoshida4(system: ParticleSystem, h: float) -> None:
+    for drift, kick in zip(_YOSHIDA_DRIFTS, _YOSHIDA_KICKS):
+        _drift(system, drift * h)
+        _kick(system, kick * h)
+    _drift(system, _YOSHIDA_DRIFTS[-1] * h)
+
+
+def step_rk4(system: ParticleSystem, h: float) -> None:
+    bx0, bv0 = system.body_positions, system.body_velocities
+    tx0, tv0 = system.tracer_positions, system.tracer_velocities
+
+    ba1, ta1 = system.accelerations(bx0, tx0)
+    bx2, tx2 = _axpy(bx0, bv0, h * 0.5), _axpy(tx0, tv0, h * 0.5)
+    bv2, tv2 = _axpy(bv0, ba1, h * 0.5), _axpy(tv0, ta1, h * 0.5)
+    ba2, ta2 = system.accelerations(bx2, tx2)
+    bx3, tx3 = _axpy(bx0, bv2, h * 0.5), _axpy(tx0, tv2, h * 0.5)
+    bv3, tv3 = _axpy(bv0, ba2, h * 0.5), _axpy(tv0, ta2, h * 0.5)
+    ba3, ta3 = system.accelerations(bx3, tx3)
+    bx4, tx4 = _axpy(bx0, bv3, h), _axpy(tx0, tv3, h)
+    bv4, tv4 = _axpy(bv0, ba3, h), _axpy(tv0, ta3, h)
+    ba4, ta4 = system.accelerations(bx4, tx4)
+
+    sixth = h / 6.0
+    system.body_positions = _weighted_sum(bx0, (bv0, bv2, bv3, bv4), sixth)
+    system.body_velocities = _weighted_sum(bv0, (ba1, ba2, ba3, ba4), sixth)
+    system.tracer_positions = _weighted_sum(tx0, (tv0, tv2, tv3, tv4), sixth)
+    system.tracer_velocities = _weighted_sum(tv0, (ta1, ta2, ta3, ta4), sixth)
+
+
+def _weighted_sum(base: Any, slopes: tuple[Any, Any, Any, Any], sixth: float) -> Any:
+    k1, k2, k3, k4 = slopes
+    result = _axpy(base, k1, sixth)
+    result = _axpy(result, k2, 2.0 * sixth)
+    result = _axpy(result, k3, 2.0 * sixth)
+    return _axpy(result, k4, sixth)
+
+
+_FIXED_STEPPERS: dict[str, Callable[[ParticleSystem, float], None]] = {
+    "euler": step_euler,
+    "leapfrog": step_leapfrog,
+    "yoshida4": step_yoshida4,
+    "rk4": step_rk4,
+}
+
+
+def _snapshot(system: ParticleSystem) -> tuple[Any, Any, Any, Any]:
+    return (
+        _copy(system.body_positions),
+        _copy(system.body_velocities),
+        _copy(system.tracer_positions),
+        _copy(system.tracer_velocities),
+    )
+
+
+def _restore(system: ParticleSystem, snapshot: tuple[Any, Any, Any, Any]) -> None:
+    (
+        system.body_positions,
+        system.body_velocities,
+        system.tracer_positions,
+        system.tracer_velocities,
+    ) = (_copy(vectors) for vectors in snapshot)
+
+
+def _error_ratio(coarse: Any, fine: Any, tolerance: float) -> float:
+    if isinstance(fine, list):
+        worst = 0.0
+        for (cx, cy), (fx, fy) in zip(coarse, fine):
+            scale = tolerance * (1.0 + max(abs(fx), abs(fy)))
+            worst = max(worst, abs(cx - fx) / scale, abs(cy - fy) / scale)
+        return worst
+    if fine.size == 0:
+        return 0.0
+    scale = tolerance * (1.0 + abs(fine).max(axis=-1, keepdims=True))
+    return float((abs(coarse - fine) / scale).max())
+
+
+def step_adaptive(
+    system: ParticleSystem,
+    dt_seconds: float,
+    config: PhysicsConfig,
+    initial_substeps: int = 1,
+) -> int:
+    stepper = _FIXED_STEPPERS[config.adaptive_base_integrator]
+    order = INTEGRATOR_ORDERS[config.adaptive_base_integrator]
+    min_h = 2.0 * dt_seconds / config.max_substeps
+    h = dt_seconds / max(1, initial_substeps)
+    remaining = dt_seconds
+    substeps = 0
+
+    while remaining > 1e-12 * dt_seconds:
+        h = max(min(h, remaining), min(min_h, remaining))
+        start = _snapshot(system)
+
+        stepper(system, h)
+        coarse = (system.body_positions, system.tracer_positions)
+        _restore(system, start)
+        stepper(system, h * 0.5)
+        stepper(system, h * 0.5)
+
+        error = max(
+            _error_ratio(coarse[0], system.body_positions, config.adaptive_tolerance),
+            _error_ratio(coarse[1], system.tracer_positions, config.adaptive_tolerance),
+        )
+        if error <= 1.0 or h <= min_h * (1.0 + 1e-9):
+            remaining -= h
+            substeps += 2
+        else:
+            _restore(system, start)
+        h *= 4.0 if error == 0.0 else min(4.0, max(0.2, 0.9 * error ** (-1.0 / (order + 1))))
+    return substeps
+
+
+def integrate(
+    system: ParticleSystem,
+    dt_seconds: float,
+    config: PhysicsConfig,
+    initial_substeps: int = 1,
+) -> int:
+    if config.integrator == "adaptive":
+        return step_adaptive(system, dt_seconds, config, initial_substeps)
+    _FIXED_STEPPERS[config.integrator](system, dt_seconds)
+    return 1
@@ -0,0 +1,316 @@
+from __future__ import annotations
+
+from dataclasses import replace
+from math import cos, cosh, hypot, pi, sin, sinh, sqrt
+
+from orbital_colony._numeric import HAS_NUMPY, np
+
+from .models import CelestialBody, ColonyNode, PhysicsConfig, Vector2
+from .vectorized import pack_bodies, pair_environment_array, strongest_partners_array
+
+_MAX_ITERATIONS = 200
+# Pairs closer than this many softening lengths are not treated as Keplerian, because the
+# softened force law deviates noticeably from 1/r^2 at that range.
+_MIN_SEPARATION_SOFTENINGS = 10.0
+
+
+def _stumpff_c(z: float) -> float:
+    if z > 1e-8:
+        return (1.0 - cos(sqrt(z))) / z
+    if z < -1e-8:
+        return (cosh(sqrt(-z)) - 1.0) / -z
+    return 0.5 - z / 24.0
+
+
+def _stumpff_s(z: float) -> float:
+    if z > 1e-8:
+        root = sqrt(z)
+        return (root - sin(root)) / (root * root * root)
+    if z < -1e-8:
+        root = sqrt(-z)
+        return (sinh(root) - root) / (root * root * root)
+    return 1.0 / 6.0 - z / 120.0
+
+
+def propagate_kepler(
+    relative_position: Vector2,
+    relative_velocity: Vector2,
+    mu: float,
+    dt_seconds: float,
+) -> tuple[Vector2, Vector2]:
+    if mu <= 0.0:
+        raise ValueError("mu must be positive")
+    if dt_seconds < 0.0:
+        raise ValueError("dt_seconds must be non-negative")
+
+    rx, ry = relative_position
+    vx, vy = relative_velocity
+    r0 = sqrt(rx * rx + ry * ry)
+    if r0 == 0.0:
+        raise ValueError("relative_position must be non-zero")
+    v0_sq = vx * vx + vy * vy
+    radial_velocity = (rx * vx + ry * vy) / r0
+    alpha = 2.0 / r0 - v0_sq / mu
+    sqrt_mu = sqrt(mu)
+
+    if alpha > 1e-12:
+        period = 2.0 * pi / (sqrt_mu * alpha**1.5)
+        dt_seconds = dt_seconds % period
+    if dt_seconds == 0.0:
+        return relative_position, relative_velocity
+
+    def kepler_residual(chi: float) -> tuple[float, float]:
+        z = alpha * chi * chi
+        c = _stumpff_c(z)
+        s = _stumpff_s(z)
+        residual = (
+            r0 * radial_velocity / sqrt_mu * chi * chi * c
+            + (1.0 - alpha * r0) * chi * chi * chi * s
+            + r0 * chi
+            - sqrt_mu * dt_seconds
+        )
+        radius = (
+            chi * chi * c
+            + r0 * radial_velocity / sqrt_mu * chi * (1.0 - z * s)
+            + r0 * (1.0 - z * c)
+        )
+        return residual, radius
+
+    low = 0.0
+    if alpha > 1e-12:
+        high = 2.0 * pi / sqrt(alpha)
+    else:
+        high = max(sqrt_mu * dt_seconds / r0, 1e-12)
+        while kepler_residual(high)[0] < 0.0:
+            low = high
+            high *= 2.0
+
+    chi = min(max(sqrt_mu * abs(alpha) * dt_seconds, low), high) if alpha > 1e-12 else 0.5 * (low + high)
+    for _ in range(_MAX_ITERATIONS):
+        residual, radius = kepler_residual(chi)
+        if residual > 0.0:
+            high = chi
+        else:
+            low = chi
+        if abs(residual) <= 1e-13 * max(1.0, sqrt_mu * dt_seconds):
+            break
+        candidate = chi - residual / radius if radius > 0.0 else low - 1.0
+        chi = candidate if low < candidate < high else 0.5 * (low + high)
+        if high - low <= 1e-15 * max(1.0, high):
+            break
+
+    z = alpha * chi * chi
+    c = _stumpff_c(z)
+    s = _stumpff_s(z)
+    f = 1.0 - chi * chi / r0 * c
+    g = dt_seconds - chi * chi * chi * s / sqrt_mu
+    px = f * rx + g * vx
+    py = f * ry + g * vy
+    r = sqrt(px * px + py * py)
+    f_dot = sqrt_mu / (r * r0) * (alpha * chi * chi * chi * s - chi)
+    g_dot = 1.0 - chi * chi / r * c
+    return (px, py), (f_dot * rx + g_dot * vx, f_dot * ry + g_dot * vy)
+
+
+def _pair_motion(first: CelestialBody, second: CelestialBody) -> tuple[Vector2, Vector2]:
+    total_mass = first.mass + second.mass
+    return (
+        (
+            (first.mass * first.position[0] + second.mass * second.position[0]) / total_mass,
+            (first.mass * first.position[1] + second.mass * second.position[1]) / total_mass,
+        ),
+        (
+            (first.mass * first.velocity[0] + second.mass * second.velocity[0]) / total_mass,
+            (first.mass * first.velocity[1] + second.mass * second.velocity[1]) / total_mass,
+        ),
+    )
+
+
+def _environment(
+    bodies: list[CelestialBody],
+    first: int,
+    second: int,
+    colonies: list[ColonyNode] | tuple[ColonyNode, ...],
+) -> tuple[float, float, float]:
+    com, com_velocity = _pair_motion(bodies[first], bodies[second])
+    tidal = 0.0
+    crowding = 0.0
+    closing = float("inf")
+    others = [body for index, body in enumerate(bodies) if index not in (first, second)]
+    for item in [*others, *colonies]:
+        distance = hypot(item.position[0] - com[0], item.position[1] - com[1])
+        speed = hypot(item.velocity[0] - com_velocity[0], item.velocity[1] - com_velocity[1])
+        if speed > 0.0:
+            closing = min(closing, distance / speed)
+        if isinstance(item, CelestialBody):
+            tidal += float("inf") if distance == 0.0 else 2.0 * item.mass / (distance * distance * distance)
+        else:
+            crowding = max(crowding, float("inf") if distance == 0.0 else 1.0 / (distance * distance))
+    return tidal, crowding, closing
+
+
+def _perturbation(
+    first: CelestialBody,
+    second: CelestialBody,
+    config: PhysicsConfig,
+    tidal: float,
+    crowding: float,
+) -> float:
+    total_mass = first.mass + second.mass
+    separation = hypot(second.position[0] - first.position[0], second.position[1] - first.position[1])
+    if total_mass <= 0.0 or separation <= _MIN_SEPARATION_SOFTENINGS * config.softening:
+        return float("inf")
+    # Only a bound pair keeps orbiting; a hyperbolic flyby separates, so its relative motion is no orbit.
+    speed_sq = (second.velocity[0] - first.velocity[0]) ** 2 + (second.velocity[1] - first.velocity[1]) ** 2
+    if speed_sq >= 2.0 * config.gravitational_constant * total_mass / separation:
+        return float("inf")
+    internal = total_mass / (separation * separation)
+    return max(tidal * separation / internal, separation * separation * crowding)
+
+
+def pair_perturbation(
+    bodies: list[CelestialBody],
+    first: int,
+    second: int,
+    config: PhysicsConfig,
+    colonies: list[ColonyNode] | tuple[ColonyNode, ...] = (),
+) -> float:
+    if bodies[first].mass + bodies[second].mass <= 0.0:
+        return float("inf")
+    tidal, crowding, _ = _environment(bodies, first, second, colonies)
+    return _perturbation(bodies[first], bodies[second], config, tidal, crowding)
+
+
+def _uses_numpy(config: PhysicsConfig, count: int) -> bool:
+    if config.backend == "numpy":
+        return True
+    return config.backend != "python" and HAS_NUMPY and count >= config.numpy_min_bodies
+
+
+def _strongest_partners(bodies: list[CelestialBody]) -> list[int]:
+    partners = []
+    for i, target in enumerate(bodies):
+        best = -1
+        best_pull = 0.0
+        for j, source in enumerate(bodies):
+            if i == j:
+                continue
+            dx = source.position[0] - target.position[0]
+            dy = source.position[1] - target.position[1]
+            dist_sq = dx * dx + dy * dy
+            pull = float("inf") if dist_sq == 0.0 else source.mass / dist_sq
+            if best < 0 or pull > best_pull:
+                best = j
+                best_pull = pull
+        partners.append(best)
+    return partners
+
+
+def isolation_horizons(
+    bodies: list[CelestialBody],
+    config: PhysicsConfig,
+    colonies: list[ColonyNode] | tuple[ColonyNode, ...] = (),
+    threshold: float | None = None,
+) -> dict[tuple[int, int], float]:
+    # Maps every isolated pair to how long it is guaranteed to stay isolated if everything else keeps its current
+    # velocity: tidal terms grow as distance^-3 and colony terms as distance^-2, so the perturbation stays below the
+    # limit while no other body or colony has closed more than (1 - (perturbation / limit)^(1/3)) of its distance.
+    limit = config.kepler_perturbation_threshold if threshold is None else threshold
+    if len(bodies) < 2:
+        return {}
+    numeric = _uses_numpy(config, len(bodies) + len(colonies))
+    if numeric:
+        positions, velocities, masses = pack_bodies(bodies)
+        partners = strongest_partners_array(positions, masses).tolist()
+    else:
+        partners = _strongest_partners(bodies)
+    pairs = [
+        (i, j)
+        for i, j in enumerate(partners)
+        if i < j and partners[j] == i and bodies[i].mass + bodies[j].mass > 0.0
+    ]
+    if not pairs:
+        return {}
+
+    if numeric:
+        colony_positions, colony_velocities, _ = pack_bodies(list(colonies))
+        environment = zip(
+            *(
+                values.tolist()
+                for values in pair_environment_array(
+                    positions,
+                    velocities,
+                    masses,
+                    np.array([i for i, _ in pairs], dtype=np.int64),
+                    np.array([j for _, j in pairs], dtype=np.int64),
+                    colony_positions,
+                    colony_velocities,
+                )
+            )
+        )
+    else:
+        environment = (_environment(bodies, i, j, colonies) for i, j in pairs)
+
+    horizons: dict[tuple[int, int], float] = {}
+    for (i, j), (tidal, crowding, closing) in zip(pairs, environment):
+        perturbation = _perturbation(bodies[i], bodies[j], config, tidal, crowding)
+        if perturbation < limit:
+            horizons[(i, j)] = (1.0 - (perturbation / limit) ** (1.0 / 3.0)) * closing
+    return horizons
+
+
+def find_isolated_pairs(
+    bodies: list[CelestialBody],
+    config: PhysicsConfig,
+    colonies: list[ColonyNode] | tuple[ColonyNode, ...] = (),
+    threshold: float | None = None,
+) -> list[tuple[int, int]]:
+    return list(isolation_horizons(bodies, config, colonies, threshold))
+
+
+def advance_pair(
+    first: CelestialBody,
+    second: CelestialBody,
+    dt_seconds: float,
+    config: PhysicsConfig,
+) -> tuple[CelestialBody, CelestialBody]:
+    com, com_velocity = _pair_motion(first, second)
+    com = (com[0] + com_velocity[0] * dt_seconds, com[1] + com_velocity[1] * dt_seconds)
+    return split_pair(first, second, com, com_velocity, dt_seconds, config)
+
+
+def split_pair(
+    first: CelestialBody,
+    second: CelestialBody,
+    com: Vector2,
+    com_velocity: Vector2,
+    dt_seconds: float,
+    config: PhysicsConfig,
+) -> tuple[CelestialBody, CelestialBody]:
+    total_mass = first.mass + second.mass
+    relative_position, relative_velocity = propagate_kepler(
+        (second.position[0] - first.position[0], second.position[1] - first.position[1]),
+        (second.velocity[0] - first.velocity[0], second.velocity[1] - first.velocity[1]),
+        config.gravitational_constant * total_mass,
+        dt_seconds,
+    )
+    first_share = second.mass / total_mass
+    second_share = first.mass / total_mass
+    return (
+        replace(
+            first,
+            position=(com[0] - first_share * relative_position[0], com[1] - first_share * relative_position[1]),
+            velocity=(
+                com_velocity[0] - first_share * relative_velocity[0],
+                com_velocity[1] - first_share * relative_velocity[1],
+            ),
+        ),
+        replace(
+            second,
+            position=(com[0] + second_share * relative_position[0], com[1] + second_share * relative_position[1]),
+            velocity=(
+                com_velocity[0] + second_share * relative_velocity[0],
+                com_velocity[1] + second_share * relative_velocity[1],
+            ),
+        ),
+    )
@@ -33,6 +33,17 @@ class PhysicsConfig:
     tidal_scale: float = 0.02
     drift_scale: float = 0.04
     max_penalty: float = 1.0
+    backend: str = "auto"
+    numpy_min_bodies: int = 16
+    gravity_solver: str = "direct"
+    opening_angle: float = 0.5
+    quadtree_leaf_capacity: int = 1
+    integrator: str = "euler"
+    adaptive_base_integrator: str = "leapfrog"
+    adaptive_tolerance: float = 1e-6
+    max_substeps: int = 64
+    kepler_fast_path: bool = False
+    kepler_perturbation_threshold: float = 1e-4
 
 
 @dataclass
@@ -41,3 +52,32 @@ class PhysicsState:
     colony: ColonyNode | None = None
     time_seconds: float = 0.0
     stability_index: float = 1.0
+    substeps: int = 0
+    colonies: list[ColonyNode] = field(default_factory=list)
+    colony_stability: list[float] = field(default_factory=list)
+
+    def __post_init__(self) -> None:
+        colony = self.__dict__.pop("_initial_colony", None)
+        if colony is not None and (not self.colonies or self.colonies[0] is not colony):
+            self.colonies = [colony, *(c for c in self.colonies if c is not colony)]
+
+
+def _get_colony(state: PhysicsState) -> ColonyNode | None:
+    return state.colonies[0] if state.colonies else None
+
+
+def _set_colony(state: PhysicsState, colony: ColonyNode | None) -> None:
+    # The single-colony view is always colonies[0]: assigning it replaces (or, with None, drops) that slot, so
+    # the engine never steps a colony the caller has swapped out. The list is rebuilt rather than edited, since
+    # stepped states may share it.
+    if "colonies" not in state.__dict__:
+        # __init__ assigns colony before colonies; __post_init__ merges the two.
+        state.__dict__["_initial_colony"] = colony
+    elif colony is not None:
+        state.colonies = [colony, *state.colonies[1:]]
+    elif state.colonies:
+        state.colonies = state.colonies[1:]
+
+
+# Installed after the dataclass is built so the field keeps its None default in __init__, eq and repr.
+PhysicsState.colony = property(_get_colony, _set_colony)  # type: ignore[assignment]
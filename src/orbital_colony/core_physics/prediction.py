@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass, field, replace
+from typing import Iterable
+
+from .engine import PhysicsEngine
+from .models import PhysicsState, Vector2
+
+
+@dataclass
+class Trajectory:
+    name: str
+    times: list[float] = field(default_factory=list)
+    positions: list[Vector2] = field(default_factory=list)
+
+
+def _signature(state: PhysicsState) -> tuple[tuple[str, float], ...]:
+    return tuple((body.name, body.mass) for body in state.bodies) + tuple(
+        (colony.name, colony.mass) for colony in state.colonies
+    )
+
+
+def _snapshot(state: PhysicsState) -> PhysicsState:
+    colonies = [replace(colony) for colony in state.colonies]
+    return replace(
+        state,
+        bodies=[replace(body) for body in state.bodies],
+        colony=colonies[0] if colonies else None,
+        colonies=colonies,
+        colony_stability=list(state.colony_stability),
+    )
+
+
+def _vectors(state: PhysicsState) -> list[Vector2]:
+    return [v for body in state.bodies for v in (body.position, body.velocity)] + [
+        v for colony in state.colonies for v in (colony.position, colony.velocity)
+    ]
+
+
+def _interpolate(before: PhysicsState, after: PhysicsState, time_seconds: float) -> list[Vector2]:
+    # Cubic Hermite through both samples' positions and velocities; the velocity is the cubic's derivative.
+    h = after.time_seconds - before.time_seconds
+    s = (time_seconds - before.time_seconds) / h
+    p0, p1 = 2 * s**3 - 3 * s**2 + 1, -2 * s**3 + 3 * s**2
+    m0, m1 = (s**3 - 2 * s**2 + s) * h, (s**3 - s**2) * h
+    dp0, dm0, dm1 = (6 * s**2 - 6 * s) / h, 3 * s**2 - 4 * s + 1, 3 * s**2 - 2 * s
+    start, end = _vectors(before), _vectors(after)
+    vectors: list[Vector2] = []
+    for index in range(0, len(start), 2):
+        (x0, y0), (u0, w0) = start[index], start[index + 1]
+        (x1, y1), (u1, w1) = end[index], end[index + 1]
+        vectors.append((p0 * x0 + m0 * u0 + p1 * x1 + m1 * u1, p0 * y0 + m0 * w0 + p1 * y1 + m1 * w1))
+        vectors.append((dp0 * (x0 - x1) + dm0 * u0 + dm1 * u1, dp0 * (y0 - y1) + dm0 * w0 + dm1 * w1))
+    return vectors
+
+
+def _distance(a: list[Vector2], b: list[Vector2]) -> float:
+    return max((abs(p - q) for u, v in zip(a, b) for p, q in zip(u, v)), default=0.0)
+
+
+class TrajectoryPredictor:
+    def __init__(
+        self,
+        engine: PhysicsEngine,
+        step_seconds: float,
+        horizon_seconds: float,
+        tolerance: float = 1e-9,
+    ) -> None:
+        if step_seconds <= 0:
+            raise ValueError("step_seconds must be positive")
+        if horizon_seconds < step_seconds:
+            raise ValueError("horizon_seconds must cover at least one step")
+        self.engine = engine
+        self.step_seconds = step_seconds
+        self.horizon_seconds = horizon_seconds
+        self.tolerance = tolerance
+        self.rebuilds = 0
+        self.steps_computed = 0
+        self._samples: deque[PhysicsState] = deque()
+        self._signature: tuple[tuple[str, float], ...] = ()
+        self._origin = 0.0
+        self._drift = 0.0
+        self._gap = 0.0
+
+    def invalidate(self) -> None:
+        self._samples.clear()
+        self._signature = ()
+
+    def predict(
+        self,
+        state: PhysicsState,
+        names: Iterable[str] | None = None,
+    ) -> dict[str, Trajectory]:
+        if not self._reuse(state):
+            self.rebuilds += 1
+            self._samples.clear()
+            self._samples.append(_snapshot(state))
+            self._signature = _signature(state)
+            # A simulation stepping at another dt drifts from the cache by roughly the predictor's own
+            # integration error, and is compared between samples through an interpolation; both are
+            # estimated once per rebuild from one step against two half steps.
+            head = self._samples[0]
+            full = self.engine.step(head, self.step_seconds)
+            middle = self.engine.step(head, self.step_seconds / 2)
+            half = self.engine.step(middle, self.step_seconds / 2)
+            self._samples.append(full)
+            self.steps_computed += 1
+            self._origin = state.time_seconds
+            self._drift = _distance(_vectors(full), _vectors(half))
+            self._gap = _distance(_interpolate(head, full, middle.time_seconds), _vectors(middle))
+
+        end_time = state.time_seconds + self.horizon_seconds - 1e-9 * self.step_seconds
+        while self._samples[-1].time_seconds < end_time:
+            self._samples.append(self.engine.step(self._samples[-1], self.step_seconds))
+            self.steps_computed += 1
+
+        return self._collect(state, names)
+
+    def _reuse(self, state: PhysicsState) -> bool:
+        if not self._samples or _signature(state) != self._signature:
+            return False
+
+        # The cache keeps the last sample at or before the state, so a state between samples is compared
+        # with the interpolated trajectory.
+        alignment = 1e-6 * self.step_seconds
+        while len(self._samples) > 1 and self._samples[1].time_seconds <= state.time_seconds + alignment:
+            self._samples.popleft()
+        if abs(self._samples[0].time_seconds - state.time_seconds) <= alignment:
+            expected = _vectors(self._samples[0])
+        elif len(self._samples) > 1 and self._samples[0].time_seconds < state.time_seconds:
+            expected = _interpolate(self._samples[0], self._samples[1], state.time_seconds)
+        else:
+            return False
+
+        # The estimates come from the first step only, hence the generous factor. The allowance grows with
+        # the steps since the rebuild but stops at one horizon, so a cache that keeps drifting is rebuilt.
+        steps = min(state.time_seconds - self._origin, self.horizon_seconds) / self.step_seconds
+        drift = 8.0 * (self._gap + self._drift * (steps + 1.0))
+        for predicted, actual in zip(expected, _vectors(state)):
+            for p, a in zip(predicted, actual):
+                if abs(p - a) > self.tolerance * (1.0 + abs(a)) + drift:
+                    return False
+        return True
+
+    def _collect(self, state: PhysicsState, names: Iterable[str] | None) -> dict[str, Trajectory]:
+        # The trajectory starts from the state itself, which may sit between samples or off a reused cache.
+        samples = [state, *list(self._samples)[1:]]
+        head = samples[0]
+        body_index = {body.name: index for index, body in enumerate(head.bodies)}
+        colony_index = {colony.name: index for index, colony in enumerate(head.colonies)}
+        if names is None:
+            names = [*body_index, *colony_index]
+
+        times = [sample.time_seconds for sample in samples]
+        trajectories: dict[str, Trajectory] = {}
+        for name in names:
+            if name in body_index:
+                index = body_index[name]
+                positions = [sample.bodies[index].position for sample in samples]
+            elif name in colony_index:
+                index = colony_index[name]
+                positions = [sample.colonies[index].position for sample in samples]
+            else:
+                raise KeyError(f"Unknown body or colony: {name}")
+            trajectories[name] = Trajectory(name=name, times=list(times), positions=positions)
+        return trajectories
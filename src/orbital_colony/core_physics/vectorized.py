@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+from typing import Any
+
+from orbital_colony._numeric import HAS_NUMPY, require_numpy
+
+from .models import CelestialBody, PhysicsConfig, Vector2
+
+# Rows of the pairwise interaction matrix evaluated per pass; bounds peak memory at
+# roughly _CHUNK_ROWS * n_sources * 2 floats for very large body counts.
+_CHUNK_ROWS = 512
+
+
+def pack_bodies(bodies: list[CelestialBody]) -> tuple[Any, Any, Any]:
+    numpy = require_numpy()
+    count = len(bodies)
+    positions = numpy.empty((count, 2), dtype=float)
+    velocities = numpy.empty((count, 2), dtype=float)
+    masses = numpy.empty(count, dtype=float)
+    for index, body in enumerate(bodies):
+        positions[index] = body.position
+        velocities[index] = body.velocity
+        masses[index] = body.mass
+    return positions, velocities, masses
+
+
+def unpack_vectors(array: Any) -> list[Vector2]:
+    return [(x, y) for x, y in array.tolist()]
+
+
+def compute_gravity_at_points_array(
+    points: Any,
+    source_positions: Any,
+    source_masses: Any,
+    config: PhysicsConfig,
+    exclude_self: bool = False,
+) -> Any:
+    numpy = require_numpy()
+    points = numpy.asarray(points, dtype=float).reshape(-1, 2)
+    source_positions = numpy.asarray(source_positions, dtype=float).reshape(-1, 2)
+    source_masses = numpy.asarray(source_masses, dtype=float)
+    accelerations = numpy.zeros_like(points)
+    if len(points) == 0 or len(source_positions) == 0:
+        return accelerations
+
+    softening_sq = config.softening * config.softening
+    weights = config.gravitational_constant * source_masses
+    for start in range(0, len(points), _CHUNK_ROWS):
+        stop = min(start + _CHUNK_ROWS, len(points))
+        delta = source_positions[None, :, :] - points[start:stop, None, :]
+        dist_sq = numpy.einsum("ijk,ijk->ij", delta, delta) + softening_sq
+        with numpy.errstate(divide="ignore"):
+            inv_dist = 1.0 / numpy.sqrt(dist_sq)
+        scale = weights[None, :] * inv_dist * inv_dist * inv_dist
+        if exclude_self:
+            rows = numpy.arange(stop - start)
+            scale[rows, rows + start] = 0.0
+        accelerations[start:stop] = numpy.einsum("ij,ijk->ik", scale, delta)
+    return accelerations
+
+
+def compute_body_accelerations_array(
+    positions: Any,
+    masses: Any,
+    config: PhysicsConfig,
+) -> Any:
+    return compute_gravity_at_points_array(positions, positions, masses, config, exclude_self=True)
+
+
+def compute_stability_at_points_array(
+    points: Any,
+    source_positions: Any,
+    source_masses: Any,
+    config: PhysicsConfig,
+    anchors: Any = None,
+) -> Any:
+    numpy = require_numpy()
+    points = numpy.asarray(points, dtype=float).reshape(-1, 2)
+    source_positions = numpy.asarray(source_positions, dtype=float).reshape(-1, 2)
+    source_masses = numpy.asarray(source_masses, dtype=float)
+
+    tidal_stress = numpy.zeros(len(points))
+    softening_sq = config.softening * config.softening
+    weights = config.gravitational_constant * source_masses
+    for start in range(0, len(points), _CHUNK_ROWS):
+        stop = min(start + _CHUNK_ROWS, len(points))
+        delta = source_positions[None, :, :] - points[start:stop, None, :]
+        dist_sq = numpy.einsum("ijk,ijk->ij", delta, delta) + softening_sq
+        tidal_stress[start:stop] = (weights[None, :] / (dist_sq * numpy.sqrt(dist_sq))).sum(axis=1)
+
+    if anchors is None:
+        drift = numpy.zeros(len(points))
+    else:
+        offset = points - numpy.asarray(anchors, dtype=float).reshape(-1, 2)
+        drift = numpy.sqrt(numpy.einsum("ij,ij->i", offset, offset))
+    penalty = config.tidal_scale * tidal_stress + config.drift_scale * drift
+    return 1.0 - numpy.clip(penalty / config.max_penalty, 0.0, 1.0)
+
+
+def _batch_chunk(rows: int, columns: int) -> int:
+    return max(1, (_CHUNK_ROWS * 1024) // max(1, rows * columns))
+
+
+def compute_batched_gravity_array(
+    points: Any,
+    source_positions: Any,
+    source_masses: Any,
+    config: PhysicsConfig,
+    exclude_self: bool = False,
+) -> Any:
+    numpy = require_numpy()
+    scenarios, point_count = points.shape[0], points.shape[1]
+    source_count = source_positions.shape[1]
+    accelerations = numpy.zeros_like(points)
+    if point_count == 0 or source_count == 0:
+        return accelerations
+
+    softening_sq = config.softening * config.softening
+    weights = config.gravitational_constant * source_masses
+    chunk = _batch_chunk(point_count, source_count)
+    for start in range(0, scenarios, chunk):
+        stop = min(start + chunk, scenarios)
+        delta = source_positions[start:stop, None, :, :] - points[start:stop, :, None, :]
+        dist_sq = numpy.einsum("kijd,kijd->kij", delta, delta) + softening_sq
+        with numpy.errstate(divide="ignore"):
+            inv_dist = 1.0 / numpy.sqrt(dist_sq)
+        scale = weights[start:stop, None, :] * inv_dist * inv_dist * inv_dist
+        if exclude_self:
+            diagonal = numpy.arange(point_count)
+            scale[:, diagonal, diagonal] = 0.0
+        accelerations[start:stop] = numpy.einsum("kij,kijd->kid", scale, delta)
+    return accelerations
+
+
+def compute_batched_stability_array(
+    points: Any,
+    source_positions: Any,
+    source_masses: Any,
+    config: PhysicsConfig,
+    anchors: Any,
+) -> Any:
+    numpy = require_numpy()
+    scenarios, point_count = points.shape[0], points.shape[1]
+    source_count = source_positions.shape[1]
+    tidal_stress = numpy.zeros((scenarios, point_count))
+
+    softening_sq = config.softening * config.softening
+    weights = config.gravitational_constant * source_masses
+    chunk = _batch_chunk(point_count, source_count)
+    for start in range(0, scenarios, chunk):
+        stop = min(start + chunk, scenarios)
+        delta = source_positions[start:stop, None, :, :] - points[start:stop, :, None, :]
+        dist_sq = numpy.einsum("kijd,kijd->kij", delta, delta) + softening_sq
+        tidal_stress[start:stop] = (weights[start:stop, None, :] / (dist_sq * numpy.sqrt(dist_sq))).sum(axis=2)
+
+    offset = points - anchors
+    drift = numpy.sqrt(numpy.einsum("kid,kid->ki", offset, offset))
+    penalty = config.tidal_scale * tidal_stress + config.drift_scale * drift
+    return 1.0 - numpy.clip(penalty / config.max_penalty, 0.0, 1.0)
+
+
+def strongest_partners_array(positions: Any, masses: Any) -> Any:
+    numpy = require_numpy()
+    positions = numpy.asarray(positions, dtype=float).reshape(-1, 2)
+    masses = numpy.asarray(masses, dtype=float)
+    partners = numpy.zeros(len(positions), dtype=numpy.int64)
+    for start in range(0, len(positions), _CHUNK_ROWS):
+        stop = min(start + _CHUNK_ROWS, len(positions))
+        delta = positions[None, :, :] - positions[start:stop, None, :]
+        dist_sq = numpy.einsum("ijk,ijk->ij", delta, delta)
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            pull = numpy.where(dist_sq == 0.0, numpy.inf, masses[None, :] / dist_sq)
+        rows = numpy.arange(stop - start)
+        pull[rows, rows + start] = -numpy.inf
+        partners[start:stop] = numpy.argmax(pull, axis=1)
+    return partners
+
+
+def pair_environment_array(
+    positions: Any,
+    velocities: Any,
+    masses: Any,
+    firsts: Any,
+    seconds: Any,
+    points: Any,
+    point_velocities: Any,
+) -> tuple[Any, Any, Any]:
+    # Per pair: summed 2m/d^3 of every other body about the barycentre, the largest 1/d^2 of any point, and the
+    # shortest d/|v| of any other body or point relative to the barycentre.
+    numpy = require_numpy()
+    points = numpy.asarray(points, dtype=float).reshape(-1, 2)
+    point_velocities = numpy.asarray(point_velocities, dtype=float).reshape(-1, 2)
+    count = len(firsts)
+    tidal = numpy.zeros(count)
+    crowding = numpy.zeros(count)
+    closing = numpy.full(count, numpy.inf)
+    total = masses[firsts] + masses[seconds]
+    com = (masses[firsts, None] * positions[firsts] + masses[seconds, None] * positions[seconds]) / total[:, None]
+    com_velocity = (
+        masses[firsts, None] * velocities[firsts] + masses[seconds, None] * velocities[seconds]
+    ) / total[:, None]
+    sources = numpy.concatenate((positions, points))
+    source_velocities = numpy.concatenate((velocities, point_velocities))
+    chunk = _batch_chunk(1, len(sources))
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        for start in range(0, count, chunk):
+            stop = min(start + chunk, count)
+            rows = numpy.arange(stop - start)
+            offset = sources[None, :, :] - com[start:stop, None, :]
+            motion = source_velocities[None, :, :] - com_velocity[start:stop, None, :]
+            distance = numpy.sqrt(numpy.einsum("ijk,ijk->ij", offset, offset))
+            speed = numpy.sqrt(numpy.einsum("ijk,ijk->ij", motion, motion))
+            distance[rows, firsts[start:stop]] = numpy.inf
+            distance[rows, seconds[start:stop]] = numpy.inf
+            body_distance = distance[:, : len(positions)]
+            terms = numpy.where(body_distance == 0.0, numpy.inf, 2.0 * masses[None, :] / body_distance**3)
+            tidal[start:stop] = terms.sum(axis=1)
+            if len(points):
+                crowding[start:stop] = numpy.where(
+                    distance[:, len(positions) :] == 0.0, numpy.inf, 1.0 / distance[:, len(positions) :] ** 2
+                ).max(axis=1)
+            closing[start:stop] = numpy.where(speed > 0.0, distance / speed, numpy.inf).min(axis=1)
+    return tidal, crowding, closing
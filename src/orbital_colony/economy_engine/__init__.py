@@ -1,9 +1,27 @@
 from .engine import EconomyEngine
-from .models import CommodityState, EconomyConfig, EconomyState
+from .history import OHLCBar, PriceHistory, PricePoint, RingBuffer
+from .markets import ColonyMarket, MarketNetwork, RegionShard, Shipment, TradeRoute
+from .models import CommodityState, EconomyConfig, EconomyState, Order, OrderFill
+from .vectorized import HAS_NUMPY, EconomyArrays, pack_economy, unpack_economy
 
 __all__ = [
+    "HAS_NUMPY",
+    "ColonyMarket",
     "CommodityState",
+    "EconomyArrays",
     "EconomyConfig",
     "EconomyState",
     "EconomyEngine",
+    "MarketNetwork",
+    "OHLCBar",
+    "Order",
+    "OrderFill",
+    "PriceHistory",
+    "PricePoint",
+    "RegionShard",
+    "RingBuffer",
+    "Shipment",
+    "TradeRoute",
+    "pack_economy",
+    "unpack_economy",
 ]
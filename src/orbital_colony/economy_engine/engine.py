@@ -3,17 +3,41 @@ from __future__ import annotations
 import random
 from dataclasses import replace
 from math import sqrt
+from typing import Any
 
-from .models import CommodityState, EconomyConfig, EconomyState
+from .models import CommodityState, EconomyConfig, EconomyState, Order, OrderFill
+from .rng import counter_normal, counter_normals
+from .vectorized import (
+    HAS_NUMPY,
+    EconomyArrays,
+    advance_arrays,
+    advance_arrays_bulk,
+    pack_economy,
+    require_numpy,
+    unpack_economy,
+)
+
+# Upper bound on shock samples (ticks x commodities) materialized per fast-forward chunk.
+_FAST_FORWARD_SAMPLES = 1 << 20
 
 
 def _clamp(value: float, lower: float, upper: float) -> float:
     return max(lower, min(value, upper))
 
 
+def _copy_state(state: EconomyState) -> EconomyState:
+    return EconomyState(
+        commodities={k: replace(v) for k, v in state.commodities.items()},
+        time_seconds=state.time_seconds,
+        tick=state.tick,
+    )
+
+
 class EconomyEngine:
     def __init__(self, config: EconomyConfig | None = None) -> None:
         self.config = config or EconomyConfig()
+        if self.config.rng_mode not in ("sequential", "counter"):
+            raise ValueError(f"Unknown rng mode: {self.config.rng_mode}")
         self._rng = random.Random(self.config.rng_seed)
 
     def create_default_state(self) -> EconomyState:
@@ -34,34 +58,121 @@ class EconomyEngine:
         if dt_seconds <= 0:
             raise ValueError("dt_seconds must be positive")
 
-        next_state = EconomyState(commodities={}, time_seconds=state.time_seconds + dt_seconds)
+        next_state = EconomyState(
+            commodities={},
+            time_seconds=state.time_seconds + dt_seconds,
+            tick=state.tick + 1,
+        )
 
         for key, commodity in state.commodities.items():
             c = replace(commodity)
-            imbalance = (c.demand_rate - c.supply_rate) / max(c.supply_rate, 1e-6)
-            target_price = c.price * (1.0 + self.config.elasticity * imbalance)
-            damped_price = c.price + self.config.damping * (target_price - c.price)
+            self._advance_commodity(c, dt_seconds, state.tick)
+            next_state.commodities[key] = c
 
-            volatility_sigma = self.config.volatility * sqrt(dt_seconds)
-            raw_shock = self._rng.gauss(0.0, volatility_sigma)
-            shock = _clamp(raw_shock, -self.config.max_volatility_abs, self.config.max_volatility_abs)
+        return next_state
 
-            candidate_price = damped_price * (1.0 + shock)
-            ratio_step = (candidate_price - c.price) / max(c.price, 1e-6)
-            ratio_step = _clamp(
-                ratio_step,
-                -self.config.max_price_step_ratio,
-                self.config.max_price_step_ratio,
-            )
-            c.price = max(self.config.min_price, c.price * (1.0 + ratio_step))
-            c.last_volatility = shock
+    def step_in_place(self, state: EconomyState, dt_seconds: float) -> EconomyState:
+        if dt_seconds <= 0:
+            raise ValueError("dt_seconds must be positive")
 
-            c.inventory += (c.supply_rate - c.demand_rate) * dt_seconds
-            c.inventory = max(self.config.min_inventory, c.inventory)
+        for commodity in state.commodities.values():
+            self._advance_commodity(commodity, dt_seconds, state.tick)
+        state.time_seconds += dt_seconds
+        state.tick += 1
+        return state
 
-            next_state.commodities[key] = c
+    def step_arrays(self, arrays: EconomyArrays, dt_seconds: float) -> EconomyArrays:
+        if dt_seconds <= 0:
+            raise ValueError("dt_seconds must be positive")
+        raw_shocks = self._draw_shocks(arrays.names, arrays.tick, 1, dt_seconds)[0]
+        advance_arrays(arrays, raw_shocks, dt_seconds, self.config)
+        arrays.time_seconds += dt_seconds
+        arrays.tick += 1
+        return arrays
 
-        return next_state
+    def fast_forward(
+        self,
+        state: EconomyState,
+        ticks: int,
+        dt_seconds: float,
+        exact: bool = True,
+    ) -> EconomyState:
+        if dt_seconds <= 0:
+            raise ValueError("dt_seconds must be positive")
+        if ticks < 0:
+            raise ValueError("ticks must be non-negative")
+
+        if not HAS_NUMPY or not self._closed_form_applies(state):
+            next_state = _copy_state(state)
+            for _ in range(ticks):
+                self.step_in_place(next_state, dt_seconds)
+            return next_state
+
+        arrays = pack_economy(state)
+        chunk = max(1, _FAST_FORWARD_SAMPLES // max(1, len(arrays)))
+        statistical = None
+        if not exact:
+            statistical = require_numpy().random.default_rng([self.config.rng_seed & 0xFFFFFFFF, state.tick])
+        done = 0
+        while done < ticks:
+            count = min(chunk, ticks - done)
+            if statistical is None:
+                raw_shocks = self._draw_shocks(arrays.names, arrays.tick, count, dt_seconds)
+            else:
+                sigma = self.config.volatility * sqrt(dt_seconds)
+                raw_shocks = statistical.standard_normal((count, len(arrays))) * sigma
+            advance_arrays_bulk(arrays, raw_shocks, dt_seconds, self.config)
+            arrays.tick += count
+            done += count
+
+        arrays.time_seconds = state.time_seconds + ticks * dt_seconds
+        return unpack_economy(arrays)
+
+    def _closed_form_applies(self, state: EconomyState) -> bool:
+        # The bulk recurrence assumes the price-step ratio never divides by the 1e-6 guard and
+        # that every per-tick growth factor stays positive.
+        if self.config.min_price < 1e-6 or self.config.max_price_step_ratio >= 1.0:
+            return False
+        return all(c.price >= 1e-6 for c in state.commodities.values())
+
+    def _draw_shocks(self, names: list[str], first_tick: int, ticks: int, dt_seconds: float) -> Any:
+        numpy = require_numpy()
+        volatility_sigma = self.config.volatility * sqrt(dt_seconds)
+        if self.config.rng_mode == "counter":
+            tick_range = numpy.arange(first_tick, first_tick + ticks, dtype=numpy.uint64)
+            return counter_normals(self.config.rng_seed, names, tick_range) * volatility_sigma
+        gauss = self._rng.gauss
+        count = ticks * len(names)
+        return numpy.fromiter(
+            (gauss(0.0, volatility_sigma) for _ in range(count)),
+            dtype=float,
+            count=count,
+        ).reshape(ticks, len(names))
+
+    def _advance_commodity(self, c: CommodityState, dt_seconds: float, tick: int) -> None:
+        imbalance = (c.demand_rate - c.supply_rate) / max(c.supply_rate, 1e-6)
+        target_price = c.price * (1.0 + self.config.elasticity * imbalance)
+        damped_price = c.price + self.config.damping * (target_price - c.price)
+
+        volatility_sigma = self.config.volatility * sqrt(dt_seconds)
+        if self.config.rng_mode == "counter":
+            raw_shock = counter_normal(self.config.rng_seed, c.name, tick) * volatility_sigma
+        else:
+            raw_shock = self._rng.gauss(0.0, volatility_sigma)
+        shock = _clamp(raw_shock, -self.config.max_volatility_abs, self.config.max_volatility_abs)
+
+        candidate_price = damped_price * (1.0 + shock)
+        ratio_step = (candidate_price - c.price) / max(c.price, 1e-6)
+        ratio_step = _clamp(
+            ratio_step,
+            -self.config.max_price_step_ratio,
+            self.config.max_price_step_ratio,
+        )
+        c.price = max(self.config.min_price, c.price * (1.0 + ratio_step))
+        c.last_volatility = shock
+
+        c.inventory += (c.supply_rate - c.demand_rate) * dt_seconds
+        c.inventory = max(self.config.min_inventory, c.inventory)
 
     def place_buy_order(
         self,
@@ -74,16 +185,8 @@ class EconomyEngine:
         if commodity_name not in state.commodities:
             raise KeyError(f"Unknown commodity: {commodity_name}")
 
-        next_state = EconomyState(
-            commodities={k: replace(v) for k, v in state.commodities.items()},
-            time_seconds=state.time_seconds,
-        )
-        commodity = next_state.commodities[commodity_name]
-        filled = min(quantity, commodity.inventory)
-        cost = filled * commodity.price
-        commodity.inventory -= filled
-        commodity.demand_rate += quantity
-        commodity.inventory = max(self.config.min_inventory, commodity.inventory)
+        next_state = _copy_state(state)
+        filled, cost = self._fill_buy(next_state.commodities[commodity_name], quantity)
         return next_state, filled, cost
 
     def place_sell_order(
@@ -97,13 +200,51 @@ class EconomyEngine:
         if commodity_name not in state.commodities:
             raise KeyError(f"Unknown commodity: {commodity_name}")
 
-        next_state = EconomyState(
-            commodities={k: replace(v) for k, v in state.commodities.items()},
-            time_seconds=state.time_seconds,
-        )
-        commodity = next_state.commodities[commodity_name]
+        next_state = _copy_state(state)
+        revenue = self._fill_sell(next_state.commodities[commodity_name], quantity)
+        return next_state, revenue
+
+    def submit_orders(self, state: EconomyState, orders: list[Order]) -> tuple[EconomyState, list[OrderFill]]:
+        self._validate_orders(state, orders)
+        next_state = _copy_state(state)
+        return next_state, self._apply_orders(next_state, orders)
+
+    def submit_orders_in_place(self, state: EconomyState, orders: list[Order]) -> list[OrderFill]:
+        self._validate_orders(state, orders)
+        return self._apply_orders(state, orders)
+
+    def _validate_orders(self, state: EconomyState, orders: list[Order]) -> None:
+        for order in orders:
+            if order.side not in ("buy", "sell"):
+                raise ValueError(f"Unknown order side: {order.side}")
+            if order.quantity <= 0:
+                raise ValueError("quantity must be positive")
+            if order.commodity not in state.commodities:
+                raise KeyError(f"Unknown commodity: {order.commodity}")
+
+    def _apply_orders(self, state: EconomyState, orders: list[Order]) -> list[OrderFill]:
+        fills: list[OrderFill] = []
+        for order in orders:
+            commodity = state.commodities[order.commodity]
+            if order.side == "buy":
+                filled, cost = self._fill_buy(commodity, order.quantity)
+                fills.append(OrderFill(order=order, filled=filled, cost=cost))
+            else:
+                revenue = self._fill_sell(commodity, order.quantity)
+                fills.append(OrderFill(order=order, filled=order.quantity, revenue=revenue))
+        return fills
+
+    def _fill_buy(self, commodity: CommodityState, quantity: float) -> tuple[float, float]:
+        filled = min(quantity, commodity.inventory)
+        cost = filled * commodity.price
+        commodity.inventory -= filled
+        commodity.demand_rate += quantity
+        commodity.inventory = max(self.config.min_inventory, commodity.inventory)
+        return filled, cost
+
+    def _fill_sell(self, commodity: CommodityState, quantity: float) -> float:
         revenue = quantity * commodity.price
         commodity.inventory += quantity
         commodity.supply_rate += quantity
         commodity.inventory = max(self.config.min_inventory, commodity.inventory)
-        return next_state, revenue
+        return revenue
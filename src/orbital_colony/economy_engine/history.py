@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from math import floor
+
+from .models import EconomyState, OrderFill
+
+
+@dataclass(frozen=True)
+class PricePoint:
+    time_seconds: float
+    price: float
+    volume: float
+
+
+@dataclass(frozen=True)
+class OHLCBar:
+    start_seconds: float
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+
+
+class RingBuffer:
+    def __init__(self, capacity: int, columns: int) -> None:
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self._columns = [array("d", bytes(8 * capacity)) for _ in range(columns)]
+        self._start = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> tuple[float, ...]:
+        slot = self._slot(index)
+        return tuple(column[slot] for column in self._columns)
+
+    def _slot(self, index: int) -> int:
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("ring buffer index out of range")
+        return (self._start + index) % self.capacity
+
+    def append(self, *values: float) -> None:
+        if self._count < self.capacity:
+            slot = (self._start + self._count) % self.capacity
+            self._count += 1
+        else:
+            slot = self._start
+            self._start = (self._start + 1) % self.capacity
+        for column, value in zip(self._columns, values):
+            column[slot] = value
+
+    def key(self, index: int) -> float:
+        return self._columns[0][self._slot(index)]
+
+    def range(self, start: float, end: float) -> list[tuple[float, ...]]:
+        keys = _Keys(self)
+        return [self[index] for index in range(bisect_left(keys, start), bisect_right(keys, end))]
+
+
+class _Keys:
+    def __init__(self, buffer: RingBuffer) -> None:
+        self.buffer = buffer
+
+    def __len__(self) -> int:
+        return len(self.buffer)
+
+    def __getitem__(self, index: int) -> float:
+        return self.buffer.key(index)
+
+
+class _BarSeries:
+    def __init__(self, seconds: float, capacity: int) -> None:
+        self.seconds = seconds
+        self.closed = RingBuffer(capacity, 6)
+        self.current: list[float] | None = None
+        self._bucket = 0
+
+    def add(self, time_seconds: float, price: float, volume: float) -> None:
+        bucket = floor(time_seconds / self.seconds)
+        if self.current is not None and bucket == self._bucket:
+            bar = self.current
+            bar[2] = max(bar[2], price)
+            bar[3] = min(bar[3], price)
+            bar[4] = price
+            bar[5] += volume
+            return
+        if self.current is not None:
+            self.closed.append(*self.current)
+        self._bucket = bucket
+        self.current = [bucket * self.seconds, price, price, price, price, volume]
+
+    def range(self, start: float, end: float) -> list[OHLCBar]:
+        rows = self.closed.range(start, end)
+        if self.current is not None and start <= self.current[0] <= end:
+            rows.append(tuple(self.current))
+        return [OHLCBar(*row) for row in rows]
+
+
+class PriceHistory:
+    def __init__(
+        self,
+        tick_capacity: int = 4096,
+        bar_capacity: int = 1440,
+        resolutions: dict[str, float] | None = None,
+    ) -> None:
+        self.tick_capacity = tick_capacity
+        self.bar_capacity = bar_capacity
+        self.resolutions = {"minute": 60.0, "hour": 3600.0} if resolutions is None else dict(resolutions)
+        if "tick" in self.resolutions:
+            raise ValueError("'tick' is reserved for raw samples")
+        for name, seconds in self.resolutions.items():
+            if seconds <= 0.0:
+                raise ValueError(f"resolution {name} must be positive")
+        if tick_capacity < 1 or bar_capacity < 1:
+            raise ValueError("capacities must be at least 1")
+        self._ticks: dict[str, RingBuffer] = {}
+        self._bars: dict[str, dict[str, _BarSeries]] = {}
+        self._pending_volume: dict[str, float] = {}
+
+    @property
+    def commodities(self) -> list[str]:
+        return list(self._ticks)
+
+    def record_fills(self, fills: list[OrderFill]) -> None:
+        for fill in fills:
+            name = fill.order.commodity
+            self._pending_volume[name] = self._pending_volume.get(name, 0.0) + fill.filled
+
+    def record(self, state: EconomyState, fills: list[OrderFill] | None = None) -> None:
+        for name in state.commodities:
+            ticks = self._ticks.get(name)
+            if ticks is not None and len(ticks) and state.time_seconds < ticks.key(-1):
+                raise ValueError("samples must be recorded in time order")
+        if fills:
+            self.record_fills(fills)
+        for name, commodity in state.commodities.items():
+            ticks = self._ticks.get(name)
+            if ticks is None:
+                ticks = self._ticks[name] = RingBuffer(self.tick_capacity, 3)
+                self._bars[name] = {
+                    resolution: _BarSeries(seconds, self.bar_capacity)
+                    for resolution, seconds in self.resolutions.items()
+                }
+
+            volume = self._pending_volume.pop(name, 0.0)
+            ticks.append(state.time_seconds, commodity.price, volume)
+            for series in self._bars[name].values():
+                series.add(state.time_seconds, commodity.price, volume)
+
+    def ticks(self, commodity: str, start: float = float("-inf"), end: float = float("inf")) -> list[PricePoint]:
+        return [PricePoint(*row) for row in self._series(commodity).range(start, end)]
+
+    def bars(
+        self,
+        commodity: str,
+        resolution: str,
+        start: float = float("-inf"),
+        end: float = float("inf"),
+    ) -> list[OHLCBar]:
+        series = self._series(commodity)
+        if resolution == "tick":
+            return [OHLCBar(t, p, p, p, p, v) for t, p, v in series.range(start, end)]
+        if resolution not in self.resolutions:
+            raise KeyError(f"Unknown resolution: {resolution}")
+        return self._bars[commodity][resolution].range(start, end)
+
+    def latest(self, commodity: str) -> PricePoint:
+        return PricePoint(*self._series(commodity)[-1])
+
+    def _series(self, commodity: str) -> RingBuffer:
+        series = self._ticks.get(commodity)
+        if series is None:
+            raise KeyError(f"Unknown commodity: {commodity}")
+        return series
@@ -0,0 +1,236 @@
+from __future__ import annotations
+
+import zlib
+from dataclasses import dataclass, field, replace
+from typing import Any
+
+from orbital_colony._workers import WorkerProcess
+
+from .engine import EconomyEngine, _copy_state
+from .models import EconomyConfig, EconomyState, Order, OrderFill
+
+Quote = tuple[float, float]
+
+
+@dataclass
+class ColonyMarket:
+    name: str
+    region: str
+    state: EconomyState = field(default_factory=EconomyState)
+
+
+@dataclass(frozen=True)
+class TradeRoute:
+    source: str
+    destination: str
+    commodity: str
+    delay_seconds: float
+    capacity: float
+    margin: float = 0.05
+
+
+@dataclass
+class Shipment:
+    route: TradeRoute
+    quantity: float
+    arrival_seconds: float
+
+
+def market_seed(seed: int, market_name: str) -> int:
+    return (seed * 1_000_003) ^ zlib.crc32(market_name.encode("utf-8"))
+
+
+def _copy_market(market: ColonyMarket) -> ColonyMarket:
+    return ColonyMarket(name=market.name, region=market.region, state=_copy_state(market.state))
+
+
+class RegionShard:
+    def __init__(
+        self,
+        config: EconomyConfig,
+        markets: list[ColonyMarket],
+        routed: dict[str, list[str]] | None = None,
+    ) -> None:
+        self.markets = {market.name: _copy_market(market) for market in markets}
+        # Commodities per market that sit on an inter-region route; only their quotes leave the shard.
+        self.routed = {
+            name: list(commodities) for name, commodities in (routed or {}).items() if name in self.markets
+        }
+        self.engines = {
+            market.name: EconomyEngine(replace(config, rng_seed=market_seed(config.rng_seed, market.name)))
+            for market in markets
+        }
+
+    def tick(
+        self,
+        orders: dict[str, list[Order]],
+        dt_seconds: float,
+    ) -> tuple[dict[str, list[OrderFill]], dict[str, dict[str, Quote]]]:
+        fills: dict[str, list[OrderFill]] = {}
+        for name, market_orders in orders.items():
+            fills[name] = self.engines[name].submit_orders_in_place(self.markets[name].state, market_orders)
+        for name, market in self.markets.items():
+            self.engines[name].step_in_place(market.state, dt_seconds)
+        return fills, self.route_quotes()
+
+    def quotes(self) -> dict[str, dict[str, Quote]]:
+        return {
+            name: {key: (c.price, c.inventory) for key, c in market.state.commodities.items()}
+            for name, market in self.markets.items()
+        }
+
+    def route_quotes(self) -> dict[str, dict[str, Quote]]:
+        quotes: dict[str, dict[str, Quote]] = {}
+        for name, commodities in self.routed.items():
+            market = self.markets[name].state.commodities
+            quotes[name] = {key: (market[key].price, market[key].inventory) for key in commodities}
+        return quotes
+
+    def snapshot(self) -> list[ColonyMarket]:
+        return [_copy_market(market) for market in self.markets.values()]
+
+    def handle(self, command: str, payload: Any) -> Any:
+        if command == "tick":
+            return self.tick(*payload)
+        if command == "quotes":
+            return self.route_quotes()
+        if command == "snapshot":
+            return self.snapshot()
+        raise ValueError(f"Unknown shard command: {command}")
+
+
+class _ProcessShard(WorkerProcess):
+    def __init__(self, config: EconomyConfig, markets: list[ColonyMarket], routed: dict[str, list[str]]) -> None:
+        super().__init__(RegionShard, config, markets, routed)
+
+
+class _LocalShard:
+    def __init__(self, config: EconomyConfig, markets: list[ColonyMarket], routed: dict[str, list[str]]) -> None:
+        self.shard = RegionShard(config, markets, routed)
+        self._reply: Any = None
+
+    def send(self, command: str, payload: Any = None) -> None:
+        self._reply = self.shard.handle(command, payload)
+
+    def receive(self) -> Any:
+        reply, self._reply = self._reply, None
+        return reply
+
+    def close(self) -> None:
+        pass
+
+
+class MarketNetwork:
+    def __init__(
+        self,
+        markets: list[ColonyMarket],
+        routes: list[TradeRoute],
+        config: EconomyConfig | None = None,
+        workers: int = 0,
+    ) -> None:
+        if workers < 0:
+            raise ValueError("workers must be non-negative")
+        self.config = config or EconomyConfig()
+        self.routes = list(routes)
+        self.in_transit: list[Shipment] = []
+        self.time_seconds = 0.0
+
+        by_name = {market.name: market for market in markets}
+        if len(by_name) != len(markets):
+            raise ValueError("market names must be unique")
+        for route in self.routes:
+            for name in (route.source, route.destination):
+                if name not in by_name:
+                    raise KeyError(f"Unknown market: {name}")
+                if route.commodity not in by_name[name].state.commodities:
+                    raise KeyError(f"Unknown commodity: {route.commodity}")
+            if route.source == route.destination:
+                raise ValueError("a route must link two different markets")
+            if route.delay_seconds < 0.0 or route.capacity < 0.0:
+                raise ValueError("route delay and capacity must be non-negative")
+
+        regions: dict[str, list[ColonyMarket]] = {}
+        for market in markets:
+            regions.setdefault(market.region, []).append(market)
+        shard_count = min(workers, len(regions)) if workers else 1
+        groups: list[list[ColonyMarket]] = [[] for _ in range(shard_count)]
+        for index, region_markets in enumerate(regions.values()):
+            groups[index % shard_count].extend(region_markets)
+
+        routed: dict[str, list[str]] = {}
+        for route in self.routes:
+            for name in (route.source, route.destination):
+                if route.commodity not in routed.setdefault(name, []):
+                    routed[name].append(route.commodity)
+        shard_type = _ProcessShard if workers else _LocalShard
+        self._shards = [shard_type(self.config, group, routed) for group in groups]
+        self._shard_of = {market.name: index for index, group in enumerate(groups) for market in group}
+        self.market_names = [market.name for market in markets]
+        self.quotes: dict[str, dict[str, Quote]] = {}
+        for shard in self._shards:
+            shard.send("quotes")
+        for shard in self._shards:
+            self.quotes.update(shard.receive())
+
+    def __enter__(self) -> MarketNetwork:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        for shard in self._shards:
+            shard.close()
+        self._shards = []
+
+    def step(self, dt_seconds: float) -> list[Shipment]:
+        if dt_seconds <= 0:
+            raise ValueError("dt_seconds must be positive")
+
+        orders: dict[str, list[Order]] = {}
+        arrived = [s for s in self.in_transit if s.arrival_seconds <= self.time_seconds]
+        self.in_transit = [s for s in self.in_transit if s.arrival_seconds > self.time_seconds]
+        for shipment in arrived:
+            route = shipment.route
+            orders.setdefault(route.destination, []).append(Order(route.commodity, "sell", shipment.quantity))
+
+        exports: list[tuple[TradeRoute, int]] = []
+        for route in self.routes:
+            source_price, source_inventory = self.quotes[route.source][route.commodity]
+            destination_price, _ = self.quotes[route.destination][route.commodity]
+            quantity = route.capacity * dt_seconds
+            profitable = destination_price > source_price * (1.0 + route.margin)
+            if not profitable or source_inventory <= 0.0 or quantity <= 0.0:
+                continue
+            market_orders = orders.setdefault(route.source, [])
+            exports.append((route, len(market_orders)))
+            market_orders.append(Order(route.commodity, "buy", quantity))
+
+        fills = self._tick(orders, dt_seconds)
+        for route, index in exports:
+            filled = fills[route.source][index].filled
+            if filled > 0.0:
+                self.in_transit.append(Shipment(route, filled, self.time_seconds + route.delay_seconds))
+
+        self.time_seconds += dt_seconds
+        return arrived
+
+    def _tick(self, orders: dict[str, list[Order]], dt_seconds: float) -> dict[str, list[OrderFill]]:
+        shard_orders: list[dict[str, list[Order]]] = [{} for _ in self._shards]
+        for name, market_orders in orders.items():
+            shard_orders[self._shard_of[name]][name] = market_orders
+        for shard, payload in zip(self._shards, shard_orders):
+            shard.send("tick", (payload, dt_seconds))
+
+        fills: dict[str, list[OrderFill]] = {}
+        for shard in self._shards:
+            shard_fills, quotes = shard.receive()
+            fills.update(shard_fills)
+            self.quotes.update(quotes)
+        return fills
+
+    def markets(self) -> list[ColonyMarket]:
+        for shard in self._shards:
+            shard.send("snapshot")
+        snapshot = {market.name: market for shard in self._shards for market in shard.receive()}
+        return [snapshot[name] for name in self.market_names]
@@ -13,6 +13,21 @@ class CommodityState:
     last_volatility: float = 0.0
 
 
+@dataclass(frozen=True)
+class Order:
+    commodity: str
+    side: str
+    quantity: float
+
+
+@dataclass
+class OrderFill:
+    order: Order
+    filled: float
+    cost: float = 0.0
+    revenue: float = 0.0
+
+
 @dataclass
 class EconomyConfig:
     elasticity: float = 0.35
@@ -23,6 +38,7 @@ class EconomyConfig:
     min_inventory: float = 0.0
     rng_seed: int = 7
     max_volatility_abs: float = 0.25
+    rng_mode: str = "sequential"
     base_prices: dict[str, float] = field(
         default_factory=lambda: {
             "OXYGEN": 10.0,
@@ -36,3 +52,4 @@ class EconomyConfig:
 class EconomyState:
     commodities: dict[str, CommodityState] = field(default_factory=dict)
     time_seconds: float = 0.0
+    tick: int = 0
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import zlib
+from math import cos, log, pi, sqrt
+from typing import Any, Iterable
+
+from orbital_colony._numeric import require_numpy
+
+# Philox4x32-10 (Salmon et al., "Parallel random numbers: as easy as 1, 2, 3", SC'11).
+_MASK = 0xFFFFFFFF
+_PHILOX_M0 = 0xD2511F53
+_PHILOX_M1 = 0xCD9E8D57
+_PHILOX_W0 = 0x9E3779B9
+_PHILOX_W1 = 0xBB67AE85
+_ROUNDS = 10
+_INV_2_53 = 1.0 / 9007199254740992.0
+
+Counter = tuple[int, int, int, int]
+Key = tuple[int, int]
+
+
+def philox4x32(counter: Counter, key: Key) -> Counter:
+    c0, c1, c2, c3 = counter
+    k0, k1 = key
+    for index in range(_ROUNDS):
+        if index:
+            k0 = (k0 + _PHILOX_W0) & _MASK
+            k1 = (k1 + _PHILOX_W1) & _MASK
+        product0 = _PHILOX_M0 * c0
+        product1 = _PHILOX_M1 * c2
+        c0, c1, c2, c3 = (
+            (product1 >> 32) ^ c1 ^ k0,
+            product1 & _MASK,
+            (product0 >> 32) ^ c3 ^ k1,
+            product0 & _MASK,
+        )
+    return c0, c1, c2, c3
+
+
+def stream_key(seed: int, name: str) -> Key:
+    return seed & _MASK, zlib.crc32(name.encode("utf-8"))
+
+
+def _counter(seed: int, tick: int, stream: int) -> Counter:
+    return tick & _MASK, (tick >> 32) & _MASK, stream & _MASK, (seed >> 32) & _MASK
+
+
+def _box_muller(x0: int, x1: int, x2: int, x3: int) -> float:
+    u1 = (((x0 >> 5) * 67108864 + (x1 >> 6)) + 0.5) * _INV_2_53
+    u2 = ((x2 >> 5) * 67108864 + (x3 >> 6)) * _INV_2_53
+    return sqrt(-2.0 * log(u1)) * cos(2.0 * pi * u2)
+
+
+def counter_normal(seed: int, name: str, tick: int, stream: int = 0) -> float:
+    return _box_muller(*philox4x32(_counter(seed, tick, stream), stream_key(seed, name)))
+
+
+def counter_normals(seed: int, names: Iterable[str], ticks: Any, stream: int = 0) -> Any:
+    numpy = require_numpy()
+    key1 = numpy.array([stream_key(seed, name)[1] for name in names], dtype=numpy.uint64)
+    ticks = numpy.asarray(ticks, dtype=numpy.uint64)[..., None]
+    shape = numpy.broadcast_shapes(ticks.shape, key1.shape)
+    mask = numpy.uint64(_MASK)
+
+    c0 = numpy.broadcast_to(ticks & mask, shape)
+    c1 = numpy.broadcast_to(ticks >> numpy.uint64(32), shape)
+    c2 = numpy.full(shape, stream & _MASK, dtype=numpy.uint64)
+    c3 = numpy.full(shape, (seed >> 32) & _MASK, dtype=numpy.uint64)
+    k0 = numpy.uint64(seed & _MASK)
+    k1 = key1
+
+    shift = numpy.uint64(32)
+    m0 = numpy.uint64(_PHILOX_M0)
+    m1 = numpy.uint64(_PHILOX_M1)
+    for index in range(_ROUNDS):
+        if index:
+            k0 = (k0 + numpy.uint64(_PHILOX_W0)) & mask
+            k1 = (k1 + numpy.uint64(_PHILOX_W1)) & mask
+        product0 = m0 * c0
+        product1 = m1 * c2
+        c0, c1, c2, c3 = (
+            (product1 >> shift) ^ c1 ^ k0,
+            product1 & mask,
+            (product0 >> shift) ^ c3 ^ k1,
+            product0 & mask,
+        )
+
+    u1 = ((c0 >> numpy.uint64(5)) * numpy.uint64(67108864) + (c1 >> numpy.uint64(6))).astype(float)
+    u2 = ((c2 >> numpy.uint64(5)) * numpy.uint64(67108864) + (c3 >> numpy.uint64(6))).astype(float)
+    u1 = (u1 + 0.5) * _INV_2_53
+    u2 = u2 * _INV_2_53
+    return numpy.sqrt(-2.0 * numpy.log(u1)) * numpy.cos(2.0 * pi * u2)
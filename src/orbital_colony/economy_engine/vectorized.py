@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+from orbital_colony._numeric import HAS_NUMPY, require_numpy
+
+from .models import CommodityState, EconomyConfig, EconomyState
+
+
+@dataclass
+class EconomyArrays:
+    names: list[str]
+    price: Any
+    supply_rate: Any
+    demand_rate: Any
+    inventory: Any
+    last_volatility: Any
+    time_seconds: float = 0.0
+    tick: int = 0
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def index_of(self, name: str) -> int:
+        try:
+            return self.names.index(name)
+        except ValueError:
+            raise KeyError(f"Unknown commodity: {name}") from None
+
+
+def pack_economy(state: EconomyState) -> EconomyArrays:
+    numpy = require_numpy()
+    commodities = list(state.commodities.values())
+
+    def column(attribute: str) -> Any:
+        return numpy.array([getattr(c, attribute) for c in commodities], dtype=float)
+
+    return EconomyArrays(
+        names=list(state.commodities),
+        price=column("price"),
+        supply_rate=column("supply_rate"),
+        demand_rate=column("demand_rate"),
+        inventory=column("inventory"),
+        last_volatility=column("last_volatility"),
+        time_seconds=state.time_seconds,
+        tick=state.tick,
+    )
+
+
+def unpack_economy(arrays: EconomyArrays) -> EconomyState:
+    return EconomyState(
+        commodities={
+            key: CommodityState(
+                name=key,
+                price=price,
+                supply_rate=supply_rate,
+                demand_rate=demand_rate,
+                inventory=inventory,
+                last_volatility=last_volatility,
+            )
+            for key, price, supply_rate, demand_rate, inventory, last_volatility in zip(
+                arrays.names,
+                arrays.price.tolist(),
+                arrays.supply_rate.tolist(),
+                arrays.demand_rate.tolist(),
+                arrays.inventory.tolist(),
+                arrays.last_volatility.tolist(),
+            )
+        },
+        time_seconds=arrays.time_seconds,
+        tick=arrays.tick,
+    )
+
+
+def advance_arrays(arrays: EconomyArrays, raw_shocks: Any, dt_seconds: float, config: EconomyConfig) -> None:
+    numpy = require_numpy()
+    price = arrays.price
+    supply = arrays.supply_rate
+    demand = arrays.demand_rate
+
+    imbalance = (demand - supply) / numpy.maximum(supply, 1e-6)
+    target_price = price * (1.0 + config.elasticity * imbalance)
+    damped_price = price + config.damping * (target_price - price)
+
+    shock = numpy.maximum(-config.max_volatility_abs, numpy.minimum(raw_shocks, config.max_volatility_abs))
+    candidate_price = damped_price * (1.0 + shock)
+    ratio_step = (candidate_price - price) / numpy.maximum(price, 1e-6)
+    ratio_step = numpy.maximum(
+        -config.max_price_step_ratio,
+        numpy.minimum(ratio_step, config.max_price_step_ratio),
+    )
+    numpy.maximum(config.min_price, price * (1.0 + ratio_step), out=price)
+    arrays.last_volatility[...] = shock
+
+    arrays.inventory += (supply - demand) * dt_seconds
+    numpy.maximum(config.min_inventory, arrays.inventory, out=arrays.inventory)
+
+
+def advance_arrays_bulk(arrays: EconomyArrays, raw_shocks: Any, dt_seconds: float, config: EconomyConfig) -> None:
+    numpy = require_numpy()
+    ticks = raw_shocks.shape[0]
+    if ticks == 0:
+        return
+    supply = arrays.supply_rate
+    demand = arrays.demand_rate
+
+    imbalance = (demand - supply) / numpy.maximum(supply, 1e-6)
+    damping_factor = 1.0 + config.damping * config.elasticity * imbalance
+    shock = numpy.clip(raw_shocks, -config.max_volatility_abs, config.max_volatility_abs)
+    ratio_step = numpy.clip(
+        damping_factor * (1.0 + shock) - 1.0,
+        -config.max_price_step_ratio,
+        config.max_price_step_ratio,
+    )
+
+    # log p_{t+1} = max(log min_price, log p_t + log g_t) unrolls to
+    # log p_N = S_N + max(log p_0, max_k(log min_price - S_k)) with S_k the cumulative log growth.
+    log_growth = numpy.cumsum(numpy.log1p(ratio_step), axis=0)
+    barrier = (numpy.log(config.min_price) - log_growth).max(axis=0)
+    log_price = log_growth[-1] + numpy.maximum(numpy.log(arrays.price), barrier)
+    # A runaway price overflows to inf here, as the scalar path's repeated multiplication does.
+    with numpy.errstate(over="ignore"):
+        numpy.maximum(config.min_price, numpy.exp(log_price), out=arrays.price)
+    arrays.last_volatility[...] = shock[-1]
+
+    drift = (supply - demand) * dt_seconds
+    numpy.maximum(
+        arrays.inventory + ticks * drift,
+        config.min_inventory + numpy.maximum(0.0, (ticks - 1) * drift),
+        out=arrays.inventory,
+    )
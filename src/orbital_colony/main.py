@@ -5,7 +5,7 @@ from dataclasses import dataclass
 from orbital_colony.core_physics import CelestialBody, ColonyNode, PhysicsEngine, PhysicsState
 from orbital_colony.economy_engine import EconomyEngine, EconomyState
 from orbital_colony.npc_ai import Drone, NpcAiEngine, NpcWorldState
-from orbital_colony.rendering_layer import FrameData, RenderEngine, SceneAdapter
+from orbital_colony.rendering_layer import FrameData, RenderEngine, RetainedSceneAdapter, SceneAdapter
 from orbital_colony.shared import GameConfig
 
 
@@ -28,7 +28,7 @@ def create_default_runtime(config: GameConfig | None = None) -> GameRuntime:
     physics_engine = PhysicsEngine(cfg.physics)
     economy_engine = EconomyEngine(cfg.economy)
     npc_engine = NpcAiEngine(cfg.npc)
-    scene_adapter = SceneAdapter()
+    scene_adapter = RetainedSceneAdapter() if cfg.retained_scene else SceneAdapter()
     render_engine = RenderEngine(cfg.render)
 
     physics_state = PhysicsState(
@@ -66,14 +66,18 @@ def create_default_runtime(config: GameConfig | None = None) -> GameRuntime:
 
 
 def step_runtime(runtime: GameRuntime, dt_seconds: float) -> FrameData:
-    runtime.physics_state = runtime.physics_engine.step(runtime.physics_state, dt_seconds)
-    runtime.economy_state = runtime.economy_engine.step(runtime.economy_state, dt_seconds)
-
-    runtime.drones, runtime.npc_world = runtime.npc_engine.step(
-        runtime.drones,
-        runtime.npc_world,
-        dt_seconds,
-    )
+    if runtime.config.in_place_stepping:
+        runtime.physics_engine.step_in_place(runtime.physics_state, dt_seconds)
+        runtime.economy_engine.step_in_place(runtime.economy_state, dt_seconds)
+        runtime.npc_engine.step_in_place(runtime.drones, runtime.npc_world, dt_seconds)
+    else:
+        runtime.physics_state = runtime.physics_engine.step(runtime.physics_state, dt_seconds)
+        runtime.economy_state = runtime.economy_engine.step(runtime.economy_state, dt_seconds)
+        runtime.drones, runtime.npc_world = runtime.npc_engine.step(
+            runtime.drones,
+            runtime.npc_world,
+            dt_seconds,
+        )
 
     for commodity in ("OXYGEN", "FUEL", "METALS"):
         delivered = runtime.npc_world.colony_inventory.get(commodity, 0.0)
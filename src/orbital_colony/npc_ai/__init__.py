@@ -1,10 +1,33 @@
+from .catchup import CatchUpResult, catch_up
 from .engine import NpcAiEngine
+from .fleet import HAS_NUMPY, DroneFleet, pack_fleet, unpack_fleet
+from .lod import AggregateFleet, LodColony, collapse_fleet, expand_fleet
 from .models import Drone, DroneState, NpcConfig, NpcWorldState
+from .parallel import DroneProposal, ParallelDroneStepper, propose_drones
+from .resources import ResourceNodes
+from .scheduler import DroneScheduler
+from .spatial import SpatialHash
 
 __all__ = [
+    "HAS_NUMPY",
+    "AggregateFleet",
+    "CatchUpResult",
     "DroneState",
     "Drone",
+    "DroneFleet",
+    "DroneScheduler",
     "NpcConfig",
     "NpcWorldState",
+    "DroneProposal",
+    "ParallelDroneStepper",
+    "ResourceNodes",
+    "SpatialHash",
     "NpcAiEngine",
+    "catch_up",
+    "LodColony",
+    "collapse_fleet",
+    "expand_fleet",
+    "pack_fleet",
+    "propose_drones",
+    "unpack_fleet",
 ]
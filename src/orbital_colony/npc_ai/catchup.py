@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+from copy import copy
+from dataclasses import dataclass
+from math import floor
+
+from .engine import NpcAiEngine, _available_resource
+from .lod import flow_rates, travel_seconds
+from .models import Drone, DroneState, NpcWorldState
+from .scheduler import _gather_ticks, _recharge_ticks, _settle
+
+Amounts = dict[str, float]
+
+# Stand-in quantity for every stocked node while a drone is run on its own; reset after each draw.
+_PROBE_STOCK = 1.0e6
+# Loads a drone's rhythm is measured over, so the part load left at either end averages out, and the most
+# energy cycles (or trips) that may take.
+_MEASURED_LOADS = 100
+_MAX_STRETCHES = 256
+
+
+@dataclass(frozen=True)
+class CatchUpResult:
+    ticks: int
+    stepped_ticks: int
+    skipped_ticks: int
+
+
+@dataclass(frozen=True)
+class _Cycle:
+    ticks: int | None
+    delivered: float
+    commodity: str | None
+
+
+def _add(total: Amounts, amounts: Amounts, scale: float = 1.0) -> None:
+    for name, amount in amounts.items():
+        total[name] = total.get(name, 0.0) + amount * scale
+
+
+class _LocalRun:
+    # Steps a single drone against a private world in which every stocked node is bottomless and nothing is
+    # damaged, recording what it draws and delivers. While no node runs dry and the colony is undamaged, the
+    # drones of a fleet never see each other, so each one can be advanced on its own.
+    def __init__(self, engine: NpcAiEngine, world: NpcWorldState, dt_seconds: float) -> None:
+        self.engine = engine
+        self.dt_seconds = dt_seconds
+        self.take = engine.config.gather_rate * dt_seconds
+        self.world = NpcWorldState(
+            resource_nodes={name: _PROBE_STOCK if qty > 0.0 else 0.0 for name, qty in world.resource_nodes.items()},
+            resource_priority=list(world.resource_priority),
+            resource_positions=dict(world.resource_positions),
+            colony_position=world.colony_position,
+        )
+
+    def run(
+        self,
+        drone: Drone,
+        ticks: int,
+        until: DroneState | None = None,
+    ) -> tuple[Drone, int, Amounts, Amounts]:
+        # Recharges and undisturbed stretches of gathering are settled in one go, as the scheduler does; only
+        # the ticks that make a decision are stepped. With `until`, the run stops on the tick that enters it.
+        config = self.engine.config
+        drone = copy(drone)
+        drawn: Amounts = {}
+        delivered: Amounts = {}
+        nodes = self.world.resource_nodes
+        inventory = self.world.colony_inventory
+        left = ticks
+        while left > 0:
+            target = drone.target_resource
+            if drone.state == DroneState.RECHARGE:
+                skip = _recharge_ticks(config, drone, self.dt_seconds, left)
+            elif drone.state == DroneState.GATHER and target is not None and nodes.get(target, 0.0) > 0.0:
+                skip = _gather_ticks(config, drone, self.dt_seconds, left)
+            else:
+                skip = 0
+            if skip > 0:
+                if drone.state == DroneState.GATHER:
+                    drawn[target] = drawn.get(target, 0.0) + skip * self.take
+                _settle(config, drone, drone.state, target, skip, self.dt_seconds)
+                left -= skip
+                continue
+
+            before = vars(drone).copy()
+            capacity = max(0.0, drone.cargo_capacity - drone.cargo_amount)
+            self.engine.step_drone(drone, self.world, self.dt_seconds)
+            left -= 1
+            entered = until is not None and drone.state == until and before["state"] != until
+            if target is not None and nodes.get(target, 0.0) not in (_PROBE_STOCK, 0.0):
+                drawn[target] = drawn.get(target, 0.0) + min(self.take, capacity)
+                nodes[target] = _PROBE_STOCK
+            elif not inventory and vars(drone) == before:
+                # Nothing moved and the private world is unchanged, so every later tick is this one again.
+                break
+            if inventory:
+                _add(delivered, inventory)
+                inventory.clear()
+            if entered:
+                break
+        return drone, ticks - left, drawn, delivered
+
+
+def _commodity(engine: NpcAiEngine, world: NpcWorldState, drone: Drone) -> str | None:
+    config = engine.config
+    if config.target_selection == "nearest":
+        point = world.colony_position if world.colony_position is not None else drone.position
+        target = world.nearest_resource(point, config.spatial_cell_size)
+        if target is not None:
+            return target
+    return _available_resource(world.resource_priority, world.resource_nodes)
+
+
+def _cycle(engine: NpcAiEngine, world: NpcWorldState, drone: Drone, dt_seconds: float) -> _Cycle:
+    # A drone that has settled into its rhythm repeats one energy cycle (or one trip, if it never runs low)
+    # and draws on average what it delivers over it. Each stretch ends with whatever part load the drone
+    # happens to carry, so a probe drone is run over enough of them for that to average out.
+    config = engine.config
+    commodity = _commodity(engine, world, drone)
+    if drone.max_energy < config.resume_energy_threshold:
+        return _Cycle(None, 0.0, commodity)
+    travel = travel_seconds(config, world, commodity)
+    rates = flow_rates(config, 1, drone.cargo_capacity, dt_seconds, travel)
+    seconds = rates.cycle_seconds if rates.cycle_seconds != float("inf") else rates.trip_seconds
+    if seconds == float("inf") or (rates.cycle_seconds == float("inf") and rates.duty_cycle <= 0.0):
+        return _Cycle(None, 0.0, commodity)
+
+    boundary = DroneState.RECHARGE if rates.cycle_seconds != float("inf") else DroneState.IDLE
+    budget = 4 * max(1, round(seconds / dt_seconds))
+    local = _LocalRun(engine, world, dt_seconds)
+    probe = Drone(
+        id=drone.id, position=drone.position, max_energy=drone.max_energy, cargo_capacity=drone.cargo_capacity
+    )
+    marks: list[tuple[int, float]] = []
+    elapsed = 0
+    drawn = 0.0
+    while len(marks) < 2 or (
+        commodity is not None
+        and marks[-1][1] - marks[0][1] < _MEASURED_LOADS * drone.cargo_capacity
+        and len(marks) <= _MAX_STRETCHES
+    ):
+        probe, ran, own_drawn, _ = local.run(probe, budget, until=boundary)
+        elapsed += ran
+        drawn += sum(own_drawn.values())
+        if probe.state != boundary or ran >= budget:
+            # No steady rhythm, so the drone is always run on its own.
+            return _Cycle(None, 0.0, commodity)
+        marks.append((elapsed, drawn))
+    (start, first), (end, last) = marks[0], marks[-1]
+    ticks = max(1, round((end - start) / (len(marks) - 1)))
+    delivered = (last - first) * ticks / (end - start) if commodity is not None else 0.0
+    return _Cycle(ticks, delivered, commodity)
+
+
+def _safe_ticks(world: NpcWorldState, drones: list[Drone], cycles: list[_Cycle], left: int, take: float) -> int:
+    # The repeated cycles draw at a steady rate and each drone's leftover run draws at most about one more
+    # cycle plus a load, so the span is cut where that could bring a node within reach of running dry.
+    rate: Amounts = {}
+    slack = 0.0
+    touched = set()
+    for drone, cycle in zip(drones, cycles):
+        slack += 2.0 * cycle.delivered + drone.cargo_capacity + take
+        if cycle.commodity is not None and cycle.ticks is not None:
+            rate[cycle.commodity] = rate.get(cycle.commodity, 0.0) + cycle.delivered / cycle.ticks
+            touched.add(cycle.commodity)
+        for name in (drone.target_resource, drone.cargo_type):
+            if name is not None:
+                touched.add(name)
+    ticks = left
+    for name in touched:
+        stock = world.resource_nodes.get(name, 0.0)
+        if stock <= 0.0:
+            continue
+        if stock <= slack:
+            return 0
+        if rate.get(name, 0.0) > 0.0:
+            ticks = min(ticks, floor((stock - slack) / rate[name]))
+    return ticks
+
+
+def catch_up(
+    engine: NpcAiEngine,
+    drones: list[Drone],
+    world: NpcWorldState,
+    seconds: float,
+    dt_seconds: float,
+) -> CatchUpResult:
+    if dt_seconds <= 0:
+        raise ValueError("dt_seconds must be positive")
+    if seconds < 0:
+        raise ValueError("seconds must be non-negative")
+    total = round(seconds / dt_seconds)
+    take = engine.config.gather_rate * dt_seconds
+    done = stepped = 0
+    classes: dict[tuple[float, float, str | None], _Cycle] = {}
+
+    while done < total:
+        left = total - done
+        if world.colony_damage > 0.0 or not drones:
+            engine.step_in_place(drones, world, dt_seconds)
+            done += 1
+            stepped += 1
+            continue
+
+        cycles = []
+        for drone in drones:
+            commodity = _commodity(engine, world, drone)
+            key = (drone.cargo_capacity, drone.max_energy, commodity)
+            if key not in classes:
+                classes[key] = _cycle(engine, world, drone, dt_seconds)
+            cycles.append(classes[key])
+        longest = max((cycle.ticks for cycle in cycles if cycle.ticks is not None), default=left)
+        ticks = _safe_ticks(world, drones, cycles, left, take)
+
+        plan: list[Drone] = []
+        drawn: Amounts = {}
+        delivered: Amounts = {}
+        if ticks > 0:
+            local = _LocalRun(engine, world, dt_seconds)
+            for drone, cycle in zip(drones, cycles):
+                repeats, rest = divmod(ticks, cycle.ticks) if cycle.ticks is not None else (0, ticks)
+                advanced, _, own_drawn, own_delivered = local.run(drone, rest)
+                if repeats and cycle.commodity is not None and cycle.delivered > 0.0:
+                    repeated = {cycle.commodity: cycle.delivered}
+                    _add(own_drawn, repeated, repeats)
+                    _add(own_delivered, repeated, repeats)
+                    advanced.delivered_total += repeats * cycle.delivered
+                plan.append(advanced)
+                _add(drawn, own_drawn)
+                _add(delivered, own_delivered)
+
+        if not plan or any(amount >= world.resource_nodes.get(name, 0.0) for name, amount in drawn.items()):
+            # Close to running dry the drones do contend for what is left, so those ticks are stepped.
+            chunk = min(left, longest)
+            for _ in range(chunk):
+                engine.step_in_place(drones, world, dt_seconds)
+            done += chunk
+            stepped += chunk
+            continue
+
+        for drone, advanced in zip(drones, plan):
+            vars(drone).update(vars(advanced))
+        for name, amount in drawn.items():
+            world.resource_nodes[name] -= amount
+        for name, amount in delivered.items():
+            world.colony_inventory[name] = world.colony_inventory.get(name, 0.0) + amount
+        world.time_seconds += ticks * dt_seconds
+        done += ticks
+
+    return CatchUpResult(ticks=total, stepped_ticks=stepped, skipped_ticks=total - stepped)
@@ -1,11 +1,16 @@
 from __future__ import annotations
 
 from dataclasses import replace
+from math import sqrt
 
+from .fleet import DroneFleet, advance_fleet
 from .models import Drone, DroneState, NpcConfig, NpcWorldState
+from .resources import ResourceNodes
 
 
 def _available_resource(priority: list[str], resources: dict[str, float]) -> str | None:
+    if isinstance(resources, ResourceNodes):
+        return resources.first_available(priority)
     for name in priority:
         if resources.get(name, 0.0) > 0.0:
             return name
@@ -18,6 +23,12 @@ def _available_resource(priority: list[str], resources: dict[str, float]) -> str
 class NpcAiEngine:
     def __init__(self, config: NpcConfig | None = None) -> None:
         self.config = config or NpcConfig()
+        if self.config.target_selection not in ("priority", "nearest"):
+            raise ValueError(f"Unknown target selection: {self.config.target_selection}")
+        if self.config.drone_speed < 0.0:
+            raise ValueError("drone_speed must be non-negative")
+        if self.config.spatial_cell_size <= 0.0:
+            raise ValueError("spatial_cell_size must be positive")
 
     def step(
         self,
@@ -29,16 +40,54 @@ class NpcAiEngine:
             raise ValueError("dt_seconds must be positive")
 
         next_world = NpcWorldState(
-            resource_nodes=dict(world.resource_nodes),
+            resource_nodes=ResourceNodes(world.resource_nodes),
             colony_inventory=dict(world.colony_inventory),
             colony_damage=world.colony_damage,
             resource_priority=list(world.resource_priority),
             time_seconds=world.time_seconds + dt_seconds,
+            resource_positions=dict(world.resource_positions),
+            colony_position=world.colony_position,
         )
-        next_drones = [self._step_drone(replace(drone), next_world, dt_seconds) for drone in drones]
+        next_drones = [self.step_drone(replace(drone), next_world, dt_seconds) for drone in drones]
         return next_drones, next_world
 
-    def _step_drone(self, drone: Drone, world: NpcWorldState, dt_seconds: float) -> Drone:
+    def step_in_place(
+        self,
+        drones: list[Drone],
+        world: NpcWorldState,
+        dt_seconds: float,
+    ) -> tuple[list[Drone], NpcWorldState]:
+        if dt_seconds <= 0:
+            raise ValueError("dt_seconds must be positive")
+
+        world.time_seconds += dt_seconds
+        for drone in drones:
+            self.step_drone(drone, world, dt_seconds)
+        return drones, world
+
+    def step_fleet(
+        self,
+        fleet: DroneFleet,
+        world: NpcWorldState,
+        dt_seconds: float,
+    ) -> tuple[DroneFleet, NpcWorldState]:
+        if dt_seconds <= 0:
+            raise ValueError("dt_seconds must be positive")
+        if self.config.target_selection != "priority" or (
+            self.config.drone_speed > 0.0 and (world.resource_positions or world.colony_position is not None)
+        ):
+            raise ValueError("step_fleet does not support spatial targeting or drone movement")
+
+        world.time_seconds += dt_seconds
+        for name in world.resource_nodes:
+            fleet.name_code(name)
+        start = 0
+        while start < len(fleet):
+            available = _available_resource(world.resource_priority, world.resource_nodes)
+            start = advance_fleet(fleet, start, world, dt_seconds, self.config, available)
+        return fleet, world
+
+    def step_drone(self, drone: Drone, world: NpcWorldState, dt_seconds: float) -> Drone:
         if drone.energy <= self.config.low_energy_threshold and drone.state != DroneState.RECHARGE:
             drone.state = DroneState.RECHARGE
             drone.target_resource = None
@@ -46,7 +95,7 @@ class NpcAiEngine:
         if drone.state == DroneState.IDLE:
             self._on_idle(drone, world)
         elif drone.state == DroneState.SEEK_RESOURCE:
-            self._on_seek_resource(drone, world)
+            self._on_seek_resource(drone, world, dt_seconds)
         elif drone.state == DroneState.GATHER:
             self._on_gather(drone, world, dt_seconds)
         elif drone.state == DroneState.DELIVER:
@@ -69,26 +118,51 @@ class NpcAiEngine:
             drone.state = DroneState.REPAIR
             return
 
-        target = _available_resource(world.resource_priority, world.resource_nodes)
+        target = self._select_target(drone, world)
         if target is not None:
             drone.state = DroneState.SEEK_RESOURCE
             drone.target_resource = target
         else:
             drone.target_resource = None
 
-    def _on_seek_resource(self, drone: Drone, world: NpcWorldState) -> None:
-        target = drone.target_resource or _available_resource(world.resource_priority, world.resource_nodes)
+    def _on_seek_resource(self, drone: Drone, world: NpcWorldState, dt_seconds: float) -> None:
+        target = drone.target_resource or self._select_target(drone, world)
         if target is None:
             drone.state = DroneState.IDLE
             drone.target_resource = None
             return
         if world.resource_nodes.get(target, 0.0) <= 0.0:
-            drone.target_resource = _available_resource(world.resource_priority, world.resource_nodes)
+            drone.target_resource = self._select_target(drone, world)
             if drone.target_resource is None:
                 drone.state = DroneState.IDLE
                 return
+            target = drone.target_resource
+        destination = world.resource_positions.get(target)
+        if destination is not None and self.config.drone_speed > 0.0:
+            drone.target_resource = target
+            if not self._travel(drone, destination, dt_seconds):
+                return
         drone.state = DroneState.GATHER
 
+    def _select_target(self, drone: Drone, world: NpcWorldState) -> str | None:
+        if self.config.target_selection == "nearest":
+            target = world.nearest_resource(drone.position, self.config.spatial_cell_size)
+            if target is not None:
+                return target
+        return _available_resource(world.resource_priority, world.resource_nodes)
+
+    def _travel(self, drone: Drone, destination: tuple[float, float], dt_seconds: float) -> bool:
+        dx = destination[0] - drone.position[0]
+        dy = destination[1] - drone.position[1]
+        distance = sqrt(dx * dx + dy * dy)
+        reach = self.config.drone_speed * dt_seconds
+        if distance <= reach:
+            drone.position = destination
+            return True
+        scale = reach / distance
+        drone.position = (drone.position[0] + dx * scale, drone.position[1] + dy * scale)
+        return False
+
     def _on_gather(self, drone: Drone, world: NpcWorldState, dt_seconds: float) -> None:
         if drone.target_resource is None:
             drone.state = DroneState.SEEK_RESOURCE
@@ -118,6 +192,9 @@ class NpcAiEngine:
             drone.cargo_type = None
             drone.cargo_amount = 0.0
             return
+        if world.colony_position is not None and self.config.drone_speed > 0.0:
+            if not self._travel(drone, world.colony_position, dt_seconds):
+                return
 
         delivered = min(self.config.delivery_rate * dt_seconds, drone.cargo_amount)
         world.colony_inventory[drone.cargo_type] = world.colony_inventory.get(drone.cargo_type, 0.0) + delivered
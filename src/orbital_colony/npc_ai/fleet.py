@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+from orbital_colony._numeric import HAS_NUMPY, require_numpy
+
+from .models import Drone, DroneState, NpcConfig, NpcWorldState
+
+STATE_ORDER = list(DroneState)
+STATE_CODES = {state: code for code, state in enumerate(STATE_ORDER)}
+IDLE = STATE_CODES[DroneState.IDLE]
+SEEK_RESOURCE = STATE_CODES[DroneState.SEEK_RESOURCE]
+GATHER = STATE_CODES[DroneState.GATHER]
+DELIVER = STATE_CODES[DroneState.DELIVER]
+REPAIR = STATE_CODES[DroneState.REPAIR]
+RECHARGE = STATE_CODES[DroneState.RECHARGE]
+NO_NAME = -1
+
+
+@dataclass
+class DroneFleet:
+    ids: list[str]
+    names: list[str]
+    positions: Any
+    state: Any
+    energy: Any
+    max_energy: Any
+    cargo_type: Any
+    cargo_amount: Any
+    cargo_capacity: Any
+    target: Any
+    delivered_total: Any
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def name_code(self, name: str | None) -> int:
+        if name is None:
+            return NO_NAME
+        try:
+            return self.names.index(name)
+        except ValueError:
+            self.names.append(name)
+            return len(self.names) - 1
+
+    def name_of(self, code: int) -> str | None:
+        return None if code == NO_NAME else self.names[code]
+
+    def state_of(self, index: int) -> DroneState:
+        return STATE_ORDER[int(self.state[index])]
+
+
+def pack_fleet(drones: list[Drone], world: NpcWorldState | None = None) -> DroneFleet:
+    numpy = require_numpy()
+    names = list(world.resource_nodes) if world is not None else []
+    fleet = DroneFleet(
+        ids=[drone.id for drone in drones],
+        names=names,
+        positions=numpy.array([drone.position for drone in drones], dtype=float).reshape(len(drones), 2),
+        state=numpy.array([STATE_CODES[drone.state] for drone in drones], dtype=numpy.int8),
+        energy=numpy.array([drone.energy for drone in drones], dtype=float),
+        max_energy=numpy.array([drone.max_energy for drone in drones], dtype=float),
+        cargo_type=numpy.empty(len(drones), dtype=numpy.int64),
+        cargo_amount=numpy.array([drone.cargo_amount for drone in drones], dtype=float),
+        cargo_capacity=numpy.array([drone.cargo_capacity for drone in drones], dtype=float),
+        target=numpy.empty(len(drones), dtype=numpy.int64),
+        delivered_total=numpy.array([drone.delivered_total for drone in drones], dtype=float),
+    )
+    for index, drone in enumerate(drones):
+        fleet.cargo_type[index] = fleet.name_code(drone.cargo_type)
+        fleet.target[index] = fleet.name_code(drone.target_resource)
+    return fleet
+
+
+def unpack_fleet(fleet: DroneFleet) -> list[Drone]:
+    columns = zip(
+        fleet.ids,
+        fleet.positions.tolist(),
+        fleet.state.tolist(),
+        fleet.energy.tolist(),
+        fleet.max_energy.tolist(),
+        fleet.cargo_type.tolist(),
+        fleet.cargo_amount.tolist(),
+        fleet.cargo_capacity.tolist(),
+        fleet.target.tolist(),
+        fleet.delivered_total.tolist(),
+    )
+    return [
+        Drone(
+            id=drone_id,
+            position=(position[0], position[1]),
+            state=STATE_ORDER[state],
+            energy=energy,
+            max_energy=max_energy,
+            cargo_type=fleet.name_of(cargo_type),
+            cargo_amount=amount,
+            cargo_capacity=capacity,
+            target_resource=fleet.name_of(target),
+            delivered_total=delivered,
+        )
+        for drone_id, position, state, energy, max_energy, cargo_type, amount, capacity, target, delivered in columns
+    ]
+
+
+def advance_fleet(
+    fleet: DroneFleet,
+    start: int,
+    world: NpcWorldState,
+    dt_seconds: float,
+    config: NpcConfig,
+    available_resource: str | None,
+) -> int:
+    # Drones interact only through node quantities and colony damage, and every decision reads those
+    # values only through their sign. Evaluating the drones from `start` on against the current world
+    # is therefore exact up to the first drone that empties a node or clears the damage; that prefix
+    # is committed and the index of the next drone to evaluate is returned.
+    numpy = require_numpy()
+    count = len(fleet) - start
+    state = fleet.state[start:].copy()
+    energy = fleet.energy[start:].copy()
+    cargo_type = fleet.cargo_type[start:].copy()
+    cargo_amount = fleet.cargo_amount[start:].copy()
+    target = fleet.target[start:].copy()
+    delivered_total = fleet.delivered_total[start:].copy()
+    capacity = fleet.cargo_capacity[start:]
+    # The trailing empty slot is what NO_NAME (-1) indexes, so untargeted drones read an empty node even when
+    # the world has no nodes at all.
+    quantities = numpy.array([*(world.resource_nodes.get(name, 0.0) for name in fleet.names), 0.0], dtype=float)
+    available = fleet.name_code(available_resource)
+    damage = world.colony_damage
+    cutoff = count
+
+    exhausted = (energy <= config.low_energy_threshold) & (state != RECHARGE)
+    state[exhausted] = RECHARGE
+    target[exhausted] = NO_NAME
+    dispatch = state.copy()
+
+    idle = dispatch == IDLE
+    if damage > 0.0:
+        state[idle] = REPAIR
+    elif available != NO_NAME:
+        state[idle] = SEEK_RESOURCE
+        target[idle] = available
+    else:
+        target[idle] = NO_NAME
+
+    has_target = target >= 0
+    stocked = has_target & (quantities[target] > 0.0)
+    seek = dispatch == SEEK_RESOURCE
+    retarget = seek & has_target & ~stocked
+    target[retarget] = available
+    state[seek & stocked] = GATHER
+    state[(seek & ~has_target) | retarget] = GATHER if available != NO_NAME else IDLE
+
+    gather = dispatch == GATHER
+    state[gather & ~stocked] = SEEK_RESOURCE
+    want = numpy.minimum(config.gather_rate * dt_seconds, numpy.maximum(0.0, capacity - cargo_amount))
+    stalled = numpy.flatnonzero(gather & stocked & (want <= 0.0))
+    state[stalled] = numpy.where(cargo_amount[stalled] > 0.0, DELIVER, SEEK_RESOURCE)
+    takers = numpy.flatnonzero(gather & stocked & (want > 0.0))
+    taker_nodes = target[takers]
+    remaining = numpy.empty(len(takers))
+    gathered = want[takers]
+    for node in numpy.unique(taker_nodes).tolist():
+        members = numpy.flatnonzero(taker_nodes == node)
+        running = numpy.subtract.accumulate(numpy.concatenate(([quantities[node]], gathered[members])))
+        remaining[members] = running[1:]
+        emptied = numpy.flatnonzero(running[1:] <= 0.0)
+        if len(emptied):
+            first = members[emptied[0]]
+            gathered[first] = running[emptied[0]]
+            remaining[first] = 0.0
+            cutoff = min(cutoff, int(takers[first]))
+    cargo_type[takers] = taker_nodes
+    cargo_amount[takers] += gathered
+    full = (cargo_amount[takers] >= capacity[takers]) | (remaining <= 0.0)
+    state[takers[full]] = DELIVER
+
+    deliver = dispatch == DELIVER
+    empty = deliver & ((cargo_type < 0) | (cargo_amount <= 0.0))
+    state[empty] = IDLE
+    cargo_type[empty] = NO_NAME
+    cargo_amount[empty] = 0.0
+    unloading = numpy.flatnonzero(deliver & ~empty)
+    unload_types = cargo_type[unloading]
+    delivered = numpy.minimum(config.delivery_rate * dt_seconds, cargo_amount[unloading])
+    delivered_total[unloading] += delivered
+    cargo_amount[unloading] -= delivered
+    unloaded = unloading[cargo_amount[unloading] <= 0.0]
+    cargo_amount[unloaded] = 0.0
+    cargo_type[unloaded] = NO_NAME
+    state[unloaded] = IDLE
+
+    repairing = numpy.flatnonzero(dispatch == REPAIR)
+    damage_after = numpy.full(len(repairing), 0.0)
+    if len(repairing) and damage > 0.0:
+        running = numpy.subtract.accumulate(
+            numpy.concatenate(([damage], numpy.full(len(repairing), config.repair_rate * dt_seconds)))
+        )
+        damage_after = numpy.maximum(0.0, running[1:])
+        cleared = numpy.flatnonzero(running[1:] <= 0.0)
+        if len(cleared):
+            state[repairing[cleared[0]]] = IDLE
+            cutoff = min(cutoff, int(repairing[cleared[0]]))
+    else:
+        state[repairing] = IDLE
+
+    recharge = dispatch == RECHARGE
+    energy[recharge] = numpy.minimum(
+        fleet.max_energy[start:][recharge],
+        energy[recharge] + config.recharge_rate * dt_seconds,
+    )
+    state[recharge & (energy >= config.resume_energy_threshold)] = IDLE
+
+    active = (state == SEEK_RESOURCE) | (state == GATHER) | (state == REPAIR) | (state == DELIVER)
+    energy[active] = numpy.maximum(0.0, energy[active] - config.active_energy_burn * dt_seconds)
+    drained = active & (energy <= config.low_energy_threshold)
+    state[drained] = RECHARGE
+    target[drained] = NO_NAME
+
+    committed = min(cutoff + 1, count)
+    stop = start + committed
+    fleet.state[start:stop] = state[:committed]
+    fleet.energy[start:stop] = energy[:committed]
+    fleet.cargo_type[start:stop] = cargo_type[:committed]
+    fleet.cargo_amount[start:stop] = cargo_amount[:committed]
+    fleet.target[start:stop] = target[:committed]
+    fleet.delivered_total[start:stop] = delivered_total[:committed]
+
+    kept = takers < committed
+    for node in numpy.unique(taker_nodes[kept]).tolist():
+        last = numpy.flatnonzero(kept & (taker_nodes == node))[-1]
+        world.resource_nodes[fleet.names[node]] = float(remaining[last])
+
+    kept = repairing < committed
+    if kept.any():
+        world.colony_damage = float(damage_after[kept][-1]) if damage > 0.0 else 0.0
+
+    kept = unloading < committed
+    codes, first_seen = numpy.unique(unload_types[kept], return_index=True)
+    for code in codes[numpy.argsort(first_seen)].tolist():
+        name = fleet.names[code]
+        amounts = delivered[kept][unload_types[kept] == code]
+        base = world.colony_inventory.get(name, 0.0)
+        world.colony_inventory[name] = float(numpy.add.accumulate(numpy.concatenate(([base], amounts)))[-1])
+    return stop
@@ -0,0 +1,271 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from math import ceil, hypot
+
+from .engine import NpcAiEngine, _available_resource
+from .models import Drone, DroneState, NpcConfig, NpcWorldState
+
+Vector2 = tuple[float, float]
+
+
+@dataclass
+class AggregateFleet:
+    ids: list[str]
+    positions: list[Vector2]
+    max_energy: list[float]
+    cargo_capacity: list[float]
+    delivered_total: list[float]
+    carried: dict[str, float] = field(default_factory=dict)
+    delivered: float = 0.0
+    phase: float = 0.0
+    commodity: str | None = None
+    tick_seconds: float = 0.0
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+@dataclass(frozen=True)
+class FlowRates:
+    duty_cycle: float
+    cycle_seconds: float
+    trip_seconds: float
+    gather_share: float
+    throughput: float
+    repair: float
+
+
+def _whole_ticks(seconds: float, tick_seconds: float) -> float:
+    if tick_seconds <= 0.0:
+        return seconds
+    return ceil(seconds / tick_seconds - 1e-9) * tick_seconds
+
+
+def flow_rates(
+    config: NpcConfig,
+    count: int,
+    capacity: float,
+    tick_seconds: float = 0.0,
+    travel_seconds: float = 0.0,
+) -> FlowRates:
+    # One drone alternates between an active stretch, burning from the resume threshold down to the low one,
+    # and a recharge back up. While active it shuttles loads of `capacity`, spending one tick idle and one
+    # seeking on every trip on top of gathering, unloading and the round trip to the node; the idle tick
+    # burns nothing, which stretches the active time, and each stretch opens with one more idle and seek.
+    # A stretch that runs out on the way back leaves the drone to fly out to the node again after
+    # recharging, which on average costs (leg / trip) * leg seconds of each stretch.
+    if config.gather_rate > 0.0 and config.delivery_rate > 0.0 and capacity > 0.0:
+        gather_seconds = _whole_ticks(capacity / config.gather_rate, tick_seconds)
+        unload_seconds = _whole_ticks(capacity / config.delivery_rate, tick_seconds)
+        trip_seconds = gather_seconds + unload_seconds + 2.0 * tick_seconds + travel_seconds
+        shuttle = capacity / trip_seconds
+        gather_share = gather_seconds / trip_seconds
+    else:
+        shuttle, gather_share, trip_seconds = 0.0, 1.0, float("inf")
+
+    band = max(0.0, config.resume_energy_threshold - config.low_energy_threshold)
+    active_seconds = band / config.active_energy_burn if config.active_energy_burn > 0.0 else float("inf")
+    if active_seconds != float("inf") and trip_seconds != float("inf"):
+        active_seconds = active_seconds * trip_seconds / (trip_seconds - tick_seconds) + 2.0 * tick_seconds
+        shuttle *= 1.0 - 2.0 * tick_seconds / active_seconds
+        if travel_seconds > 0.0:
+            leg = travel_seconds / 2.0
+            shuttle *= max(0.0, 1.0 - leg * leg / trip_seconds / active_seconds)
+    if config.recharge_rate > 0.0:
+        overshoot = config.active_energy_burn * tick_seconds / 2.0
+        recharge_seconds = _whole_ticks((band + overshoot) / config.recharge_rate, tick_seconds)
+    else:
+        recharge_seconds = float("inf")
+    if active_seconds == float("inf"):
+        duty_cycle, cycle_seconds = 1.0, float("inf")
+    elif recharge_seconds == float("inf"):
+        duty_cycle, cycle_seconds = 0.0, float("inf")
+    else:
+        cycle_seconds = active_seconds + recharge_seconds
+        duty_cycle = active_seconds / cycle_seconds if cycle_seconds > 0.0 else 1.0
+
+    active = count * duty_cycle
+    return FlowRates(
+        duty_cycle=duty_cycle,
+        cycle_seconds=cycle_seconds,
+        trip_seconds=trip_seconds,
+        gather_share=gather_share,
+        throughput=active * shuttle,
+        repair=active * config.repair_rate,
+    )
+
+
+def collapse_fleet(drones: list[Drone], tick_seconds: float = 0.0) -> AggregateFleet:
+    fleet = AggregateFleet(
+        ids=[drone.id for drone in drones],
+        positions=[drone.position for drone in drones],
+        max_energy=[drone.max_energy for drone in drones],
+        cargo_capacity=[drone.cargo_capacity for drone in drones],
+        delivered_total=[drone.delivered_total for drone in drones],
+        tick_seconds=tick_seconds,
+    )
+    for drone in drones:
+        if drone.cargo_type is not None and drone.cargo_amount > 0.0:
+            fleet.carried[drone.cargo_type] = fleet.carried.get(drone.cargo_type, 0.0) + drone.cargo_amount
+            fleet.commodity = fleet.commodity or drone.cargo_type
+    return fleet
+
+
+def travel_seconds(config: NpcConfig, world: NpcWorldState, name: str | None) -> float:
+    # Drones only fly when both ends are placed: out from the colony to the node, and back to unload.
+    destination = world.resource_positions.get(name) if name is not None else None
+    if config.drone_speed <= 0.0 or destination is None or world.colony_position is None:
+        return 0.0
+    colony = world.colony_position
+    return 2.0 * hypot(destination[0] - colony[0], destination[1] - colony[1]) / config.drone_speed
+
+
+def _fleet_rates(fleet: AggregateFleet, config: NpcConfig, travel: float = 0.0) -> FlowRates:
+    capacity = sum(fleet.cargo_capacity) / len(fleet) if len(fleet) else 0.0
+    return flow_rates(config, len(fleet), capacity, fleet.tick_seconds, travel)
+
+
+def advance_aggregate(fleet: AggregateFleet, world: NpcWorldState, dt_seconds: float, config: NpcConfig) -> None:
+    rates = _fleet_rates(fleet, config)
+    world.time_seconds += dt_seconds
+    if rates.cycle_seconds != float("inf"):
+        fleet.phase = (fleet.phase + dt_seconds / rates.cycle_seconds) % 1.0
+
+    remaining = dt_seconds
+    if world.colony_damage > 0.0 and rates.repair > 0.0:
+        needed = world.colony_damage / rates.repair
+        world.colony_damage = max(0.0, world.colony_damage - rates.repair * dt_seconds)
+        remaining = max(0.0, dt_seconds - needed)
+
+    while remaining > 0.0:
+        name = _available_resource(world.resource_priority, world.resource_nodes)
+        if name is None:
+            break
+        throughput = _fleet_rates(fleet, config, travel_seconds(config, world, name)).throughput
+        if throughput <= 0.0:
+            break
+        available = world.resource_nodes[name]
+        drawn = min(throughput * remaining, available)
+        world.resource_nodes[name] -= drawn
+        if world.resource_nodes[name] <= 0.0:
+            world.resource_nodes[name] = 0.0
+        world.colony_inventory[name] = world.colony_inventory.get(name, 0.0) + drawn
+        fleet.delivered += drawn
+        fleet.commodity = name
+        remaining = remaining - drawn / throughput if drawn >= available else 0.0
+
+
+def expand_fleet(fleet: AggregateFleet, world: NpcWorldState, config: NpcConfig) -> list[Drone]:
+    if not fleet.ids:
+        return []
+    # Drones are spread evenly over the energy cycle, so the expanded fleet shows the duty cycle the flow
+    # model assumed; cargo still carried at collapse time is handed back to the drones that are hauling.
+    count = len(fleet)
+    commodity = fleet.commodity
+    if commodity is None or world.resource_nodes.get(commodity, 0.0) <= 0.0:
+        commodity = _available_resource(world.resource_priority, world.resource_nodes)
+    rates = _fleet_rates(fleet, config, travel_seconds(config, world, commodity))
+    low = config.low_energy_threshold
+    band = max(0.0, config.resume_energy_threshold - low)
+    trips = 1.0
+    if rates.cycle_seconds != float("inf"):
+        trips = max(1.0, rates.duty_cycle * rates.cycle_seconds / rates.trip_seconds)
+
+    drones = []
+    loads = []
+    for index, drone_id in enumerate(fleet.ids):
+        phase = (fleet.phase + (index + 0.5) / count) % 1.0
+        max_energy = fleet.max_energy[index]
+        drone = Drone(
+            id=drone_id,
+            position=fleet.positions[index],
+            max_energy=max_energy,
+            cargo_capacity=fleet.cargo_capacity[index],
+            delivered_total=fleet.delivered_total[index] + fleet.delivered / count,
+        )
+        load = 0.0
+        if phase >= rates.duty_cycle:
+            recovered = (phase - rates.duty_cycle) / (1.0 - rates.duty_cycle)
+            drone.state = DroneState.RECHARGE
+            drone.energy = min(max_energy, low + recovered * band)
+        else:
+            drone.energy = min(max_energy, low + band * (1.0 - phase / rates.duty_cycle))
+            trip = (phase / rates.duty_cycle * trips) % 1.0
+            if trip < rates.gather_share and commodity is not None:
+                drone.state = DroneState.GATHER
+                drone.target_resource = commodity
+                load = trip / rates.gather_share
+            else:
+                drone.state = DroneState.DELIVER
+                load = (1.0 - trip) / (1.0 - rates.gather_share) if rates.gather_share < 1.0 else 1.0
+        drones.append(drone)
+        loads.append(load * drone.cargo_capacity)
+
+    for name, carried in sorted(fleet.carried.items()):
+        weight = sum(
+            load
+            for drone, load in zip(drones, loads)
+            if drone.cargo_type is None and (drone.state == DroneState.DELIVER or drone.target_resource == name)
+        )
+        for drone, load in zip(drones, loads):
+            if carried <= 0.0 or drone.cargo_type is not None or load <= 0.0:
+                continue
+            if drone.state == DroneState.GATHER and drone.target_resource != name:
+                continue
+            amount = min(drone.cargo_capacity, carried if weight <= 0.0 else carried * load / weight)
+            drone.cargo_type = name
+            drone.cargo_amount = amount
+            carried -= amount
+            weight -= load
+        if carried > 0.0:
+            world.colony_inventory[name] = world.colony_inventory.get(name, 0.0) + carried
+
+    for drone in drones:
+        if drone.state == DroneState.DELIVER and drone.cargo_amount <= 0.0:
+            drone.state = DroneState.IDLE
+    return drones
+
+
+class LodColony:
+    def __init__(self, engine: NpcAiEngine, drones: list[Drone], world: NpcWorldState) -> None:
+        self.engine = engine
+        self.world = world
+        self._drones: list[Drone] | None = drones
+        self._aggregate = collapse_fleet([])
+        self._tick_seconds = 0.0
+
+    @property
+    def observed(self) -> bool:
+        return self._drones is not None
+
+    @property
+    def drones(self) -> list[Drone]:
+        return self.observe()
+
+    def observe(self) -> list[Drone]:
+        if self._drones is None:
+            self._drones = expand_fleet(self._aggregate, self.world, self.engine.config)
+        return self._drones
+
+    def release(self) -> None:
+        if self._drones is None:
+            return
+        aggregate = collapse_fleet(self._drones, self._tick_seconds)
+        config = self.engine.config
+        for name in self.world.resource_priority:
+            travel = travel_seconds(config, self.world, name)
+            rates = _fleet_rates(aggregate, config, travel)
+            if travel > 0.0 and rates.trip_seconds > rates.duty_cycle * rates.cycle_seconds:
+                raise ValueError(f"release does not support round trips to {name} longer than an active stretch")
+        self._aggregate = aggregate
+        self._drones = None
+
+    def step(self, dt_seconds: float) -> None:
+        if dt_seconds <= 0:
+            raise ValueError("dt_seconds must be positive")
+        if self._drones is not None:
+            self._tick_seconds = dt_seconds
+            self.engine.step_in_place(self._drones, self.world, dt_seconds)
+        else:
+            advance_aggregate(self._aggregate, self.world, dt_seconds, self.engine.config)
@@ -3,6 +3,9 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 from enum import Enum
 
+from .resources import ResourceNodes, ResourcePositions
+from .spatial import SpatialHash
+
 Vector2 = tuple[float, float]
 
 
@@ -38,12 +41,61 @@ class NpcConfig:
     low_energy_threshold: float = 20.0
     resume_energy_threshold: float = 80.0
     active_energy_burn: float = 2.0
+    drone_speed: float = 0.0
+    target_selection: str = "priority"
+    spatial_cell_size: float = 50.0
 
 
 @dataclass
 class NpcWorldState:
-    resource_nodes: dict[str, float] = field(default_factory=dict)
+    resource_nodes: dict[str, float] = field(default_factory=ResourceNodes)
     colony_inventory: dict[str, float] = field(default_factory=dict)
     colony_damage: float = 0.0
     resource_priority: list[str] = field(default_factory=lambda: ["METALS", "FUEL", "OXYGEN"])
     time_seconds: float = 0.0
+    resource_positions: dict[str, Vector2] = field(default_factory=ResourcePositions)
+    colony_position: Vector2 | None = None
+
+    def __post_init__(self) -> None:
+        if not isinstance(self.resource_nodes, ResourceNodes):
+            self.resource_nodes = ResourceNodes(self.resource_nodes)
+        if not isinstance(self.resource_positions, ResourcePositions):
+            self.resource_positions = ResourcePositions(self.resource_positions)
+        self._spatial: SpatialHash | None = None
+        self._spatial_key: tuple[float, int, int, int] | None = None
+
+    def available_resource(self) -> str | None:
+        return self.resource_nodes.first_available(self.resource_priority)
+
+    def place_resource(self, name: str, quantity: float, position: Vector2 | None = None) -> None:
+        self.resource_nodes[name] = quantity
+        if position is None:
+            self.resource_positions.pop(name, None)
+        else:
+            self.resource_positions[name] = position
+        self._spatial = None
+
+    def nearest_resource(self, point: Vector2, cell_size: float = 50.0) -> str | None:
+        nodes = self.resource_nodes
+        return self.spatial_index(cell_size).nearest(point, accept=lambda name: nodes.get(name, 0.0) > 0.0)
+
+    def spatial_index(self, cell_size: float = 50.0) -> SpatialHash:
+        nodes = self.resource_nodes
+        positions = self.resource_positions
+        if not isinstance(positions, ResourcePositions):
+            positions = self.resource_positions = ResourcePositions(positions)
+        key = (cell_size, id(nodes), id(positions), positions.version)
+        if self._spatial is None or self._spatial_key != key or nodes.on_stocked is None:
+            index = SpatialHash(cell_size)
+            for name, position in positions.items():
+                if nodes.get(name, 0.0) > 0.0:
+                    index.insert(name, position)
+
+            def restock(name: str) -> None:
+                if name in positions:
+                    index.insert(name, positions[name])
+
+            nodes.on_stocked = restock
+            self._spatial = index
+            self._spatial_key = key
+        return self._spatial
@@ -0,0 +1,296 @@
+from __future__ import annotations
+
+from copy import copy
+from dataclasses import dataclass
+from typing import Any
+
+from orbital_colony._workers import WorkerProcess
+
+from .engine import NpcAiEngine
+from .models import Drone, DroneState, NpcConfig, NpcWorldState
+from .resources import ResourceNodes
+
+_GATHER = 0
+_REPAIR = 1
+_DELIVER = 2
+
+# Column-wise world effects of one propose pass: global drone index, effect kind, node or cargo name,
+# amount, and the cargo room the drone had (only meaningful for gathers).
+Effects = tuple[list[int], list[int], list[Any], list[float], list[float]]
+
+
+@dataclass
+class DroneProposal:
+    drone: Drone
+    dispatch: DroneState
+    gathered: float = 0.0
+    repaired: bool = False
+    delivered: float = 0.0
+    delivered_type: str | None = None
+
+
+def _snapshot(world: NpcWorldState) -> NpcWorldState:
+    return NpcWorldState(
+        resource_nodes=ResourceNodes(world.resource_nodes),
+        colony_inventory={},
+        colony_damage=world.colony_damage,
+        resource_priority=list(world.resource_priority),
+        time_seconds=world.time_seconds,
+        resource_positions=dict(world.resource_positions),
+        colony_position=world.colony_position,
+    )
+
+
+def _signature(world: NpcWorldState) -> tuple[bool, frozenset[str]]:
+    return world.colony_damage > 0.0, frozenset(name for name, qty in world.resource_nodes.items() if qty > 0.0)
+
+
+def _dispatch(config: NpcConfig, drone: Drone) -> DroneState:
+    if drone.energy <= config.low_energy_threshold and drone.state != DroneState.RECHARGE:
+        return DroneState.RECHARGE
+    return drone.state
+
+
+def propose_drones(
+    config: NpcConfig,
+    drones: list[Drone],
+    world: NpcWorldState,
+    dt_seconds: float,
+) -> list[DroneProposal]:
+    proposed = [copy(drone) for drone in drones]
+    proposals = [DroneProposal(drone=copied, dispatch=_dispatch(config, copied)) for copied in proposed]
+    indices, kinds, names, amounts, _ = _DroneShard(config, proposed, 0).propose(0, world, dt_seconds)
+    for index, kind, name, amount in zip(indices, kinds, names, amounts):
+        proposal = proposals[index]
+        if kind == _GATHER:
+            proposal.gathered = amount
+        elif kind == _REPAIR:
+            proposal.repaired = amount > 0.0
+        else:
+            proposal.delivered_type, proposal.delivered = name, amount
+    return proposals
+
+
+class _DroneShard:
+    # A contiguous slice of the fleet that stays resident in its worker between ticks. Every drone is stepped
+    # in place against the same snapshot (the scratch world is restored after each one, so its effects depend
+    # only on the drone and the snapshot), and its pre-tick fields are kept until the coordinator settles the
+    # pass: a drone whose draw was contended is replayed from them, drones past a re-proposal point roll back.
+    def __init__(self, config: NpcConfig, drones: list[Drone], offset: int) -> None:
+        self.engine = NpcAiEngine(config)
+        self.drones = drones
+        self.offset = offset
+        self.saved: list[dict[str, Any]] = []
+        self.saved_from = 0
+
+    def propose(self, start: int, world: NpcWorldState, dt_seconds: float) -> Effects:
+        config = self.engine.config
+        step_drone = self.engine.step_drone
+        first = max(0, start - self.offset)
+        scratch = _snapshot(world)
+        nodes = scratch.resource_nodes
+        inventory = scratch.colony_inventory
+        damage = world.colony_damage
+        take = config.gather_rate * dt_seconds
+        low_energy = config.low_energy_threshold
+        recharge, gather, repair = DroneState.RECHARGE, DroneState.GATHER, DroneState.REPAIR
+        self.saved = saved = []
+        self.saved_from = first
+        indices: list[int] = []
+        kinds: list[int] = []
+        names: list[Any] = []
+        amounts: list[float] = []
+        rooms: list[float] = []
+        for index, drone in enumerate(self.drones[first:], self.offset + first):
+            saved.append(vars(drone).copy())
+            dispatch = recharge if drone.energy <= low_energy and drone.state != recharge else drone.state
+            target = drone.target_resource
+            before = nodes.get(target, 0.0) if target is not None else 0.0
+            step_drone(drone, scratch, dt_seconds)
+
+            if dispatch == gather and target is not None and nodes.get(target, 0.0) != before:
+                nodes[target] = before
+                room = max(0.0, saved[-1]["cargo_capacity"] - saved[-1]["cargo_amount"])
+                indices.append(index)
+                kinds.append(_GATHER)
+                names.append(target)
+                amounts.append(min(take, before, room))
+                rooms.append(room)
+            elif dispatch == repair:
+                scratch.colony_damage = damage
+                indices.append(index)
+                kinds.append(_REPAIR)
+                names.append(None)
+                amounts.append(1.0 if damage > 0.0 else 0.0)
+                rooms.append(0.0)
+            elif inventory:
+                (name, delivered), = inventory.items()
+                inventory.clear()
+                indices.append(index)
+                kinds.append(_DELIVER)
+                names.append(name)
+                amounts.append(delivered)
+                rooms.append(0.0)
+        return indices, kinds, names, amounts, rooms
+
+    def replay(
+        self,
+        index: int,
+        world: NpcWorldState,
+        dt_seconds: float,
+    ) -> tuple[dict[str, float], float, dict[str, float]]:
+        drone = self.drones[index - self.offset]
+        vars(drone).update(self.saved[index - self.offset - self.saved_from])
+        self.engine.step_drone(drone, world, dt_seconds)
+        return dict(world.resource_nodes), world.colony_damage, world.colony_inventory
+
+    def settle(self, stop: int) -> None:
+        for local in range(max(self.saved_from, stop - self.offset), len(self.drones)):
+            vars(self.drones[local]).update(self.saved[local - self.saved_from])
+        self.saved = []
+
+    def handle(self, command: str, payload: Any) -> Any:
+        if command == "propose":
+            return self.propose(*payload)
+        if command == "replay":
+            return self.replay(*payload)
+        if command == "settle":
+            return self.settle(*payload)
+        if command == "drones":
+            return self.drones
+        raise ValueError(f"Unknown drone shard command: {command}")
+
+
+class _ProcessShard(WorkerProcess):
+    def __init__(self, config: NpcConfig, drones: list[Drone], offset: int) -> None:
+        super().__init__(_DroneShard, config, drones, offset, quiet=("settle",))
+        self.offset = offset
+        self.stop = offset + len(drones)
+
+
+class ParallelDroneStepper:
+    def __init__(
+        self,
+        engine: NpcAiEngine,
+        drones: list[Drone],
+        world: NpcWorldState,
+        dt_seconds: float,
+        workers: int = 0,
+    ) -> None:
+        if dt_seconds <= 0:
+            raise ValueError("dt_seconds must be positive")
+        if workers < 0:
+            raise ValueError("workers must be non-negative")
+        self.engine = engine
+        self.world = world
+        self.dt_seconds = dt_seconds
+        self.workers = min(workers, len(drones))
+        self.passes = 0
+        self._drones = drones
+        self._stale = False
+        self._shards: list[_ProcessShard] = []
+        if self.workers:
+            size = -(-len(drones) // self.workers)
+            self._shards = [
+                _ProcessShard(engine.config, drones[offset : offset + size], offset)
+                for offset in range(0, len(drones), size)
+            ]
+
+    def __enter__(self) -> ParallelDroneStepper:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    @property
+    def drones(self) -> list[Drone]:
+        self.sync()
+        return self._drones
+
+    def sync(self) -> None:
+        # Pulls the resident drones back from the workers into the caller's Drone objects.
+        if not self._stale:
+            return
+        for shard in self._shards:
+            shard.send("drones")
+        for shard in self._shards:
+            for drone, resident in zip(self._drones[shard.offset : shard.stop], shard.receive()):
+                vars(drone).update(vars(resident))
+        self._stale = False
+
+    def close(self) -> None:
+        self.sync()
+        for shard in self._shards:
+            shard.close()
+        self._shards = []
+        self.workers = 0
+
+    def advance(self, ticks: int) -> None:
+        for _ in range(ticks):
+            self.step()
+
+    def step(self) -> None:
+        world = self.world
+        if not self._shards:
+            self.engine.step_in_place(self._drones, world, self.dt_seconds)
+            self.passes += 1
+            return
+
+        world.time_seconds += self.dt_seconds
+        self._stale = True
+        start = 0
+        while start < len(self._drones):
+            snapshot = _snapshot(world)
+            active = [shard for shard in self._shards if shard.stop > start]
+            for shard in active:
+                shard.send("propose", (start, snapshot, self.dt_seconds))
+            effects = [shard.receive() for shard in active]
+            self.passes += 1
+            stop = self._commit(effects, world)
+            for shard in active:
+                shard.send("settle", (stop,))
+            start = stop
+
+    def _commit(self, effects: list[Effects], world: NpcWorldState) -> int:
+        config = self.engine.config
+        nodes = world.resource_nodes
+        inventory = world.colony_inventory
+        take = config.gather_rate * self.dt_seconds
+        repair = config.repair_rate * self.dt_seconds
+        signature = _signature(world)
+        for indices, kinds, names, amounts, rooms in effects:
+            for index, kind, name, amount, room in zip(indices, kinds, names, amounts, rooms):
+                if kind == _GATHER:
+                    available = nodes.get(name, 0.0)
+                    gathered = min(take, available, room)
+                    if gathered == amount and available - gathered > 0.0:
+                        nodes[name] = available - gathered
+                        continue
+                elif kind == _REPAIR:
+                    if not amount:
+                        world.colony_damage = 0.0
+                        continue
+                    damage = max(0.0, world.colony_damage - repair)
+                    if damage > 0.0:
+                        world.colony_damage = damage
+                        continue
+                else:
+                    inventory[name] = inventory.get(name, 0.0) + amount
+                    continue
+                # The proposal saw a node or the damage that an earlier drone has since drawn down; replay
+                # the drone against the live world and re-propose the rest if it changed what drones observe.
+                self._replay(index, world)
+                if _signature(world) != signature:
+                    return index + 1
+        return len(self._drones)
+
+    def _replay(self, index: int, world: NpcWorldState) -> None:
+        shard = next(shard for shard in self._shards if shard.offset <= index < shard.stop)
+        shard.send("replay", (index, _snapshot(world), self.dt_seconds))
+        nodes, damage, delivered = shard.receive()
+        for name, quantity in nodes.items():
+            if world.resource_nodes.get(name) != quantity:
+                world.resource_nodes[name] = quantity
+        world.colony_damage = damage
+        for name, amount in delivered.items():
+            world.colony_inventory[name] = world.colony_inventory.get(name, 0.0) + amount
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import heapq
+from typing import Any, Callable
+
+Rank = tuple[int, int]
+
+
+class ResourceNodes(dict[str, float]):
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._sequence = 0
+        self._inserted: dict[str, int] = {}
+        for name in self:
+            self._record_insert(name)
+        self._priority: list[str] = []
+        self._priority_rank: dict[str, int] = {}
+        self._heap: list[tuple[Rank, str]] = []
+        self.on_stocked: Callable[[str], None] | None = None
+        self._rebuild()
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return type(self), (dict(self),)
+
+    def _record_insert(self, name: str) -> None:
+        self._inserted[name] = self._sequence
+        self._sequence += 1
+
+    def _rank(self, name: str) -> Rank:
+        position = self._priority_rank.get(name)
+        if position is not None:
+            return 0, position
+        return 1, self._inserted[name]
+
+    def _rebuild(self) -> None:
+        self._heap = [(self._rank(name), name) for name, quantity in self.items() if quantity > 0.0]
+        heapq.heapify(self._heap)
+
+    def __setitem__(self, name: str, quantity: float) -> None:
+        previous = self.get(name)
+        if previous is None:
+            self._record_insert(name)
+        super().__setitem__(name, quantity)
+        if quantity > 0.0 and (previous is None or previous <= 0.0):
+            heapq.heappush(self._heap, (self._rank(name), name))
+            if len(self._heap) > 2 * len(self) + 16:
+                self._rebuild()
+            if self.on_stocked is not None:
+                self.on_stocked(name)
+
+    def __delitem__(self, name: str) -> None:
+        super().__delitem__(name)
+        del self._inserted[name]
+
+    def pop(self, name: str, *default: Any) -> Any:
+        if name in self:
+            value = self[name]
+            del self[name]
+            return value
+        return super().pop(name, *default)
+
+    def popitem(self) -> tuple[str, float]:
+        name, value = super().popitem()
+        del self._inserted[name]
+        return name, value
+
+    def setdefault(self, name: str, default: float = 0.0) -> float:
+        if name not in self:
+            self[name] = default
+        return self[name]
+
+    def update(self, *args: Any, **kwargs: Any) -> None:
+        for name, quantity in dict(*args, **kwargs).items():
+            self[name] = quantity
+
+    def __ior__(self, other: Any) -> ResourceNodes:
+        self.update(other)
+        return self
+
+    def clear(self) -> None:
+        super().clear()
+        self._inserted.clear()
+        self._heap.clear()
+
+    def first_available(self, priority: list[str]) -> str | None:
+        if priority != self._priority:
+            self._priority = list(priority)
+            self._priority_rank = {}
+            for position, name in enumerate(self._priority):
+                self._priority_rank.setdefault(name, position)
+            self._rebuild()
+
+        heap = self._heap
+        while heap:
+            rank, name = heap[0]
+            quantity = self.get(name)
+            if quantity is not None and quantity > 0.0 and self._rank(name) == rank:
+                return name
+            heapq.heappop(heap)
+        return None
+
+
+class ResourcePositions(dict[str, tuple[float, float]]):
+    # Every write bumps `version`, so position-keyed caches notice a node moving in place.
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.version = 0
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return type(self), (dict(self),)
+
+    def __setitem__(self, name: str, position: tuple[float, float]) -> None:
+        super().__setitem__(name, position)
+        self.version += 1
+
+    def __delitem__(self, name: str) -> None:
+        super().__delitem__(name)
+        self.version += 1
+
+    def pop(self, name: str, *default: Any) -> Any:
+        if name in self:
+            self.version += 1
+        return super().pop(name, *default)
+
+    def popitem(self) -> tuple[str, tuple[float, float]]:
+        item = super().popitem()
+        self.version += 1
+        return item
+
+    def setdefault(self, name: str, default: tuple[float, float] = (0.0, 0.0)) -> tuple[float, float]:
+        if name not in self:
+            self[name] = default
+        return self[name]
+
+    def update(self, *args: Any, **kwargs: Any) -> None:
+        for name, position in dict(*args, **kwargs).items():
+            self[name] = position
+
+    def __ior__(self, other: Any) -> ResourcePositions:
+        self.update(other)
+        return self
+
+    def clear(self) -> None:
+        super().clear()
+        self.version += 1
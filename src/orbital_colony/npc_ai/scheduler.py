@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+import heapq
+from dataclasses import dataclass
+
+from .engine import NpcAiEngine
+from .models import Drone, DroneState, NpcConfig, NpcWorldState
+
+# Longest stretch a drone is put to sleep for in one go; it is simply rescheduled afterwards.
+_MAX_SLEEP_TICKS = 4096
+
+
+@dataclass
+class _Sleep:
+    state: DroneState
+    since_tick: int
+    wake_tick: int
+    node: str | None = None
+
+
+def _recharge_ticks(config: NpcConfig, drone: Drone, dt_seconds: float, limit: int) -> int:
+    gain = config.recharge_rate * dt_seconds
+    threshold = config.resume_energy_threshold
+    if gain <= 0.0 or drone.max_energy < threshold:
+        return limit
+    # The ticks are walked with the float additions _on_recharge makes, so the drone is awake on exactly the
+    # tick that lifts it to the resume threshold. The max_energy cap cannot bind before then.
+    energy = drone.energy
+    ticks = 0
+    while ticks < limit:
+        energy += gain
+        if energy >= threshold:
+            break
+        ticks += 1
+    return ticks
+
+
+def _gather_ticks(config: NpcConfig, drone: Drone, dt_seconds: float, limit: int) -> int:
+    take = config.gather_rate * dt_seconds
+    burn = config.active_energy_burn * dt_seconds
+    low = config.low_energy_threshold
+    if take <= 0.0 or drone.energy <= low:
+        return 0
+    # Ticks that draw a full load, leave the drone strictly below capacity and above the low threshold need
+    # no decision; the tick that fills it or drains it must be stepped for real.
+    capacity = drone.cargo_capacity
+    cargo = drone.cargo_amount
+    energy = drone.energy
+    ticks = 0
+    while ticks < limit and capacity - cargo >= take:
+        cargo += take
+        energy -= burn
+        if energy < 0.0:
+            energy = 0.0
+        if cargo >= capacity or energy <= low:
+            break
+        ticks += 1
+    return ticks
+
+
+def _settle(
+    config: NpcConfig,
+    drone: Drone,
+    state: DroneState,
+    node: str | None,
+    elapsed: int,
+    dt_seconds: float,
+) -> None:
+    # Replayed tick by tick rather than multiplied out, so the result is bit-identical to stepping.
+    if state == DroneState.RECHARGE:
+        gain = config.recharge_rate * dt_seconds
+        cap = drone.max_energy
+        energy = drone.energy
+        for _ in range(elapsed):
+            if energy >= cap:
+                break
+            energy += gain
+        drone.energy = min(cap, energy)
+    else:
+        take = config.gather_rate * dt_seconds
+        burn = config.active_energy_burn * dt_seconds
+        cargo = drone.cargo_amount
+        energy = drone.energy
+        for _ in range(elapsed):
+            cargo += take
+            energy -= burn
+            if energy < 0.0:
+                energy = 0.0
+        drone.cargo_type = node
+        drone.cargo_amount = cargo
+        drone.energy = energy
+
+
+def _drawn(stock: float, takers: int, take: float) -> float:
+    # The same float subtractions the drones make one after another; a drone taking less than a full load only
+    # leaves more behind.
+    for _ in range(takers):
+        stock -= take
+    return stock
+
+
+class DroneScheduler:
+    def __init__(
+        self,
+        engine: NpcAiEngine,
+        drones: list[Drone],
+        world: NpcWorldState,
+        dt_seconds: float,
+    ) -> None:
+        if dt_seconds <= 0:
+            raise ValueError("dt_seconds must be positive")
+        self.engine = engine
+        self.world = world
+        self.dt_seconds = dt_seconds
+        self.tick = 0
+        self.drone_updates = 0
+        self._drones = drones
+        self._awake: set[int] = set(range(len(drones)))
+        self._sleeping: dict[int, _Sleep] = {}
+        self._wake_queue: list[tuple[int, int]] = []
+        self._sleepers_on: dict[str, set[int]] = {}
+        for index in range(len(drones)):
+            self._try_sleep(index)
+
+    @property
+    def drones(self) -> list[Drone]:
+        for index in list(self._sleeping):
+            self._sync(index)
+        return self._drones
+
+    @property
+    def sleeping(self) -> int:
+        return len(self._sleeping)
+
+    def drone(self, index: int) -> Drone:
+        if index in self._sleeping:
+            self._sync(index)
+        return self._drones[index]
+
+    def wake(self, index: int) -> None:
+        if index in self._sleeping:
+            self._sync(index)
+            record = self._sleeping.pop(index)
+            if record.node is not None:
+                self._sleepers_on[record.node].discard(index)
+            self._awake.add(index)
+
+    def step(self) -> None:
+        config = self.engine.config
+        world = self.world
+        while self._wake_queue and self._wake_queue[0][0] <= self.tick:
+            wake_tick, index = heapq.heappop(self._wake_queue)
+            record = self._sleeping.get(index)
+            if record is not None and record.wake_tick == wake_tick:
+                self.wake(index)
+
+        take = config.gather_rate * self.dt_seconds
+        nodes = world.resource_nodes
+        awake_takers: dict[str, list[int]] = {}
+        for index in self._awake:
+            drone = self._drones[index]
+            if drone.state == DroneState.GATHER and drone.target_resource is not None:
+                awake_takers.setdefault(drone.target_resource, []).append(index)
+        queued: dict[str, list[int]] = {}
+        for node, sleepers in list(self._sleepers_on.items()):
+            if not sleepers:
+                continue
+            takers = awake_takers.get(node, [])
+            # Sleepers may only keep drawing while the node cannot run dry this tick whatever order the drones
+            # touching it are processed in.
+            if _drawn(nodes.get(node, 0.0), len(sleepers) + len(takers), take) <= 0.0:
+                for index in sorted(sleepers):
+                    self.wake(index)
+            elif takers:
+                # An awake drone may take less than a full load, so the sleepers draw in index order around it
+                # to leave the node with the same float value as stepping.
+                queued[node] = sorted(sleepers, reverse=True)
+            else:
+                nodes[node] = _drawn(nodes[node], len(sleepers), take)
+
+        world.time_seconds += self.dt_seconds
+        stepped = sorted(self._awake)
+        for index in stepped:
+            drone = self._drones[index]
+            waiting = queued.get(drone.target_resource) if drone.state == DroneState.GATHER else None
+            if waiting:
+                ahead = 0
+                while waiting and waiting[-1] < index:
+                    waiting.pop()
+                    ahead += 1
+                nodes[drone.target_resource] = _drawn(nodes[drone.target_resource], ahead, take)
+            self.engine.step_drone(drone, world, self.dt_seconds)
+        for node, waiting in queued.items():
+            nodes[node] = _drawn(nodes[node], len(waiting), take)
+        self.drone_updates += len(stepped)
+        self.tick += 1
+        for index in stepped:
+            self._try_sleep(index)
+
+    def advance(self, ticks: int) -> None:
+        for _ in range(ticks):
+            self.step()
+
+    def _try_sleep(self, index: int) -> None:
+        drone = self._drones[index]
+        if drone.state == DroneState.RECHARGE:
+            ticks = _recharge_ticks(self.engine.config, drone, self.dt_seconds, _MAX_SLEEP_TICKS)
+            node = None
+        elif drone.state == DroneState.GATHER and drone.target_resource is not None:
+            ticks = _gather_ticks(self.engine.config, drone, self.dt_seconds, _MAX_SLEEP_TICKS)
+            node = drone.target_resource
+        else:
+            return
+        if ticks < 1:
+            return
+
+        record = _Sleep(state=drone.state, since_tick=self.tick, wake_tick=self.tick + ticks, node=node)
+        self._awake.discard(index)
+        self._sleeping[index] = record
+        heapq.heappush(self._wake_queue, (record.wake_tick, index))
+        if node is not None:
+            self._sleepers_on.setdefault(node, set()).add(index)
+
+    def _sync(self, index: int) -> None:
+        record = self._sleeping[index]
+        elapsed = self.tick - record.since_tick
+        if elapsed <= 0:
+            return
+        _settle(self.engine.config, self._drones[index], record.state, record.node, elapsed, self.dt_seconds)
+        record.since_tick = self.tick
+
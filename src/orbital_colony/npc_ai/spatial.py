@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+from math import floor, sqrt
+from typing import Callable
+
+Vector2 = tuple[float, float]
+Cell = tuple[int, int]
+
+
+class SpatialHash:
+    def __init__(self, cell_size: float) -> None:
+        if cell_size <= 0.0:
+            raise ValueError("cell_size must be positive")
+        self.cell_size = cell_size
+        self._cells: dict[Cell, dict[str, Vector2]] = {}
+        self._cell_of: dict[str, Cell] = {}
+        self._bounds: tuple[int, int, int, int] | None = None
+
+    def __len__(self) -> int:
+        return len(self._cell_of)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._cell_of
+
+    def _cell(self, position: Vector2) -> Cell:
+        return floor(position[0] / self.cell_size), floor(position[1] / self.cell_size)
+
+    def insert(self, name: str, position: Vector2) -> None:
+        self.remove(name)
+        cell = self._cell(position)
+        self._cells.setdefault(cell, {})[name] = position
+        self._cell_of[name] = cell
+        if self._bounds is None:
+            self._bounds = (cell[0], cell[1], cell[0], cell[1])
+        else:
+            min_x, min_y, max_x, max_y = self._bounds
+            self._bounds = (min(min_x, cell[0]), min(min_y, cell[1]), max(max_x, cell[0]), max(max_y, cell[1]))
+
+    def remove(self, name: str) -> None:
+        cell = self._cell_of.pop(name, None)
+        if cell is None:
+            return
+        bucket = self._cells[cell]
+        del bucket[name]
+        if not bucket:
+            del self._cells[cell]
+
+    def nearest(self, point: Vector2, accept: Callable[[str], bool] | None = None) -> str | None:
+        if not self._cell_of or self._bounds is None:
+            return None
+        cx, cy = self._cell(point)
+        min_x, min_y, max_x, max_y = self._bounds
+        max_ring = max(abs(cx - min_x), abs(cx - max_x), abs(cy - min_y), abs(cy - max_y))
+
+        if (2 * max_ring + 1) ** 2 > 16 * len(self._cells):
+            rings = [list(self._cells)]
+        else:
+            rings = (self._ring(cx, cy, ring) for ring in range(max_ring + 1))
+
+        best: tuple[float, str] | None = None
+        rejected: list[str] = []
+        for ring, cells in enumerate(rings):
+            # Every cell on ring r is at least (r - 1) cells away from the query point.
+            if best is not None and sqrt(best[0]) < (ring - 1) * self.cell_size:
+                break
+            for cell in cells:
+                bucket = self._cells.get(cell)
+                if not bucket:
+                    continue
+                for name, position in bucket.items():
+                    dx = position[0] - point[0]
+                    dy = position[1] - point[1]
+                    candidate = (dx * dx + dy * dy, name)
+                    if best is not None and candidate >= best:
+                        continue
+                    if accept is not None and not accept(name):
+                        rejected.append(name)
+                        continue
+                    best = candidate
+
+        for name in rejected:
+            self.remove(name)
+        return None if best is None else best[1]
+
+    @staticmethod
+    def _ring(cx: int, cy: int, ring: int) -> list[Cell]:
+        if ring == 0:
+            return [(cx, cy)]
+        cells = [(cx + dx, cy - ring) for dx in range(-ring, ring + 1)]
+        cells += [(cx + dx, cy + ring) for dx in range(-ring, ring + 1)]
+        cells += [(cx - ring, cy + dy) for dy in range(-ring + 1, ring)]
+        cells += [(cx + ring, cy + dy) for dy in range(-ring + 1, ring)]
+        return cells
@@ -1,11 +1,20 @@
-from .engine import RenderEngine, SceneAdapter
-from .models import FrameData, HudData, RenderConfig, RenderEntity
+from .culling import EntityGrid, on_screen
+from .engine import RenderEngine, RetainedSceneAdapter, SceneAdapter
+from .models import FrameData, FrameDelta, HudData, RenderConfig, RenderEntity
+from .raster import HAS_NUMPY, blit, rasterize
 
 __all__ = [
     "RenderConfig",
     "RenderEntity",
     "HudData",
     "FrameData",
+    "FrameDelta",
     "SceneAdapter",
+    "RetainedSceneAdapter",
     "RenderEngine",
+    "EntityGrid",
+    "on_screen",
+    "HAS_NUMPY",
+    "rasterize",
+    "blit",
 ]
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+from math import floor, hypot
+
+from .models import RenderConfig, RenderEntity, Vector2
+
+Cell = tuple[int, int]
+Rank = tuple[int, int]
+
+
+def on_screen(config: RenderConfig, position: Vector2, radius: float, vector: Vector2 | None = None) -> bool:
+    sx = config.width / 2 + (position[0] - config.camera[0]) * config.world_scale
+    sy = config.height / 2 + (position[1] - config.camera[1]) * config.world_scale
+    extent = max(1.0, radius)
+    min_x, max_x = sx - extent, sx + extent
+    min_y, max_y = sy - extent, sy + extent
+    if config.show_debug_vectors and vector is not None:
+        min_x, max_x = min(min_x, sx + vector[0] * 4), max(max_x, sx + vector[0] * 4)
+        min_y, max_y = min(min_y, sy + vector[1] * 4), max(max_y, sy + vector[1] * 4)
+    margin = config.cull_margin
+    return (
+        max_x >= -margin
+        and min_x <= config.width + margin
+        and max_y >= -margin
+        and min_y <= config.height + margin
+    )
+
+
+def _extent(entity: RenderEntity) -> float:
+    extent = max(1.0, entity.radius)
+    if entity.vector is not None:
+        extent += hypot(entity.vector[0], entity.vector[1]) * 4
+    return extent
+
+
+class EntityGrid:
+    def __init__(self, cell_size: float) -> None:
+        if cell_size <= 0.0:
+            raise ValueError("cell_size must be positive")
+        self.cell_size = cell_size
+        # Largest on-screen reach of any entity ever indexed, in pixels; it only ever grows, which keeps
+        # queries conservative without rescanning the grid when an entity shrinks or leaves.
+        self.max_extent = 0.0
+        self._cells: dict[Cell, dict[str, RenderEntity]] = {}
+        self._cell_of: dict[str, Cell] = {}
+        self._rank: dict[str, Rank] = {}
+
+    def __len__(self) -> int:
+        return len(self._cell_of)
+
+    def _cell(self, position: Vector2) -> Cell:
+        return floor(position[0] / self.cell_size), floor(position[1] / self.cell_size)
+
+    def insert(self, entity: RenderEntity, rank: Rank) -> None:
+        self._rank[entity.id] = rank
+        self.update(entity)
+
+    def update(self, entity: RenderEntity) -> None:
+        cell = self._cell(entity.position)
+        previous = self._cell_of.get(entity.id)
+        if previous != cell:
+            if previous is not None:
+                self._discard(entity.id, previous)
+            self._cells.setdefault(cell, {})[entity.id] = entity
+            self._cell_of[entity.id] = cell
+        self.max_extent = max(self.max_extent, _extent(entity))
+
+    def remove(self, entity_id: str) -> None:
+        cell = self._cell_of.pop(entity_id, None)
+        if cell is not None:
+            self._discard(entity_id, cell)
+        self._rank.pop(entity_id, None)
+
+    def _discard(self, entity_id: str, cell: Cell) -> None:
+        bucket = self._cells[cell]
+        del bucket[entity_id]
+        if not bucket:
+            del self._cells[cell]
+
+    def query(self, min_x: float, min_y: float, max_x: float, max_y: float) -> list[RenderEntity]:
+        low_x, low_y = self._cell((min_x, min_y))
+        high_x, high_y = self._cell((max_x, max_y))
+        if (high_x - low_x + 1) * (high_y - low_y + 1) > len(self._cells):
+            buckets = [
+                bucket
+                for (cx, cy), bucket in self._cells.items()
+                if low_x <= cx <= high_x and low_y <= cy <= high_y
+            ]
+        else:
+            buckets = [
+                self._cells[(cx, cy)]
+                for cx in range(low_x, high_x + 1)
+                for cy in range(low_y, high_y + 1)
+                if (cx, cy) in self._cells
+            ]
+        found = [entity for bucket in buckets for entity in bucket.values()]
+        found.sort(key=lambda entity: self._rank[entity.id])
+        return found
+
+    def visible(self, config: RenderConfig) -> list[RenderEntity]:
+        reach = (config.cull_margin + self.max_extent) / config.world_scale
+        half_width = config.width / 2 / config.world_scale
+        half_height = config.height / 2 / config.world_scale
+        candidates = self.query(
+            config.camera[0] - half_width - reach,
+            config.camera[1] - half_height - reach,
+            config.camera[0] + half_width + reach,
+            config.camera[1] + half_height + reach,
+        )
+        return [
+            entity
+            for entity in candidates
+            if on_screen(config, entity.position, entity.radius, entity.vector)
+        ]
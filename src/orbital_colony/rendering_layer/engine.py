@@ -7,7 +7,15 @@ from orbital_colony.core_physics import PhysicsState
 from orbital_colony.economy_engine import EconomyState
 from orbital_colony.npc_ai import Drone
 
-from .models import FrameData, HudData, RenderConfig, RenderEntity
+from .culling import EntityGrid, on_screen
+from .models import FrameData, FrameDelta, HudData, RenderConfig, RenderEntity
+from .raster import BACKGROUND_COLOR, VECTOR_COLOR, blit, rasterize, require_numpy
+
+BODY_COLOR = (96, 148, 255)
+COLONY_COLOR = (233, 234, 191)
+DRONE_COLOR = (250, 160, 110)
+
+_BACKENDS = ("pygame", "numpy")
 
 
 def _mass_to_radius(mass: float) -> float:
@@ -15,6 +23,12 @@ def _mass_to_radius(mass: float) -> float:
 
 
 class SceneAdapter:
+    def __init__(self, config: RenderConfig | None = None) -> None:
+        self.config = config
+
+    def _visible(self, position: tuple[float, float], radius: float, vector: tuple[float, float] | None) -> bool:
+        return self.config is None or on_screen(self.config, position, radius, vector)
+
     def build_frame(
         self,
         physics_state: PhysicsState,
@@ -23,39 +37,45 @@ class SceneAdapter:
     ) -> FrameData:
         entities: list[RenderEntity] = []
         for body in physics_state.bodies:
+            if not self._visible(body.position, _mass_to_radius(body.mass), body.velocity):
+                continue
             entities.append(
                 RenderEntity(
                     id=f"body:{body.name}",
                     kind="celestial_body",
                     position=body.position,
                     radius=_mass_to_radius(body.mass),
-                    color=(96, 148, 255),
+                    color=BODY_COLOR,
                     label=body.name,
                     vector=body.velocity,
                 )
             )
 
-        if physics_state.colony is not None:
+        for colony in physics_state.colonies:
+            if not self._visible(colony.position, _mass_to_radius(colony.mass) + 3.0, colony.velocity):
+                continue
             entities.append(
                 RenderEntity(
-                    id=f"colony:{physics_state.colony.name}",
+                    id=f"colony:{colony.name}",
                     kind="colony",
-                    position=physics_state.colony.position,
-                    radius=_mass_to_radius(physics_state.colony.mass) + 3.0,
-                    color=(233, 234, 191),
-                    label=physics_state.colony.name,
-                    vector=physics_state.colony.velocity,
+                    position=colony.position,
+                    radius=_mass_to_radius(colony.mass) + 3.0,
+                    color=COLONY_COLOR,
+                    label=colony.name,
+                    vector=colony.velocity,
                 )
             )
 
         for drone in drones:
+            if not self._visible(drone.position, 3.0, None):
+                continue
             entities.append(
                 RenderEntity(
                     id=f"drone:{drone.id}",
                     kind="drone",
                     position=drone.position,
                     radius=3.0,
-                    color=(250, 160, 110),
+                    color=DRONE_COLOR,
                     label=drone.state.value,
                 )
             )
@@ -68,17 +88,190 @@ class SceneAdapter:
         return FrameData(entities=entities, hud=hud)
 
 
+class RetainedSceneAdapter(SceneAdapter):
+    # Keeps every entity, on screen or not, so the frame's index can answer any viewport; culling is left to
+    # RenderEngine, and only the index cell size is configurable.
+    def __init__(self, cell_size: float | None = None) -> None:
+        super().__init__()
+        self.index = EntityGrid(cell_size if cell_size is not None else RenderConfig().cull_cell_size)
+        self.frame = FrameData(index=self.index)
+        self.last_delta = FrameDelta()
+        self._groups: dict[str, dict[str, RenderEntity]] = {"body": {}, "colony": {}, "drone": {}}
+        self._group_rank = {group: rank for rank, group in enumerate(self._groups)}
+        self._sequence = 0
+        self._seen: dict[str, int] = {}
+        self._generation = 0
+        self._matched = 0
+
+    def build_frame(
+        self,
+        physics_state: PhysicsState,
+        economy_state: EconomyState,
+        drones: list[Drone],
+    ) -> FrameData:
+        self.update(physics_state, economy_state, drones)
+        return self.frame
+
+    def update(
+        self,
+        physics_state: PhysicsState,
+        economy_state: EconomyState,
+        drones: list[Drone],
+    ) -> FrameDelta:
+        self._generation += 1
+        self._matched = 0
+        delta = FrameDelta()
+        for body in physics_state.bodies:
+            self._sync(
+                delta,
+                "body",
+                body.name,
+                kind="celestial_body",
+                position=body.position,
+                radius=_mass_to_radius(body.mass),
+                color=BODY_COLOR,
+                label=body.name,
+                vector=body.velocity,
+            )
+        for colony in physics_state.colonies:
+            self._sync(
+                delta,
+                "colony",
+                colony.name,
+                kind="colony",
+                position=colony.position,
+                radius=_mass_to_radius(colony.mass) + 3.0,
+                color=COLONY_COLOR,
+                label=colony.name,
+                vector=colony.velocity,
+            )
+        for drone in drones:
+            self._sync(
+                delta,
+                "drone",
+                drone.id,
+                kind="drone",
+                position=drone.position,
+                radius=3.0,
+                color=DRONE_COLOR,
+                label=drone.state.value,
+                vector=None,
+            )
+
+        if self._matched != len(self._seen):
+            for group in self._groups.values():
+                for name, entity in list(group.items()):
+                    if self._seen.get(entity.id) != self._generation:
+                        del group[name]
+                        del self._seen[entity.id]
+                        self.index.remove(entity.id)
+                        delta.removed.append(entity.id)
+        if delta.added or delta.removed:
+            self.frame.entities = [entity for group in self._groups.values() for entity in group.values()]
+
+        hud = self.frame.hud
+        hud.stability_index = physics_state.stability_index
+        prices = hud.commodity_prices
+        for name, commodity in economy_state.commodities.items():
+            if prices.get(name) != commodity.price:
+                prices[name] = commodity.price
+        if len(prices) != len(economy_state.commodities):
+            for name in [name for name in prices if name not in economy_state.commodities]:
+                del prices[name]
+        states = hud.drone_states
+        for drone in drones:
+            if states.get(drone.id) != drone.state.value:
+                states[drone.id] = drone.state.value
+        if len(states) != len(drones):
+            ids = {drone.id for drone in drones}
+            for name in [name for name in states if name not in ids]:
+                del states[name]
+        self.last_delta = delta
+        return delta
+
+    def _sync(
+        self,
+        delta: FrameDelta,
+        group: str,
+        name: str,
+        kind: str,
+        position: tuple[float, float],
+        radius: float,
+        color: tuple[int, int, int],
+        label: str,
+        vector: tuple[float, float] | None,
+    ) -> None:
+        entities = self._groups[group]
+        entity = entities.get(name)
+        if entity is None:
+            entity = RenderEntity(f"{group}:{name}", kind, position, radius, color, label, vector)
+            entities[name] = entity
+            self._sequence += 1
+            self.index.insert(entity, (self._group_rank[group], self._sequence))
+            delta.added.append(entity)
+        elif (
+            entity.position != position
+            or entity.radius != radius
+            or entity.label != label
+            or entity.vector != vector
+        ):
+            entity.position = position
+            entity.radius = radius
+            entity.label = label
+            entity.vector = vector
+            self.index.update(entity)
+            delta.changed.append(entity)
+        if self._seen.get(entity.id) != self._generation:
+            self._seen[entity.id] = self._generation
+            self._matched += 1
+
+
 class RenderEngine:
     def __init__(self, config: RenderConfig | None = None) -> None:
         self.config = config or RenderConfig()
+        if self.config.world_scale <= 0.0:
+            raise ValueError("world_scale must be positive")
+        if self.config.cull_margin < 0.0:
+            raise ValueError("cull_margin must be non-negative")
+        if self.config.cull_cell_size <= 0.0:
+            raise ValueError("cull_cell_size must be positive")
+        if self.config.backend not in _BACKENDS:
+            raise ValueError(f"Unknown render backend: {self.config.backend}")
+        if self.config.backend == "numpy":
+            require_numpy()
+        self.buffer: Any = None
+
+    def visible_entities(self, frame: FrameData) -> list[RenderEntity]:
+        if frame.index is not None:
+            return frame.index.visible(self.config)
+        return [
+            entity
+            for entity in frame.entities
+            if on_screen(self.config, entity.position, entity.radius, entity.vector)
+        ]
 
-    def draw(self, frame: FrameData, surface: Any = None) -> dict[str, Any]:
+    def rasterize(self, frame: FrameData) -> Any:
+        self.buffer = rasterize(self.visible_entities(frame), self.config)
+        return self.buffer
+
+    def draw(self, frame: FrameData, surface: Any = None, cull_stats: bool = False) -> dict[str, Any]:
         world = {
             "entities_drawn": len(frame.entities),
             "stability": frame.hud.stability_index,
             "commodity_count": len(frame.hud.commodity_prices),
             "drone_count": len(frame.hud.drone_states),
         }
+        if surface is None and self.config.backend != "numpy" and not cull_stats:
+            return world
+
+        visible = self.visible_entities(frame)
+        world["entities_drawn"] = len(visible)
+        world["entities_culled"] = len(frame.entities) - len(visible)
+        if self.config.backend == "numpy":
+            self.buffer = rasterize(visible, self.config)
+            if surface is not None:
+                blit(self.buffer, surface)
+            return world
         if surface is None:
             return world
 
@@ -87,14 +280,14 @@ class RenderEngine:
         except Exception as exc:
             raise RuntimeError("Pygame is required for surface drawing mode") from exc
 
-        surface.fill((14, 20, 34))
-        for entity in frame.entities:
+        surface.fill(BACKGROUND_COLOR)
+        for entity in visible:
             sx = int(self.config.width / 2 + (entity.position[0] - self.config.camera[0]) * self.config.world_scale)
             sy = int(self.config.height / 2 + (entity.position[1] - self.config.camera[1]) * self.config.world_scale)
             pygame.draw.circle(surface, entity.color, (sx, sy), max(1, int(entity.radius)))
             if self.config.show_debug_vectors and entity.vector is not None:
                 ex = int(sx + entity.vector[0] * 4)
                 ey = int(sy + entity.vector[1] * 4)
-                pygame.draw.line(surface, (230, 230, 230), (sx, sy), (ex, ey), 1)
+                pygame.draw.line(surface, VECTOR_COLOR, (sx, sy), (ex, ey), 1)
 
         return world
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
+from typing import Any
 
 Vector2 = tuple[float, float]
 
@@ -12,6 +13,9 @@ class RenderConfig:
     world_scale: float = 12.0
     camera: Vector2 = (0.0, 0.0)
     show_debug_vectors: bool = True
+    cull_margin: float = 32.0
+    cull_cell_size: float = 16.0
+    backend: str = "pygame"
 
 
 @dataclass
@@ -36,3 +40,11 @@ class HudData:
 class FrameData:
     entities: list[RenderEntity] = field(default_factory=list)
     hud: HudData = field(default_factory=lambda: HudData(stability_index=1.0))
+    index: Any = field(default=None, compare=False, repr=False)
+
+
+@dataclass
+class FrameDelta:
+    added: list[RenderEntity] = field(default_factory=list)
+    changed: list[RenderEntity] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
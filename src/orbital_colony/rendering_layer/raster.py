@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+from typing import Any
+
+from orbital_colony._numeric import HAS_NUMPY, require_numpy
+
+from .models import RenderConfig, RenderEntity
+
+BACKGROUND_COLOR = (14, 20, 34)
+VECTOR_COLOR = (230, 230, 230)
+
+
+def _disk_spans(numpy: Any, sx: Any, sy: Any, radii: Any, width: int, height: int) -> tuple[Any, Any, Any]:
+    # Each disk is cut to the rows it covers on screen, and each row to the columns inside both the disk and
+    # the viewport, so the work is bounded by the visible area whatever the radius.
+    top = numpy.maximum(sy - radii, 0)
+    rows = numpy.maximum(numpy.minimum(sy + radii, height - 1) - top + 1, 0)
+    owner = numpy.repeat(numpy.arange(len(sx)), rows)
+    y = top[owner] + numpy.arange(len(owner)) - numpy.repeat(numpy.cumsum(rows) - rows, rows)
+    dy = y - sy[owner]
+    reach = radii[owner] * radii[owner] - dy * dy
+    half = numpy.floor(numpy.sqrt(reach)).astype(numpy.int64)
+    half += (half + 1) * (half + 1) <= reach
+    half -= half * half > reach
+    left = numpy.maximum(sx[owner] - half, 0)
+    lengths = numpy.maximum(numpy.minimum(sx[owner] + half, width - 1) - left + 1, 0)
+    span = numpy.repeat(numpy.arange(len(owner)), lengths)
+    xs = left[span] + numpy.arange(len(span)) - numpy.repeat(numpy.cumsum(lengths) - lengths, lengths)
+    return xs, y[span], owner[span]
+
+
+def _clip_segments(
+    numpy: Any, x0: Any, y0: Any, dx: Any, dy: Any, width: int, height: int
+) -> tuple[Any, Any]:
+    # Liang-Barsky against the viewport grown by a pixel, so every sample that rounds onto the screen is kept.
+    low = numpy.zeros(len(x0))
+    high = numpy.ones(len(x0))
+    for p, q in ((-dx, x0 + 1.0), (dx, width - x0), (-dy, y0 + 1.0), (dy, height - y0)):
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            ratio = q / p
+        low = numpy.where(p < 0, numpy.maximum(low, ratio), low)
+        high = numpy.where(p > 0, numpy.minimum(high, ratio), high)
+        high = numpy.where((p == 0) & (q < 0), -1.0, high)
+    return low, high
+
+
+def rasterize(entities: list[RenderEntity], config: RenderConfig) -> Any:
+    # Every circle and debug vector is turned into (pixel, stroke) pairs in batched passes, clipped to the
+    # viewport first; strokes are numbered in the order the surface path draws them (circle then vector,
+    # entity by entity), so keeping the highest stroke per pixel in an index buffer reproduces its painter's
+    # order.
+    numpy = require_numpy()
+    width, height = config.width, config.height
+    count = len(entities)
+    buffer = numpy.empty((height, width, 3), dtype=numpy.uint8)
+    buffer[:] = BACKGROUND_COLOR
+    if count == 0 or width <= 0 or height <= 0:
+        return buffer
+
+    positions = numpy.array([entity.position for entity in entities], dtype=float).reshape(count, 2)
+    sx = (width / 2 + (positions[:, 0] - config.camera[0]) * config.world_scale).astype(numpy.int64)
+    sy = (height / 2 + (positions[:, 1] - config.camera[1]) * config.world_scale).astype(numpy.int64)
+    radii = numpy.maximum(1, numpy.array([int(entity.radius) for entity in entities], dtype=numpy.int64))
+    palette = numpy.empty((2 * count + 1, 3), dtype=numpy.uint8)
+    palette[0] = BACKGROUND_COLOR
+    palette[1::2] = numpy.array([entity.color for entity in entities], dtype=numpy.uint8).reshape(count, 3)
+    palette[2::2] = VECTOR_COLOR
+
+    xs, ys, owner = _disk_spans(numpy, sx, sy, radii, width, height)
+    pixels = [(xs, ys)]
+    strokes = [2 * owner + 1]
+
+    if config.show_debug_vectors:
+        drawn = numpy.array([entity.vector is not None for entity in entities], dtype=bool)
+        members = numpy.flatnonzero(drawn)
+        if len(members):
+            vectors = numpy.array([entities[index].vector for index in members.tolist()], dtype=float)
+            ex = (sx[members] + vectors[:, 0] * 4).astype(numpy.int64)
+            ey = (sy[members] + vectors[:, 1] * 4).astype(numpy.int64)
+            dx = ex - sx[members]
+            dy = ey - sy[members]
+            spans = numpy.maximum(numpy.abs(dx), numpy.abs(dy))
+            low, high = _clip_segments(numpy, sx[members], sy[members], dx, dy, width, height)
+            first = numpy.ceil(low * spans).astype(numpy.int64)
+            samples = numpy.where(high >= low, numpy.floor(high * spans).astype(numpy.int64) - first + 1, 0)
+            samples = numpy.maximum(samples, 0)
+            owner = numpy.repeat(numpy.arange(len(members)), samples)
+            starts = numpy.cumsum(samples) - samples
+            t = (first[owner] + numpy.arange(len(owner)) - starts[owner]) / numpy.maximum(spans[owner], 1)
+            xs = numpy.rint(sx[members][owner] + t * dx[owner]).astype(numpy.int64)
+            ys = numpy.rint(sy[members][owner] + t * dy[owner]).astype(numpy.int64)
+            pixels.append((xs, ys))
+            strokes.append(2 * members[owner] + 2)
+
+    xs = numpy.concatenate([x for x, _ in pixels])
+    ys = numpy.concatenate([y for _, y in pixels])
+    order = numpy.concatenate(strokes)
+    inside = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+    index = numpy.zeros(height * width, dtype=numpy.int64)
+    numpy.maximum.at(index, ys[inside] * width + xs[inside], order[inside])
+    return palette[index].reshape(height, width, 3)
+
+
+def blit(buffer: Any, surface: Any) -> None:
+    try:
+        import pygame  # type: ignore
+    except Exception as exc:
+        raise RuntimeError("Pygame is required to blit a raster buffer to a surface") from exc
+    pygame.surfarray.blit_array(surface, buffer.swapaxes(0, 1))
@@ -15,3 +15,5 @@ class GameConfig:
     npc: NpcConfig = field(default_factory=NpcConfig)
     render: RenderConfig = field(default_factory=RenderConfig)
     fixed_dt: float = 0.1
+    in_place_stepping: bool = False
+    retained_scene: bool = False
@@ -1,16 +1,46 @@
+import random
 import unittest
+from math import pi, sqrt
 
 from orbital_colony.core_physics import (
+    HAS_NUMPY,
     CelestialBody,
     ColonyNode,
+    FieldCache,
+    FieldGrid,
     PhysicsConfig,
     PhysicsEngine,
+    PhysicsEnsemble,
     PhysicsState,
+    TrajectoryPredictor,
     compute_body_accelerations,
+    compute_body_accelerations_array,
+    compute_body_accelerations_barnes_hut,
     compute_gravity_at_point,
+    compute_stability_index,
+    compute_total_energy,
+    find_isolated_pairs,
+    isolation_horizons,
+    pack_bodies,
+    perturb_states,
+    propagate_kepler,
+    sample_grid,
 )
 
 
+def make_random_bodies(count: int, seed: int = 11) -> list[CelestialBody]:
+    rng = random.Random(seed)
+    return [
+        CelestialBody(
+            name=f"body-{index}",
+            mass=rng.uniform(0.5, 20.0),
+            position=(rng.uniform(-50.0, 50.0), rng.uniform(-50.0, 50.0)),
+            velocity=(rng.uniform(-1.0, 1.0), rng.uniform(-1.0, 1.0)),
+        )
+        for index in range(count)
+    ]
+
+
 class TestCorePhysics(unittest.TestCase):
     def test_two_body_force_symmetry(self) -> None:
         config = PhysicsConfig(gravitational_constant=1.0, softening=1e-6)
@@ -69,6 +99,501 @@ class TestCorePhysics(unittest.TestCase):
         self.assertAlmostEqual(state_a.colony.position[0], state_b.colony.position[0], places=10)
         self.assertAlmostEqual(state_a.colony.position[1], state_b.colony.position[1], places=10)
 
+    @unittest.skipUnless(HAS_NUMPY, "numpy not installed")
+    def test_numpy_accelerations_match_scalar_path(self) -> None:
+        config = PhysicsConfig(softening=1e-2)
+        bodies = make_random_bodies(40)
+        expected = compute_body_accelerations(bodies, config)
+        positions, _, masses = pack_bodies(bodies)
+        actual = compute_body_accelerations_array(positions, masses, config)
+
+        for (ex, ey), (ax, ay) in zip(expected, actual.tolist()):
+            self.assertAlmostEqual(ex, ax, places=9)
+            self.assertAlmostEqual(ey, ay, places=9)
+
+    @unittest.skipUnless(HAS_NUMPY, "numpy not installed")
+    def test_numpy_backend_step_matches_python_backend(self) -> None:
+        python_engine = PhysicsEngine(PhysicsConfig(backend="python"))
+        numpy_engine = PhysicsEngine(PhysicsConfig(backend="numpy"))
+        state_py = PhysicsState(
+            bodies=make_random_bodies(24),
+            colony=ColonyNode(name="colony", mass=2.0, position=(0.0, 0.0)),
+        )
+        state_np = PhysicsState(
+            bodies=make_random_bodies(24),
+            colony=ColonyNode(name="colony", mass=2.0, position=(0.0, 0.0)),
+        )
+        for _ in range(20):
+            state_py = python_engine.step(state_py, 0.05)
+            state_np = numpy_engine.step(state_np, 0.05)
+
+        for body_py, body_np in zip(state_py.bodies, state_np.bodies):
+            self.assertAlmostEqual(body_py.position[0], body_np.position[0], places=8)
+            self.assertAlmostEqual(body_py.position[1], body_np.position[1], places=8)
+            self.assertAlmostEqual(body_py.velocity[0], body_np.velocity[0], places=8)
+        self.assertAlmostEqual(state_py.stability_index, state_np.stability_index, places=8)
+
+    def test_unknown_backend_rejected(self) -> None:
+        with self.assertRaises(ValueError):
+            PhysicsEngine(PhysicsConfig(backend="fortran"))
+
+    def test_barnes_hut_with_zero_opening_angle_is_exact(self) -> None:
+        config = PhysicsConfig(softening=1e-2, opening_angle=0.0)
+        bodies = make_random_bodies(60)
+        expected = compute_body_accelerations(bodies, config)
+        actual = compute_body_accelerations_barnes_hut(bodies, config)
+
+        for (ex, ey), (ax, ay) in zip(expected, actual):
+            self.assertAlmostEqual(ex, ax, places=9)
+            self.assertAlmostEqual(ey, ay, places=9)
+
+    def test_barnes_hut_approximation_error_is_small(self) -> None:
+        config = PhysicsConfig(softening=1e-2, opening_angle=0.5)
+        bodies = make_random_bodies(300, seed=5)
+        expected = compute_body_accelerations(bodies, config)
+        actual = compute_body_accelerations_barnes_hut(bodies, config)
+
+        errors = sorted(
+            sqrt((ax - ex) ** 2 + (ay - ey) ** 2) / max(sqrt(ex * ex + ey * ey), 1e-12)
+            for (ex, ey), (ax, ay) in zip(expected, actual)
+        )
+        self.assertLess(errors[len(errors) // 2], 0.02)
+
+    def test_engine_selects_barnes_hut_solver(self) -> None:
+        direct = PhysicsEngine(PhysicsConfig(backend="python"))
+        tree = PhysicsEngine(PhysicsConfig(gravity_solver="barnes_hut", opening_angle=0.0))
+        state_direct = PhysicsState(bodies=make_random_bodies(30))
+        state_tree = PhysicsState(bodies=make_random_bodies(30))
+        for _ in range(5):
+            state_direct = direct.step(state_direct, 0.1)
+            state_tree = tree.step(state_tree, 0.1)
+
+        for body_direct, body_tree in zip(state_direct.bodies, state_tree.bodies):
+            self.assertAlmostEqual(body_direct.position[0], body_tree.position[0], places=8)
+            self.assertAlmostEqual(body_direct.position[1], body_tree.position[1], places=8)
+
+        with self.assertRaises(ValueError):
+            PhysicsEngine(PhysicsConfig(gravity_solver="fmm"))
+
+    def test_symplectic_integrators_allow_larger_steps(self) -> None:
+        def binary() -> PhysicsState:
+            return PhysicsState(
+                bodies=[
+                    CelestialBody(name="a", mass=1.0, position=(-1.0, 0.0), velocity=(0.0, -0.5)),
+                    CelestialBody(name="b", mass=1.0, position=(1.0, 0.0), velocity=(0.0, 0.5)),
+                ]
+            )
+
+        def energy_drift(integrator: str, dt: float) -> float:
+            config = PhysicsConfig(softening=1e-6, integrator=integrator, backend="python")
+            engine = PhysicsEngine(config)
+            state = binary()
+            initial = compute_total_energy(state.bodies, config)
+            for _ in range(int(round(40.0 / dt))):
+                state = engine.step(state, dt)
+                self.assertEqual(state.substeps, 1)
+            return abs(compute_total_energy(state.bodies, config) - initial) / abs(initial)
+
+        euler_drift = energy_drift("euler", 0.1)
+        self.assertLess(energy_drift("leapfrog", 0.4), euler_drift)
+        self.assertLess(energy_drift("yoshida4", 0.4), euler_drift)
+        self.assertLess(energy_drift("rk4", 0.4), euler_drift)
+
+    def test_adaptive_integrator_reports_substeps(self) -> None:
+        config = PhysicsConfig(softening=1e-6, integrator="adaptive", adaptive_tolerance=1e-6, max_substeps=64)
+        engine = PhysicsEngine(config)
+        state = PhysicsState(
+            bodies=[
+                CelestialBody(name="a", mass=1.0, position=(-1.0, 0.0), velocity=(0.0, -0.5)),
+                CelestialBody(name="b", mass=1.0, position=(1.0, 0.0), velocity=(0.0, 0.5)),
+            ],
+            colony=ColonyNode(name="colony", mass=1.0, position=(0.0, 6.0)),
+        )
+        initial = compute_total_energy(state.bodies, config)
+        for _ in range(20):
+            state = engine.step(state, 2.0)
+            self.assertGreater(state.substeps, 1)
+            self.assertLessEqual(state.substeps, 64)
+
+        self.assertAlmostEqual(state.time_seconds, 40.0, places=9)
+        self.assertLess(abs(compute_total_energy(state.bodies, config) - initial) / abs(initial), 1e-6)
+
+        with self.assertRaises(ValueError):
+            PhysicsEngine(PhysicsConfig(integrator="midpoint"))
+
+    def test_grid_fields_match_point_evaluation(self) -> None:
+        config = PhysicsConfig(softening=1e-2, tidal_scale=0.5)
+        bodies = make_random_bodies(8)
+        grid = FieldGrid(origin=(-20.0, -10.0), spacing=2.5, columns=7, rows=5)
+        sample = sample_grid(grid, bodies, config)
+
+        self.assertEqual(len(sample.points), 35)
+        self.assertEqual(tuple(sample.points[8]), (-17.5, -7.5))
+        for point, gravity, stability in zip(sample.points, sample.gravity, sample.stability):
+            point = (float(point[0]), float(point[1]))
+            expected_gravity = compute_gravity_at_point(point, bodies, config)
+            expected_stability = compute_stability_index(
+                ColonyNode(name="probe", mass=1.0, position=point),
+                bodies,
+                config,
+            )
+            self.assertAlmostEqual(float(gravity[0]), expected_gravity[0], places=9)
+            self.assertAlmostEqual(float(gravity[1]), expected_gravity[1], places=9)
+            self.assertAlmostEqual(float(stability), expected_stability, places=9)
+
+    def test_field_cache_reuses_static_overlays(self) -> None:
+        cache = FieldCache(PhysicsConfig(), max_entries=2)
+        grid = FieldGrid(origin=(0.0, 0.0), spacing=1.0, columns=4, rows=4)
+        state = PhysicsState(bodies=make_random_bodies(3), time_seconds=1.0)
+
+        first = cache.sample_grid(grid, state)
+        again = cache.sample_grid(grid, PhysicsState(bodies=make_random_bodies(3), time_seconds=2.0))
+        self.assertIs(first, again)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+        moved = make_random_bodies(3)
+        moved[0].position = (moved[0].position[0] + 1.0, moved[0].position[1])
+        self.assertIsNot(cache.sample_grid(grid, PhysicsState(bodies=moved)), first)
+        self.assertEqual(cache.misses, 2)
+
+        timed = FieldCache(PhysicsConfig(), time_quantum=1.0)
+        timed.sample_points([(1.0, 1.0), (2.0, 2.0)], state)
+        timed.sample_points([(1.0, 1.0), (2.0, 2.0)], PhysicsState(bodies=state.bodies, time_seconds=1.5))
+        timed.sample_points([(1.0, 1.0), (2.0, 2.0)], PhysicsState(bodies=state.bodies, time_seconds=2.5))
+        self.assertEqual((timed.hits, timed.misses), (1, 2))
+
+    def test_multi_colony_state_keeps_primary_colony(self) -> None:
+        primary = ColonyNode(name="primary", mass=1.0, position=(0.0, 0.0))
+        outpost = ColonyNode(name="outpost", mass=1.0, position=(5.0, 5.0))
+        state = PhysicsState(colony=primary, colonies=[outpost])
+        self.assertEqual([c.name for c in state.colonies], ["primary", "outpost"])
+
+        state = PhysicsState(colonies=[outpost, primary])
+        self.assertIs(state.colony, outpost)
+
+    def test_colony_assigned_after_construction_is_stepped(self) -> None:
+        engine = PhysicsEngine(PhysicsConfig(softening=1e-2))
+        expected = PhysicsState(
+            bodies=make_random_bodies(4), colony=ColonyNode(name="late", mass=1.0, position=(2.0, 3.0))
+        )
+        state = PhysicsState(bodies=make_random_bodies(4))
+        state.colony = ColonyNode(name="late", mass=1.0, position=(2.0, 3.0))
+        for _ in range(5):
+            expected = engine.step(expected, 0.1)
+            state = engine.step(state, 0.1)
+        self.assertEqual(state.colony, expected.colony)
+        self.assertEqual([c.name for c in state.colonies], ["late"])
+
+        state.colony = ColonyNode(name="swapped", mass=1.0, position=(-4.0, 1.0))
+        engine.step_in_place(state, 0.1)
+        self.assertEqual([c.name for c in state.colonies], ["swapped"])
+        self.assertNotEqual(state.colony.position, (-4.0, 1.0))
+
+        state.colony = None
+        self.assertEqual(engine.step(state, 0.1).colonies, [])
+
+    def test_batched_colonies_match_individual_steps(self) -> None:
+        config = PhysicsConfig(softening=1e-2, backend="python")
+        engine = PhysicsEngine(config)
+        rng = random.Random(2)
+        colonies = [
+            ColonyNode(name=f"colony-{index}", mass=1.0, position=(rng.uniform(-30, 30), rng.uniform(-30, 30)))
+            for index in range(12)
+        ]
+        batched = PhysicsState(bodies=make_random_bodies(5), colonies=colonies)
+        for _ in range(10):
+            batched = engine.step(batched, 0.1)
+
+        self.assertEqual(len(batched.colony_stability), 12)
+        self.assertEqual(batched.stability_index, batched.colony_stability[0])
+        for index, colony in enumerate(colonies):
+            single = PhysicsState(bodies=make_random_bodies(5), colony=colony)
+            for _ in range(10):
+                single = engine.step(single, 0.1)
+            self.assertEqual(batched.colonies[index].position, single.colony.position)
+            self.assertEqual(batched.colony_stability[index], single.stability_index)
+
+    @unittest.skipUnless(HAS_NUMPY, "numpy not installed")
+    def test_numpy_colony_batch_matches_python(self) -> None:
+        rng = random.Random(4)
+        colonies = [
+            ColonyNode(name=f"colony-{index}", mass=1.0, position=(rng.uniform(-30, 30), rng.uniform(-30, 30)))
+            for index in range(200)
+        ]
+        states = {}
+        for backend in ("python", "numpy"):
+            engine = PhysicsEngine(PhysicsConfig(softening=1e-2, backend=backend, tidal_scale=2.0))
+            state = PhysicsState(bodies=make_random_bodies(6), colonies=list(colonies))
+            for _ in range(5):
+                state = engine.step(state, 0.1)
+            states[backend] = state
+
+        for py_colony, np_colony in zip(states["python"].colonies, states["numpy"].colonies):
+            self.assertAlmostEqual(py_colony.position[0], np_colony.position[0], places=9)
+            self.assertAlmostEqual(py_colony.position[1], np_colony.position[1], places=9)
+        for py_index, np_index in zip(states["python"].colony_stability, states["numpy"].colony_stability):
+            self.assertAlmostEqual(py_index, np_index, places=9)
+
+    def test_step_in_place_matches_step_and_reuses_objects(self) -> None:
+        engine = PhysicsEngine(PhysicsConfig(softening=1e-2))
+        copied = PhysicsState(
+            bodies=make_random_bodies(6),
+            colonies=[
+                ColonyNode(name="a", mass=1.0, position=(1.0, 2.0)),
+                ColonyNode(name="b", mass=1.0, position=(-3.0, 4.0)),
+            ],
+        )
+        mutated = PhysicsState(
+            bodies=make_random_bodies(6),
+            colonies=[
+                ColonyNode(name="a", mass=1.0, position=(1.0, 2.0)),
+                ColonyNode(name="b", mass=1.0, position=(-3.0, 4.0)),
+            ],
+        )
+        bodies = list(mutated.bodies)
+        colonies = list(mutated.colonies)
+        for _ in range(10):
+            copied = engine.step(copied, 0.1)
+            self.assertIs(engine.step_in_place(mutated, 0.1), mutated)
+
+        self.assertTrue(all(a is b for a, b in zip(bodies, mutated.bodies)))
+        self.assertTrue(all(a is b for a, b in zip(colonies, mutated.colonies)))
+        self.assertEqual([b.position for b in copied.bodies], [b.position for b in mutated.bodies])
+        self.assertEqual([c.position for c in copied.colonies], [c.position for c in mutated.colonies])
+        self.assertEqual(copied.colony_stability, mutated.colony_stability)
+        self.assertEqual(copied.stability_index, mutated.stability_index)
+        self.assertAlmostEqual(copied.time_seconds, mutated.time_seconds, places=12)
+
+    @unittest.skipUnless(HAS_NUMPY, "numpy not installed")
+    def test_ensemble_matches_individual_scenarios(self) -> None:
+        config = PhysicsConfig(softening=1e-2, backend="numpy", tidal_scale=1.0)
+        base = PhysicsState(
+            bodies=make_random_bodies(5),
+            colonies=[
+                ColonyNode(name="a", mass=1.0, position=(0.0, 0.0)),
+                ColonyNode(name="b", mass=1.0, position=(12.0, -4.0)),
+            ],
+        )
+        scenarios = perturb_states(base, 6, position_sigma=0.5, velocity_sigma=0.05, seed=3)
+        result = PhysicsEnsemble(scenarios, config).run(0.1, 15)
+
+        self.assertEqual(result.stability_traces.shape, (6, 15, 2))
+        self.assertEqual(result.primary_stability_traces.shape, (6, 15))
+        self.assertGreater(len({round(float(v), 12) for v in result.stability_traces[:, -1, 0]}), 1)
+
+        engine = PhysicsEngine(config)
+        for scenario_index, (scenario, batched) in enumerate(zip(scenarios, result.states)):
+            state = scenario
+            for step_index in range(15):
+                state = engine.step(state, 0.1)
+                self.assertAlmostEqual(
+                    state.stability_index,
+                    float(result.stability_traces[scenario_index, step_index, 0]),
+                    places=9,
+                )
+            for expected, actual in zip(state.bodies, batched.bodies):
+                self.assertAlmostEqual(expected.position[0], actual.position[0], places=9)
+                self.assertAlmostEqual(expected.position[1], actual.position[1], places=9)
+            for expected, actual in zip(state.colony_stability, batched.colony_stability):
+                self.assertAlmostEqual(expected, actual, places=9)
+            self.assertAlmostEqual(state.time_seconds, batched.time_seconds, places=12)
+
+    @unittest.skipUnless(HAS_NUMPY, "numpy not installed")
+    def test_ensemble_rejects_mismatched_scenarios(self) -> None:
+        with self.assertRaises(ValueError):
+            PhysicsEnsemble([PhysicsState(bodies=make_random_bodies(2)), PhysicsState(bodies=make_random_bodies(3))])
+
+    def test_trajectory_prediction_extends_incrementally(self) -> None:
+        engine = PhysicsEngine(PhysicsConfig(softening=1e-2))
+        state = PhysicsState(
+            bodies=make_random_bodies(4),
+            colony=ColonyNode(name="colony", mass=1.0, position=(3.0, 3.0)),
+        )
+        predictor = TrajectoryPredictor(engine, step_seconds=0.1, horizon_seconds=2.0)
+
+        prediction = predictor.predict(state, names=["body-1", "colony"])
+        self.assertEqual(len(prediction["body-1"].positions), 21)
+        self.assertEqual(predictor.steps_computed, 20)
+
+        actual = state
+        for _ in range(5):
+            actual = engine.step(actual, 0.1)
+        prediction = predictor.predict(actual, names=["body-1", "colony"])
+        self.assertEqual(predictor.rebuilds, 1)
+        self.assertEqual(predictor.steps_computed, 25)
+        self.assertEqual(prediction["colony"].positions[0], actual.colony.position)
+
+        future = actual
+        for _ in range(20):
+            future = engine.step(future, 0.1)
+        self.assertEqual(prediction["body-1"].positions[-1], future.bodies[1].position)
+        self.assertAlmostEqual(prediction["body-1"].times[-1], future.time_seconds, places=9)
+
+        with self.assertRaises(KeyError):
+            predictor.predict(actual, names=["missing"])
+
+    def test_trajectory_prediction_reuses_coarser_steps_than_the_simulation(self) -> None:
+        engine = PhysicsEngine(PhysicsConfig(softening=1e-2))
+        state = PhysicsState(
+            bodies=make_random_bodies(4),
+            colony=ColonyNode(name="colony", mass=1.0, position=(3.0, 3.0)),
+        )
+        predictor = TrajectoryPredictor(engine, step_seconds=0.5, horizon_seconds=5.0)
+
+        for _ in range(30):
+            prediction = predictor.predict(state)
+            self.assertEqual(prediction["colony"].positions[0], state.colony.position)
+            self.assertEqual(prediction["colony"].times[0], state.time_seconds)
+            state = engine.step(state, 0.1)
+        self.assertEqual(predictor.rebuilds, 1)
+        self.assertEqual(predictor.steps_computed, 16)
+
+        state.bodies[0].velocity = (state.bodies[0].velocity[0] + 0.5, state.bodies[0].velocity[1])
+        predictor.predict(state)
+        self.assertEqual(predictor.rebuilds, 2)
+
+    def test_trajectory_prediction_invalidates_on_impulse(self) -> None:
+        engine = PhysicsEngine(PhysicsConfig(softening=1e-2))
+        state = PhysicsState(bodies=make_random_bodies(3))
+        predictor = TrajectoryPredictor(engine, step_seconds=0.1, horizon_seconds=1.0)
+        predictor.predict(state)
+
+        state = engine.step(state, 0.1)
+        state.bodies[0].velocity = (state.bodies[0].velocity[0] + 0.5, state.bodies[0].velocity[1])
+        predictor.predict(state)
+        self.assertEqual(predictor.rebuilds, 2)
+
+        state = engine.step(state, 0.1)
+        state.bodies.append(CelestialBody(name="probe", mass=0.1, position=(1.0, 1.0)))
+        prediction = predictor.predict(state)
+        self.assertEqual(predictor.rebuilds, 3)
+        self.assertIn("probe", prediction)
+
+    def test_kepler_propagation_is_periodic_and_matches_integration(self) -> None:
+        position, velocity = propagate_kepler((1.0, 0.0), (0.0, 1.0), 1.0, 2.0 * pi * 1000.0 + 1.0)
+        self.assertAlmostEqual(position[0], 0.5403023058681398, places=9)
+        self.assertAlmostEqual(position[1], 0.8414709848078965, places=9)
+        self.assertAlmostEqual(velocity[0], -0.8414709848078965, places=9)
+
+        engine = PhysicsEngine(PhysicsConfig(softening=1e-9, integrator="yoshida4", backend="python"))
+        state = PhysicsState(
+            bodies=[
+                CelestialBody(name="a", mass=1.0, position=(0.0, 0.0)),
+                CelestialBody(name="b", mass=1e-12, position=(1.0, 0.0), velocity=(0.3, 1.2)),
+            ]
+        )
+        for _ in range(370):
+            state = engine.step(state, 0.01)
+        position, _ = propagate_kepler((1.0, 0.0), (0.3, 1.2), 1.0, 3.7)
+        self.assertAlmostEqual(state.bodies[1].position[0], position[0], places=6)
+        self.assertAlmostEqual(state.bodies[1].position[1], position[1], places=6)
+
+    def test_kepler_fast_path_matches_full_integration(self) -> None:
+        def make_state() -> PhysicsState:
+            return PhysicsState(
+                bodies=[
+                    CelestialBody(name="planet", mass=1.0, position=(0.0, 0.0)),
+                    CelestialBody(name="moon", mass=0.5, position=(1.0, 0.0), velocity=(0.0, sqrt(1.5))),
+                    CelestialBody(name="far", mass=1.0, position=(200.0, 0.0), velocity=(0.0, 0.05)),
+                ],
+                colony=ColonyNode(name="colony", mass=1.0, position=(0.0, 300.0)),
+            )
+
+        fast = PhysicsEngine(PhysicsConfig(softening=1e-4, integrator="yoshida4", kepler_fast_path=True))
+        reference = PhysicsEngine(PhysicsConfig(softening=1e-4, integrator="yoshida4", backend="python"))
+        self.assertEqual(find_isolated_pairs(make_state().bodies, fast.config, make_state().colonies), [(0, 1)])
+
+        fast_state = make_state()
+        reference_state = make_state()
+        for _ in range(40):
+            fast_state = fast.step(fast_state, 0.5)
+        for _ in range(4000):
+            reference_state = reference.step(reference_state, 0.005)
+
+        for expected, actual in zip(reference_state.bodies, fast_state.bodies):
+            self.assertAlmostEqual(expected.position[0], actual.position[0], places=4)
+            self.assertAlmostEqual(expected.position[1], actual.position[1], places=4)
+        self.assertAlmostEqual(reference_state.stability_index, fast_state.stability_index, places=6)
+        self.assertAlmostEqual(fast_state.time_seconds, 20.0, places=9)
+
+    def test_kepler_fast_path_skips_unbound_pairs(self) -> None:
+        config = PhysicsConfig(softening=1e-4, kepler_fast_path=True, backend="python")
+        bodies = [
+            CelestialBody(name="planet", mass=1.0, position=(0.0, 0.0)),
+            CelestialBody(name="moon", mass=0.5, position=(1.0, 0.0), velocity=(0.0, sqrt(1.5))),
+            CelestialBody(name="far", mass=1.0, position=(200.0, 0.0)),
+        ]
+        self.assertEqual(find_isolated_pairs(bodies, config), [(0, 1)])
+
+        # Past escape speed (sqrt(2 G M / r) = sqrt(3)) the moon is a flyby, not an orbit.
+        bodies[1].velocity = (0.0, 1.8)
+        self.assertEqual(isolation_horizons(bodies, config), {})
+
+    def test_fast_forward_isolated_pair_over_long_span(self) -> None:
+        engine = PhysicsEngine(PhysicsConfig(softening=1e-6, kepler_fast_path=True))
+        state = PhysicsState(
+            bodies=[
+                CelestialBody(name="planet", mass=1.0, position=(0.0, 0.0), velocity=(0.01, 0.0)),
+                CelestialBody(name="moon", mass=0.0, position=(1.0, 0.0), velocity=(0.01, 1.0)),
+            ]
+        )
+        span = 2.0 * pi * 1_000_000
+        result = engine.fast_forward(state, span, dt_seconds=0.1)
+
+        self.assertAlmostEqual(result.time_seconds, span, places=3)
+        self.assertEqual(result.substeps, 0)
+        drift = 0.01 * span
+        self.assertAlmostEqual(result.bodies[0].position[0], drift, delta=1e-3)
+        self.assertAlmostEqual(result.bodies[1].position[0] - drift, 1.0, delta=1e-3)
+        self.assertAlmostEqual(result.bodies[1].position[1], 0.0, delta=1e-3)
+
+    def test_fast_forward_stops_analytic_pair_when_perturber_approaches(self) -> None:
+        def make_state() -> PhysicsState:
+            return PhysicsState(
+                bodies=[
+                    CelestialBody(name="planet", mass=1.0, position=(0.0, 0.0)),
+                    CelestialBody(name="moon", mass=1e-3, position=(1.0, 0.0), velocity=(0.0, sqrt(1.001))),
+                    CelestialBody(name="rogue", mass=0.3, position=(60.0, 3.0), velocity=(-1.0, 0.0)),
+                ]
+            )
+
+        config = {"softening": 1e-4, "integrator": "yoshida4", "backend": "python"}
+        fast = PhysicsEngine(PhysicsConfig(kepler_fast_path=True, **config))
+        reference = PhysicsEngine(PhysicsConfig(**config))
+        self.assertEqual(find_isolated_pairs(make_state().bodies, fast.config), [(0, 1)])
+
+        result = fast.fast_forward(make_state(), 80.0, dt_seconds=0.01)
+        expected = make_state()
+        for _ in range(8000):
+            expected = reference.step(expected, 0.01)
+        for body, reference_body in zip(result.bodies, expected.bodies):
+            self.assertAlmostEqual(body.position[0], reference_body.position[0], delta=1e-2)
+            self.assertAlmostEqual(body.position[1], reference_body.position[1], delta=1e-2)
+
+    @unittest.skipUnless(HAS_NUMPY, "numpy not installed")
+    def test_isolation_horizons_numpy_matches_python(self) -> None:
+        rng = random.Random(3)
+        bodies = []
+        for index in range(40):
+            x, y = rng.uniform(-200.0, 200.0), rng.uniform(-200.0, 200.0)
+            bodies.append(CelestialBody(name=f"p{index}", mass=rng.uniform(0.5, 2.0), position=(x, y)))
+            bodies.append(
+                CelestialBody(
+                    name=f"m{index}",
+                    mass=1e-3,
+                    position=(x + rng.uniform(0.5, 1.0), y),
+                    velocity=(rng.uniform(-0.1, 0.1), rng.uniform(0.9, 1.1)),
+                )
+            )
+        colonies = [ColonyNode(name="c", mass=1.0, position=(3.0, 4.0), velocity=(0.1, 0.0))]
+
+        expected = isolation_horizons(bodies, PhysicsConfig(backend="python"), colonies)
+        actual = isolation_horizons(bodies, PhysicsConfig(backend="numpy"), colonies)
+        self.assertTrue(expected)
+        self.assertEqual(list(expected), list(actual))
+        for pair, horizon in expected.items():
+            self.assertAlmostEqual(actual[pair], horizon, delta=1e-9 * max(1.0, horizon))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,6 +1,24 @@
 import unittest
+import warnings
+from dataclasses import replace
+from math import log, sqrt
 
-from orbital_colony.economy_engine import CommodityState, EconomyConfig, EconomyEngine, EconomyState
+from orbital_colony.economy_engine import (
+    HAS_NUMPY,
+    ColonyMarket,
+    CommodityState,
+    EconomyConfig,
+    EconomyEngine,
+    EconomyState,
+    MarketNetwork,
+    Order,
+    OrderFill,
+    PriceHistory,
+    TradeRoute,
+    pack_economy,
+    unpack_economy,
+)
+from orbital_colony.economy_engine.rng import counter_normal, counter_normals, philox4x32
 
 
 class TestEconomyEngine(unittest.TestCase):
@@ -73,6 +91,288 @@ class TestEconomyEngine(unittest.TestCase):
         self.assertGreaterEqual(state_after_buy.commodities["METALS"].inventory, 0.0)
         self.assertGreaterEqual(filled, 0.0)
 
+    def test_step_in_place_matches_step(self) -> None:
+        copying = EconomyEngine(EconomyConfig(rng_seed=99))
+        mutating = EconomyEngine(EconomyConfig(rng_seed=99))
+        copied = copying.create_default_state()
+        mutated = mutating.create_default_state()
+        commodities = dict(mutated.commodities)
+
+        for _ in range(30):
+            copied = copying.step(copied, 0.1)
+            self.assertIs(mutating.step_in_place(mutated, 0.1), mutated)
+
+        for name, commodity in mutated.commodities.items():
+            self.assertIs(commodity, commodities[name])
+            self.assertEqual(commodity, copied.commodities[name])
+        self.assertAlmostEqual(mutated.time_seconds, copied.time_seconds, places=12)
+
+    @unittest.skipUnless(HAS_NUMPY, "numpy not installed")
+    def test_array_step_matches_scalar_trajectory(self) -> None:
+        config = EconomyConfig(
+            rng_seed=5,
+            volatility=0.3,
+            max_volatility_abs=0.1,
+            base_prices={f"GOOD{index}": 1.0 + index % 17 for index in range(500)},
+        )
+        scalar = EconomyEngine(config)
+        vectorized = EconomyEngine(config)
+        state = scalar.create_default_state()
+        for index, commodity in enumerate(state.commodities.values()):
+            commodity.supply_rate = 0.5 + index % 5
+            commodity.demand_rate = 0.5 + index % 7
+            commodity.inventory = float(index % 11)
+        arrays = pack_economy(state)
+
+        for _ in range(25):
+            state = scalar.step(state, 0.5)
+            self.assertIs(vectorized.step_arrays(arrays, 0.5), arrays)
+
+        self.assertEqual(unpack_economy(arrays), state)
+
+    def test_batch_orders_match_sequential_orders(self) -> None:
+        engine = EconomyEngine()
+        state = engine.create_default_state()
+        orders = [
+            Order("OXYGEN", "buy", 60.0),
+            Order("FUEL", "sell", 5.0),
+            Order("OXYGEN", "buy", 60.0),
+            Order("OXYGEN", "sell", 10.0),
+        ]
+
+        sequential = state
+        expected = []
+        for order in orders:
+            if order.side == "buy":
+                sequential, filled, cost = engine.place_buy_order(sequential, order.commodity, order.quantity)
+                expected.append((filled, cost, 0.0))
+            else:
+                sequential, revenue = engine.place_sell_order(sequential, order.commodity, order.quantity)
+                expected.append((order.quantity, 0.0, revenue))
+
+        batched, fills = engine.submit_orders(state, orders)
+        self.assertEqual(batched, sequential)
+        self.assertEqual([(f.filled, f.cost, f.revenue) for f in fills], expected)
+        self.assertEqual(fills[1].filled, 5.0)
+        self.assertEqual(fills[2].filled, 40.0)
+        self.assertEqual(state, engine.create_default_state())
+
+        engine.submit_orders_in_place(state, orders)
+        self.assertEqual(state, sequential)
+
+    def test_batch_orders_are_validated_before_any_fill(self) -> None:
+        engine = EconomyEngine()
+        state = engine.create_default_state()
+        with self.assertRaises(KeyError):
+            engine.submit_orders_in_place(state, [Order("OXYGEN", "buy", 1.0), Order("WATER", "buy", 1.0)])
+        with self.assertRaises(ValueError):
+            engine.submit_orders_in_place(state, [Order("OXYGEN", "short", 1.0)])
+        self.assertEqual(state, engine.create_default_state())
+
+    def make_markets(self) -> tuple[list[ColonyMarket], list[TradeRoute]]:
+        engine = EconomyEngine(EconomyConfig(volatility=0.01))
+        markets = []
+        for index, region in enumerate(["inner", "inner", "belt", "outer"]):
+            state = engine.create_default_state()
+            state.commodities["FUEL"].price = 8.0 + 6.0 * index
+            markets.append(ColonyMarket(name=f"colony-{index}", region=region, state=state))
+        routes = [
+            TradeRoute("colony-0", "colony-1", "FUEL", delay_seconds=1.0, capacity=4.0),
+            TradeRoute("colony-1", "colony-2", "FUEL", delay_seconds=2.0, capacity=4.0),
+            TradeRoute("colony-0", "colony-3", "FUEL", delay_seconds=3.0, capacity=2.0),
+        ]
+        return markets, routes
+
+    def test_market_network_ships_goods_along_price_gradient(self) -> None:
+        markets, routes = self.make_markets()
+        with MarketNetwork(markets, routes, EconomyConfig(volatility=0.01)) as network:
+            delivered = []
+            for _ in range(8):
+                delivered.extend(network.step(0.5))
+            result = {market.name: market for market in network.markets()}
+            routed = {name: set(quotes) for name, quotes in network.quotes.items()}
+        self.assertEqual(routed, {f"colony-{index}": {"FUEL"} for index in range(4)})
+
+        self.assertEqual(markets[0].state.commodities["FUEL"].inventory, 100.0)
+        self.assertTrue(any(s.route.destination == "colony-3" for s in delivered))
+        self.assertLess(result["colony-0"].state.commodities["FUEL"].inventory, 100.0)
+        self.assertGreater(result["colony-0"].state.commodities["FUEL"].demand_rate, 1.0)
+        self.assertGreater(result["colony-3"].state.commodities["FUEL"].supply_rate, 1.0)
+        self.assertTrue(all(s.arrival_seconds > 3.5 for s in network.in_transit))
+
+        with self.assertRaises(KeyError):
+            MarketNetwork(markets, [TradeRoute("colony-0", "colony-9", "FUEL", 1.0, 1.0)])
+
+    def test_market_network_workers_match_serial_run(self) -> None:
+        markets, routes = self.make_markets()
+        results = []
+        for workers in (0, 2):
+            with MarketNetwork(markets, routes, EconomyConfig(volatility=0.2), workers=workers) as network:
+                for _ in range(12):
+                    network.step(0.25)
+                results.append((network.markets(), network.in_transit))
+        self.assertEqual(results[0], results[1])
+
+    def test_philox_matches_reference_vectors(self) -> None:
+        self.assertEqual(philox4x32((0, 0, 0, 0), (0, 0)), (0x6627E8D5, 0xE169C58D, 0xBC57AC4C, 0x9B00DBD8))
+        self.assertEqual(
+            philox4x32((0x243F6A88, 0x85A308D3, 0x13198A2E, 0x03707344), (0xA4093822, 0x299F31D0)),
+            (0xD16CFE09, 0x94FDCCEB, 0x5001E420, 0x24126EA1),
+        )
+
+    def test_counter_rng_is_independent_of_commodity_order(self) -> None:
+        config = EconomyConfig(rng_mode="counter", rng_seed=42, volatility=0.2)
+        forward = EconomyEngine(config).create_default_state()
+        backward = EconomyState(commodities=dict(reversed(list(forward.commodities.items()))))
+        fuel_only = EconomyState(commodities={"FUEL": replace(forward.commodities["FUEL"])})
+
+        engine = EconomyEngine(config)
+        for _ in range(20):
+            forward = engine.step(forward, 0.5)
+        engine = EconomyEngine(config)
+        for _ in range(20):
+            backward = engine.step(backward, 0.5)
+            engine.step_in_place(fuel_only, 0.5)
+
+        self.assertEqual(forward.tick, 20)
+        for name, commodity in forward.commodities.items():
+            self.assertEqual(backward.commodities[name], commodity)
+        self.assertEqual(fuel_only.commodities["FUEL"], forward.commodities["FUEL"])
+        self.assertNotEqual(forward.commodities["FUEL"].last_volatility, 0.0)
+
+    @unittest.skipUnless(HAS_NUMPY, "numpy not installed")
+    def test_counter_rng_bulk_generation_matches_scalar(self) -> None:
+        names = ["OXYGEN", "FUEL", "METALS"]
+        bulk = counter_normals(2**40 + 9, names, [0, 1, 2**33])
+        for row, tick in enumerate([0, 1, 2**33]):
+            for column, name in enumerate(names):
+                self.assertAlmostEqual(bulk[row, column], counter_normal(2**40 + 9, name, tick), places=12)
+
+        config = EconomyConfig(rng_mode="counter", volatility=0.2)
+        engine = EconomyEngine(config)
+        state = engine.create_default_state()
+        arrays = pack_economy(state)
+        for _ in range(15):
+            state = engine.step(state, 0.5)
+            engine.step_arrays(arrays, 0.5)
+        unpacked = unpack_economy(arrays)
+        self.assertEqual(unpacked.tick, state.tick)
+        for name, commodity in state.commodities.items():
+            self.assertAlmostEqual(unpacked.commodities[name].price, commodity.price, places=9)
+
+    def test_price_history_rolls_up_ohlc_with_fixed_memory(self) -> None:
+        engine = EconomyEngine(EconomyConfig(volatility=0.1))
+        history = PriceHistory(tick_capacity=100, bar_capacity=5)
+        state = engine.create_default_state()
+        prices = []
+        for tick in range(600):
+            fills = []
+            if tick % 10 == 0:
+                state, fills = engine.submit_orders(state, [Order("FUEL", "sell", 2.0)])
+            state = engine.step(state, 1.0)
+            history.record(state, fills)
+            prices.append((state.time_seconds, state.commodities["FUEL"].price))
+
+        ticks = history.ticks("FUEL")
+        self.assertEqual(len(ticks), 100)
+        self.assertEqual([(p.time_seconds, p.price) for p in ticks], prices[-100:])
+        self.assertEqual(history.latest("FUEL").time_seconds, 600.0)
+        self.assertEqual([p.time_seconds for p in history.ticks("FUEL", 550.5, 553.0)], [551.0, 552.0, 553.0])
+
+        minutes = history.bars("FUEL", "minute")
+        self.assertEqual([bar.start_seconds for bar in minutes], [300.0, 360.0, 420.0, 480.0, 540.0, 600.0])
+        window = [price for time, price in prices if 420.0 <= time < 480.0]
+        bar = history.bars("FUEL", "minute", 400.0, 430.0)[0]
+        self.assertEqual((bar.open, bar.high, bar.low, bar.close), (window[0], max(window), min(window), window[-1]))
+        self.assertEqual(bar.volume, 12.0)
+        self.assertEqual(len(history.bars("FUEL", "hour")), 1)
+        self.assertEqual(len(history.bars("FUEL", "tick", 590.0)), 11)
+
+        with self.assertRaises(KeyError):
+            history.bars("FUEL", "day")
+        stale = engine.create_default_state()
+        stale.commodities = {"ICE": replace(stale.commodities["FUEL"], name="ICE"), **stale.commodities}
+        with self.assertRaises(ValueError):
+            history.record(stale, [OrderFill(Order("FUEL", "sell", 2.0), 2.0, revenue=10.0)])
+        self.assertNotIn("ICE", history.commodities)
+        self.assertEqual(history.latest("FUEL").time_seconds, 600.0)
+        self.assertEqual(len(history.ticks("FUEL")), 100)
+        state = engine.step(state, 1.0)
+        history.record(state)
+        self.assertEqual(history.latest("FUEL").volume, 0.0)
+
+    def make_fast_forward_state(self, engine: EconomyEngine) -> EconomyState:
+        state = engine.create_default_state()
+        state.commodities["OXYGEN"].demand_rate = 1.3
+        state.commodities["FUEL"].supply_rate = 4.0
+        state.commodities["FUEL"].demand_rate = 0.0
+        state.commodities["METALS"].inventory = 2.0
+        state.commodities["METALS"].demand_rate = 1.5
+        return state
+
+    @unittest.skipUnless(HAS_NUMPY, "numpy not installed")
+    def test_fast_forward_matches_tick_by_tick_replay(self) -> None:
+        for rng_mode in ("sequential", "counter"):
+            config = EconomyConfig(rng_mode=rng_mode, volatility=0.3, rng_seed=11)
+            stepping = EconomyEngine(config)
+            jumping = EconomyEngine(config)
+            expected = self.make_fast_forward_state(stepping)
+            for _ in range(3000):
+                expected = stepping.step(expected, 0.5)
+            result = jumping.fast_forward(self.make_fast_forward_state(jumping), 3000, 0.5)
+
+            self.assertEqual(result.tick, expected.tick)
+            self.assertAlmostEqual(result.time_seconds, expected.time_seconds, places=9)
+            for name, commodity in expected.commodities.items():
+                actual = result.commodities[name]
+                self.assertAlmostEqual(actual.price / commodity.price, 1.0, places=9)
+                self.assertAlmostEqual(actual.inventory, commodity.inventory, places=6)
+                self.assertEqual(actual.last_volatility, commodity.last_volatility)
+            self.assertLess(result.commodities["FUEL"].price, 2.0 * config.min_price)
+            self.assertEqual(result.commodities["METALS"].inventory, 0.0)
+
+            expected = stepping.step(expected, 0.5)
+            result = jumping.step(result, 0.5)
+            self.assertEqual(
+                result.commodities["OXYGEN"].last_volatility, expected.commodities["OXYGEN"].last_volatility
+            )
+
+    @unittest.skipUnless(HAS_NUMPY, "numpy not installed")
+    def test_fast_forward_overflows_runaway_prices_quietly(self) -> None:
+        engine = EconomyEngine(EconomyConfig(volatility=0.0))
+        state = engine.create_default_state()
+        state.commodities["FUEL"].demand_rate = 50.0
+        state.commodities["FUEL"].supply_rate = 0.1
+        expected = state
+        for _ in range(5000):
+            expected = engine.step(expected, 1.0)
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            result = engine.fast_forward(state, 5000, 1.0)
+        self.assertEqual(result.commodities["FUEL"].price, expected.commodities["FUEL"].price)
+        self.assertEqual(result.commodities["FUEL"].price, float("inf"))
+
+    @unittest.skipUnless(HAS_NUMPY, "numpy not installed")
+    def test_statistical_fast_forward_preserves_price_distribution(self) -> None:
+        config = EconomyConfig(volatility=0.2, base_prices={f"GOOD{index}": 10.0 for index in range(2000)})
+        engine = EconomyEngine(config)
+        state = engine.create_default_state()
+        exact = engine.fast_forward(state, 200, 1.0)
+        statistical = engine.fast_forward(state, 200, 1.0, exact=False)
+        self.assertEqual(statistical, engine.fast_forward(state, 200, 1.0, exact=False))
+
+        def log_moments(result: EconomyState) -> tuple[float, float]:
+            logs = [log(c.price) for c in result.commodities.values()]
+            mean = sum(logs) / len(logs)
+            return mean, sqrt(sum((value - mean) ** 2 for value in logs) / len(logs))
+
+        exact_mean, exact_std = log_moments(exact)
+        statistical_mean, statistical_std = log_moments(statistical)
+        self.assertAlmostEqual(statistical_mean, exact_mean, delta=0.2)
+        self.assertAlmostEqual(statistical_std / exact_std, 1.0, delta=0.1)
+        self.assertNotEqual(exact, statistical)
+
 
 if __name__ == "__main__":
     unittest.main()
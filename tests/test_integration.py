@@ -30,6 +30,26 @@ class TestIntegration(unittest.TestCase):
                 places=10,
             )
 
+    def test_in_place_stepping_matches_default_runtime(self) -> None:
+        runtime_a = create_default_runtime(GameConfig())
+        runtime_b = create_default_runtime(GameConfig(in_place_stepping=True))
+        physics_state = runtime_b.physics_state
+        frame_a = simulate(runtime_a, 20.0)
+        frame_b = simulate(runtime_b, 20.0)
+
+        self.assertIs(runtime_b.physics_state, physics_state)
+        self.assertEqual(frame_a.hud, frame_b.hud)
+        self.assertEqual(runtime_a.npc_world, runtime_b.npc_world)
+
+    def test_retained_scene_matches_rebuilt_frames(self) -> None:
+        runtime_a = create_default_runtime(GameConfig())
+        runtime_b = create_default_runtime(GameConfig(retained_scene=True))
+        frame_a = simulate(runtime_a, 20.0)
+        frame_b = simulate(runtime_b, 20.0)
+
+        self.assertIs(frame_b, runtime_b.scene_adapter.frame)
+        self.assertEqual(frame_a, frame_b)
+
 
 if __name__ == "__main__":
     unittest.main()
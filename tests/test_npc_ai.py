@@ -1,6 +1,53 @@
+import copy
+import pickle
+import random
 import unittest
 
-from orbital_colony.npc_ai import Drone, DroneState, NpcAiEngine, NpcConfig, NpcWorldState
+from orbital_colony.npc_ai import (
+    HAS_NUMPY,
+    AggregateFleet,
+    CatchUpResult,
+    Drone,
+    DroneScheduler,
+    DroneState,
+    LodColony,
+    NpcAiEngine,
+    NpcConfig,
+    NpcWorldState,
+    ParallelDroneStepper,
+    ResourceNodes,
+    SpatialHash,
+    catch_up,
+    collapse_fleet,
+    expand_fleet,
+    pack_fleet,
+    unpack_fleet,
+)
+
+
+def make_random_fleet(count: int, seed: int) -> tuple[list[Drone], NpcWorldState]:
+    rng = random.Random(seed)
+    resources = ["METALS", "FUEL", "OXYGEN", "ICE"]
+    drones = []
+    for index in range(count):
+        cargo_type = rng.choice([None, *resources])
+        drones.append(
+            Drone(
+                id=f"D{index}",
+                state=rng.choice(list(DroneState)),
+                energy=rng.uniform(0.0, 100.0),
+                cargo_type=cargo_type,
+                cargo_amount=0.0 if cargo_type is None else rng.uniform(0.0, 10.0),
+                cargo_capacity=rng.choice([5.0, 10.0]),
+                target_resource=rng.choice([None, *resources, "VOID"]),
+            )
+        )
+    world = NpcWorldState(
+        resource_nodes={"FUEL": 400.0, "METALS": 35.0, "OXYGEN": 3.0, "ICE": 900.0},
+        colony_inventory={"OXYGEN": 1.0},
+        colony_damage=30.0,
+    )
+    return drones, world
 
 
 class TestNpcAi(unittest.TestCase):
@@ -87,6 +134,439 @@ class TestNpcAi(unittest.TestCase):
         drones, world = engine.step(drones, world, 1.0)
         self.assertEqual(drones[0].state, DroneState.IDLE)
 
+    def test_step_in_place_matches_step(self) -> None:
+        engine = NpcAiEngine()
+
+        def make_world() -> NpcWorldState:
+            return NpcWorldState(
+                resource_nodes={"METALS": 30.0, "FUEL": 12.0},
+                colony_inventory={},
+                colony_damage=6.0,
+                resource_priority=["METALS", "FUEL"],
+            )
+
+        copied_drones = [Drone(id="A"), Drone(id="B", energy=30.0), Drone(id="C", energy=70.0)]
+        mutated_drones = [Drone(id="A"), Drone(id="B", energy=30.0), Drone(id="C", energy=70.0)]
+        copied_world = make_world()
+        mutated_world = make_world()
+        originals = list(mutated_drones)
+
+        for _ in range(80):
+            copied_drones, copied_world = engine.step(copied_drones, copied_world, 0.25)
+            result_drones, result_world = engine.step_in_place(mutated_drones, mutated_world, 0.25)
+            self.assertIs(result_drones, mutated_drones)
+            self.assertIs(result_world, mutated_world)
+
+        self.assertTrue(all(a is b for a, b in zip(originals, mutated_drones)))
+        self.assertEqual(copied_drones, mutated_drones)
+        self.assertEqual(copied_world, mutated_world)
+
+    @unittest.skipUnless(HAS_NUMPY, "numpy not installed")
+    def test_fleet_step_matches_scalar_step(self) -> None:
+        engine = NpcAiEngine(NpcConfig(active_energy_burn=3.0))
+        drones, world = make_random_fleet(400, seed=3)
+        fleet_world = NpcWorldState(
+            resource_nodes=dict(world.resource_nodes),
+            colony_inventory=dict(world.colony_inventory),
+            colony_damage=world.colony_damage,
+        )
+        fleet = pack_fleet(drones, fleet_world)
+
+        for tick in range(150):
+            if tick == 60:
+                world.colony_damage += 50.0
+                fleet_world.colony_damage += 50.0
+            drones, world = engine.step(drones, world, 0.25)
+            self.assertEqual(engine.step_fleet(fleet, fleet_world, 0.25), (fleet, fleet_world))
+
+            self.assertEqual(unpack_fleet(fleet), drones)
+            self.assertEqual(fleet_world, world)
+            self.assertEqual(list(fleet_world.colony_inventory), list(world.colony_inventory))
+        self.assertEqual(world.resource_nodes["METALS"], 0.0)
+        self.assertEqual(world.colony_damage, 0.0)
+
+    @unittest.skipUnless(HAS_NUMPY, "numpy not installed")
+    def test_fleet_step_handles_a_world_without_nodes(self) -> None:
+        engine = NpcAiEngine()
+        drones = [Drone(id="A"), Drone(id="B", state=DroneState.REPAIR), Drone(id="C", energy=10.0)]
+        world = NpcWorldState(colony_damage=5.0)
+        fleet_world = copy.deepcopy(world)
+        fleet = pack_fleet(copy.deepcopy(drones), fleet_world)
+
+        for _ in range(20):
+            engine.step_in_place(drones, world, 0.25)
+            engine.step_fleet(fleet, fleet_world, 0.25)
+            self.assertEqual(unpack_fleet(fleet), drones)
+            self.assertEqual(fleet_world, world)
+        self.assertEqual(world.colony_damage, 0.0)
+
+    def test_scheduler_matches_tick_by_tick_stepping(self) -> None:
+        engine = NpcAiEngine(NpcConfig(active_energy_burn=0.5))
+        for dyadic in (True, False):
+            drones, world = make_random_fleet(300, seed=11)
+            world.resource_nodes["ICE"] = 9000.0
+            if dyadic:
+                # Quarter-unit quantities keep every sum exact, so node totals match bit for bit.
+                for drone in drones:
+                    drone.energy = round(drone.energy * 4.0) / 4.0
+                    drone.cargo_amount = round(drone.cargo_amount * 4.0) / 4.0
+            scheduled_world = copy.deepcopy(world)
+            scheduler = DroneScheduler(engine, copy.deepcopy(drones), scheduled_world, 0.25)
+            peak_sleeping = 0
+
+            for tick in range(120):
+                if tick == 60:
+                    world.colony_damage += 40.0
+                    scheduled_world.colony_damage += 40.0
+                engine.step_in_place(drones, world, 0.25)
+                scheduler.step()
+                peak_sleeping = max(peak_sleeping, scheduler.sleeping)
+                if tick % 30 == 0:
+                    self.assertEqual(scheduler.drone(7), drones[7])
+
+            self.assertGreater(peak_sleeping, len(drones) // 2)
+            self.assertLess(scheduler.drone_updates, 120 * len(drones) // 2)
+            if dyadic:
+                self.assertEqual(scheduler.drones, drones)
+                self.assertEqual(scheduled_world, world)
+                continue
+            self.assertEqual([drone.state for drone in scheduler.drones], [drone.state for drone in drones])
+            for scheduled, stepped in zip(scheduler.drones, drones):
+                self.assertAlmostEqual(scheduled.delivered_total, stepped.delivered_total, places=9)
+            for name, quantity in world.resource_nodes.items():
+                self.assertAlmostEqual(scheduled_world.resource_nodes[name], quantity, places=9)
+            for name, quantity in world.colony_inventory.items():
+                self.assertAlmostEqual(scheduled_world.colony_inventory[name], quantity, places=9)
+
+    def test_scheduler_is_exact_at_inexact_step(self) -> None:
+        # A tenth of a second is not a binary fraction, so sleeping stretches must be replayed tick by tick to
+        # land on the same values, and the same FSM branches, as stepping.
+        engine = NpcAiEngine()
+        drones, world = make_random_fleet(30, seed=0)
+        scheduled_world = copy.deepcopy(world)
+        scheduler = DroneScheduler(engine, copy.deepcopy(drones), scheduled_world, 0.1)
+
+        for _ in range(3000):
+            engine.step_in_place(drones, world, 0.1)
+            scheduler.step()
+
+        self.assertLess(scheduler.drone_updates, 3000 * len(drones))
+        self.assertEqual(scheduler.drones, drones)
+        self.assertEqual(scheduled_world, world)
+
+    def test_scheduler_sleeps_through_long_slow_stretches(self) -> None:
+        engine = NpcAiEngine(NpcConfig(recharge_rate=0.5, gather_rate=0.25, active_energy_burn=0.5))
+        drones = [
+            Drone(id=f"D{index}", energy=20.0 + index % 64, cargo_capacity=40.0 + index % 5)
+            for index in range(200)
+        ]
+        world = NpcWorldState(resource_nodes={"METALS": 1e6, "FUEL": 1e6})
+        scheduled_drones, scheduled_world = copy.deepcopy(drones), copy.deepcopy(world)
+        scheduler = DroneScheduler(engine, scheduled_drones, scheduled_world, 0.25)
+
+        for _ in range(1200):
+            engine.step_in_place(drones, world, 0.25)
+        scheduler.advance(1200)
+
+        self.assertLess(scheduler.drone_updates, 1200 * len(drones) // 20)
+        self.assertEqual(scheduler.drones, drones)
+        self.assertEqual(scheduled_world, world)
+
+    def test_scheduler_wakes_sleepers_before_node_runs_dry(self) -> None:
+        engine = NpcAiEngine()
+        drones = [Drone(id=f"G{index}", state=DroneState.GATHER, target_resource="ICE", cargo_capacity=50.0)
+                  for index in range(4)]
+        world = NpcWorldState(resource_nodes={"ICE": 13.0}, resource_priority=["ICE"])
+        stepped_drones, stepped_world = copy.deepcopy(drones), copy.deepcopy(world)
+        scheduler = DroneScheduler(engine, drones, world, 0.5)
+        self.assertEqual(scheduler.sleeping, 4)
+
+        scheduler.advance(3)
+        self.assertEqual(world.resource_nodes["ICE"], 1.0)
+        self.assertEqual(scheduler.sleeping, 4)
+        self.assertEqual(drones[0].cargo_amount, 0.0)
+        self.assertEqual(scheduler.drone(0).cargo_amount, 3.0)
+
+        scheduler.step()
+        self.assertEqual(scheduler.sleeping, 0)
+        for _ in range(4):
+            engine.step_in_place(stepped_drones, stepped_world, 0.5)
+        self.assertEqual(scheduler.drones, stepped_drones)
+        self.assertEqual(world, stepped_world)
+        self.assertEqual(drones[0].state, DroneState.DELIVER)
+
+    def test_parallel_stepper_matches_sequential_step_for_any_worker_count(self) -> None:
+        engine = NpcAiEngine(NpcConfig(active_energy_burn=3.0))
+        drones, world = make_random_fleet(240, seed=5)
+        for workers in (0, 3):
+            stepped_drones, stepped_world = copy.deepcopy(drones), copy.deepcopy(world)
+            parallel_drones, parallel_world = copy.deepcopy(drones), copy.deepcopy(world)
+            originals = list(parallel_drones)
+            with ParallelDroneStepper(engine, parallel_drones, parallel_world, 0.25, workers=workers) as stepper:
+                for tick in range(120):
+                    if tick == 50:
+                        stepped_world.colony_damage += 50.0
+                        parallel_world.colony_damage += 50.0
+                    engine.step_in_place(stepped_drones, stepped_world, 0.25)
+                    stepper.step()
+                    self.assertEqual(parallel_world, stepped_world)
+                    self.assertEqual(list(parallel_world.colony_inventory), list(stepped_world.colony_inventory))
+                    if tick % 30 == 0:
+                        self.assertEqual(stepper.drones, stepped_drones)
+            self.assertEqual(parallel_drones, stepped_drones)
+            self.assertTrue(all(a is b for a, b in zip(originals, parallel_drones)))
+            self.assertLess(stepper.passes, 120 * 4)
+        self.assertEqual(stepped_world.resource_nodes["METALS"], 0.0)
+
+    def test_lod_colony_tracks_full_simulation_throughput(self) -> None:
+        for burn in (2.0, 6.0):
+            engine = NpcAiEngine(NpcConfig(active_energy_burn=burn))
+            drones = [Drone(id=f"D{index}", energy=20.0 + 2.0 * index) for index in range(40)]
+            world = NpcWorldState(resource_nodes={"METALS": 1e6}, colony_damage=200.0)
+            colony = LodColony(engine, copy.deepcopy(drones), copy.deepcopy(world))
+
+            for _ in range(400):
+                engine.step_in_place(drones, world, 0.25)
+                colony.step(0.25)
+            colony.release()
+            self.assertFalse(colony.observed)
+            start = world.colony_inventory["METALS"], colony.world.colony_inventory["METALS"]
+            for tick in range(8000):
+                if tick == 4000:
+                    world.colony_damage += 300.0
+                    colony.world.colony_damage += 300.0
+                engine.step_in_place(drones, world, 0.25)
+                colony.step(0.25)
+
+            full = world.colony_inventory["METALS"] - start[0]
+            aggregate = colony.world.colony_inventory["METALS"] - start[1]
+            self.assertAlmostEqual(aggregate / full, 1.0, delta=0.05)
+            self.assertEqual(colony.world.colony_damage, 0.0)
+            self.assertAlmostEqual(colony.world.time_seconds, world.time_seconds)
+
+            expanded = colony.drones
+            self.assertTrue(colony.observed)
+            self.assertEqual([drone.id for drone in expanded], [drone.id for drone in drones])
+            states = {drone.state for drone in expanded}
+            self.assertIn(DroneState.RECHARGE, states)
+            self.assertIn(DroneState.GATHER, states)
+            carried = sum(drone.cargo_amount for drone in expanded)
+            mined = 1e6 - colony.world.resource_nodes["METALS"]
+            self.assertAlmostEqual(colony.world.colony_inventory["METALS"] + carried, mined, places=6)
+            self.assertAlmostEqual(sum(d.delivered_total for d in expanded), colony.world.colony_inventory["METALS"])
+            for _ in range(200):
+                colony.step(0.25)
+
+    def test_lod_colony_accounts_for_travel_to_placed_nodes(self) -> None:
+        for burn, distance in ((2.0, 20.0), (1.0, 40.0)):
+            engine = NpcAiEngine(NpcConfig(active_energy_burn=burn, drone_speed=2.0))
+            drones = [Drone(id=f"D{index}", energy=20.0 + 2.0 * index) for index in range(40)]
+            world = NpcWorldState(colony_damage=200.0, colony_position=(0.0, 0.0))
+            world.place_resource("METALS", 1e6, (distance, 0.0))
+            colony = LodColony(engine, copy.deepcopy(drones), copy.deepcopy(world))
+
+            for _ in range(400):
+                engine.step_in_place(drones, world, 0.25)
+                colony.step(0.25)
+            colony.release()
+            start = world.colony_inventory["METALS"], colony.world.colony_inventory["METALS"]
+            for _ in range(8000):
+                engine.step_in_place(drones, world, 0.25)
+                colony.step(0.25)
+
+            full = world.colony_inventory["METALS"] - start[0]
+            aggregate = colony.world.colony_inventory["METALS"] - start[1]
+            self.assertAlmostEqual(aggregate / full, 1.0, delta=0.12)
+
+        engine = NpcAiEngine(NpcConfig(drone_speed=2.0))
+        world = NpcWorldState(colony_position=(0.0, 0.0))
+        world.place_resource("METALS", 1e6, (40.0, 0.0))
+        colony = LodColony(engine, [Drone(id="D0")], world)
+        with self.assertRaises(ValueError):
+            colony.release()
+        self.assertTrue(colony.observed)
+
+    def test_collapse_keeps_carried_cargo_for_expansion(self) -> None:
+        config = NpcConfig()
+        drones = [
+            Drone(id="A", state=DroneState.DELIVER, cargo_type="ICE", cargo_amount=7.0),
+            Drone(id="B", state=DroneState.GATHER, cargo_type="ICE", cargo_amount=2.0, target_resource="ICE"),
+            Drone(id="C", state=DroneState.RECHARGE, energy=30.0),
+        ]
+        fleet = collapse_fleet(drones, tick_seconds=0.25)
+        self.assertIsInstance(fleet, AggregateFleet)
+        self.assertEqual(fleet.carried, {"ICE": 9.0})
+
+        world = NpcWorldState(resource_nodes={"ICE": 50.0}, resource_priority=["ICE"])
+        expanded = expand_fleet(fleet, world, config)
+        handed_back = sum(drone.cargo_amount for drone in expanded)
+        self.assertAlmostEqual(handed_back + world.colony_inventory.get("ICE", 0.0), 9.0)
+        for drone in expanded:
+            self.assertLessEqual(drone.cargo_amount, drone.cargo_capacity)
+            self.assertTrue(config.low_energy_threshold <= drone.energy <= drone.max_energy)
+
+    def test_catch_up_matches_tick_by_tick_totals(self) -> None:
+        rng = random.Random(2)
+        engine = NpcAiEngine(NpcConfig(active_energy_burn=4.0))
+        drones = [
+            Drone(id=f"D{index}", energy=rng.uniform(25.0, 100.0), cargo_capacity=rng.choice([5.0, 10.0]))
+            for index in range(20)
+        ]
+        world = NpcWorldState(resource_nodes={"METALS": 9000.0, "OXYGEN": 1e6}, colony_damage=150.0)
+        caught_drones, caught_world = copy.deepcopy(drones), copy.deepcopy(world)
+
+        for _ in range(14400):
+            engine.step_in_place(drones, world, 0.25)
+        result = catch_up(engine, caught_drones, caught_world, 3600.0, 0.25)
+
+        self.assertEqual(result, CatchUpResult(14400, result.stepped_ticks, 14400 - result.stepped_ticks))
+        self.assertLess(result.stepped_ticks, 14400 // 10)
+        self.assertAlmostEqual(caught_world.time_seconds, world.time_seconds)
+        self.assertEqual(caught_world.colony_damage, 0.0)
+        self.assertEqual(caught_world.resource_nodes["METALS"], 0.0)
+        for name, quantity in world.colony_inventory.items():
+            self.assertAlmostEqual(caught_world.colony_inventory[name] / quantity, 1.0, delta=0.03)
+        mined = 9000.0 + 1e6 - sum(caught_world.resource_nodes.values())
+        carried = sum(drone.cargo_amount for drone in caught_drones)
+        self.assertAlmostEqual(sum(caught_world.colony_inventory.values()) + carried, mined, places=6)
+        delivered = sum(drone.delivered_total for drone in caught_drones)
+        self.assertAlmostEqual(delivered, sum(caught_world.colony_inventory.values()), places=6)
+        for drone in caught_drones:
+            self.assertLessEqual(drone.cargo_amount, drone.cargo_capacity)
+            self.assertTrue(0.0 <= drone.energy <= drone.max_energy)
+
+    def test_catch_up_tracks_a_node_running_dry_at_the_default_config(self) -> None:
+        engine = NpcAiEngine()
+        drones = [Drone(id=f"D{index}", energy=20.0 + (index * 7) % 80) for index in range(30)]
+        world = NpcWorldState(
+            resource_nodes={"METALS": 1e5, "FUEL": 1e5, "OXYGEN": 1e5},
+            resource_priority=["METALS", "OXYGEN", "FUEL"],
+        )
+        caught_drones, caught_world = copy.deepcopy(drones), copy.deepcopy(world)
+
+        for _ in range(36000):
+            engine.step_in_place(drones, world, 0.1)
+        result = catch_up(engine, caught_drones, caught_world, 3600.0, 0.1)
+
+        self.assertLess(result.stepped_ticks, 36000 // 10)
+        self.assertLess(world.resource_nodes["METALS"], 1.0)
+        self.assertEqual(set(caught_world.colony_inventory), {"METALS", "OXYGEN"})
+        for name, quantity in world.colony_inventory.items():
+            self.assertAlmostEqual(caught_world.colony_inventory[name] / quantity, 1.0, delta=0.01)
+
+    def test_catch_up_skips_slow_cycles_without_stepping_every_drone(self) -> None:
+        rng = random.Random(4)
+        engine = NpcAiEngine(NpcConfig(recharge_rate=0.05, active_energy_burn=0.05))
+        drones = [
+            Drone(id=f"D{index}", energy=rng.uniform(25.0, 100.0), cargo_capacity=rng.choice([5.0, 10.0]))
+            for index in range(30)
+        ]
+        world = NpcWorldState(resource_nodes={"METALS": 1e6})
+        caught_drones, caught_world = copy.deepcopy(drones), copy.deepcopy(world)
+
+        for _ in range(28800):
+            engine.step_in_place(drones, world, 0.25)
+        steps = []
+        step_drone = engine.step_drone
+        engine.step_drone = lambda drone, *args: steps.append(drone) or step_drone(drone, *args)
+        result = catch_up(engine, caught_drones, caught_world, 7200.0, 0.25)
+
+        self.assertEqual(result.stepped_ticks, 0)
+        self.assertLess(len(steps), 30 * 28800 // 10)
+        full, caught = world.colony_inventory["METALS"], caught_world.colony_inventory["METALS"]
+        self.assertAlmostEqual(caught / full, 1.0, delta=0.02)
+        carried = sum(drone.cargo_amount for drone in caught_drones)
+        self.assertAlmostEqual(caught + carried, 1e6 - caught_world.resource_nodes["METALS"], places=6)
+
+    def test_resource_index_matches_priority_scan(self) -> None:
+        def scan(priority: list[str], nodes: dict[str, float]) -> str | None:
+            for name in [*priority, *nodes]:
+                if nodes.get(name, 0.0) > 0.0:
+                    return name
+            return None
+
+        rng = random.Random(5)
+        names = [f"N{index}" for index in range(30)]
+        nodes = ResourceNodes({name: rng.choice([0.0, 5.0]) for name in names[:20]})
+        priority = ["N7", "N25", "N3"]
+        for step in range(3000):
+            name = rng.choice(names)
+            action = rng.random()
+            if action < 0.6:
+                nodes[name] = max(0.0, nodes.get(name, 0.0) + rng.choice([-5.0, -2.5, 2.5, 5.0]))
+            elif action < 0.75:
+                nodes.pop(name, None)
+            elif action < 0.8:
+                nodes.update({name: 1.0})
+            elif action < 0.82:
+                priority = rng.sample(names, 3)
+            if step == 1500:
+                nodes = copy.deepcopy(pickle.loads(pickle.dumps(nodes)))
+            self.assertEqual(nodes.first_available(priority), scan(priority, nodes))
+
+        world = NpcWorldState(resource_nodes={"ICE": 1.0, "FUEL": 2.0})
+        self.assertIsInstance(world.resource_nodes, ResourceNodes)
+        self.assertEqual(world.available_resource(), "FUEL")
+
+    def test_spatial_hash_nearest_matches_brute_force(self) -> None:
+        rng = random.Random(9)
+        index = SpatialHash(cell_size=10.0)
+        positions: dict[str, tuple[float, float]] = {}
+        stocked: set[str] = set()
+        for step in range(600):
+            name = f"N{rng.randrange(200)}"
+            if rng.random() < 0.7:
+                positions[name] = (rng.uniform(-300.0, 300.0), rng.uniform(-300.0, 300.0))
+                index.insert(name, positions[name])
+                stocked.add(name)
+            elif rng.random() < 0.5:
+                positions.pop(name, None)
+                index.remove(name)
+            else:
+                stocked.discard(name)
+
+            point = (rng.uniform(-400.0, 400.0), rng.uniform(-400.0, 400.0))
+            candidates = [
+                ((p[0] - point[0]) ** 2 + (p[1] - point[1]) ** 2, n) for n, p in positions.items() if n in stocked
+            ]
+            expected = min(candidates)[1] if candidates else None
+            self.assertEqual(index.nearest(point, accept=stocked.__contains__), expected)
+            for rejected in set(positions) - stocked:
+                positions.pop(rejected)
+
+    def test_drones_travel_to_nearest_node_and_back(self) -> None:
+        engine = NpcAiEngine(
+            NpcConfig(drone_speed=4.0, target_selection="nearest", gather_rate=5.0, active_energy_burn=0.1)
+        )
+        world = NpcWorldState(colony_position=(0.0, 0.0), resource_priority=["METALS"])
+        world.place_resource("METALS", 100.0, (-50.0, 0.0))
+        world.place_resource("FUEL", 10.0, (20.0, 0.0))
+        world.place_resource("ICE", 100.0, (0.0, 30.0))
+        drones = [Drone(id="D1", position=(10.0, 0.0))]
+
+        drones, world = engine.step(drones, world, 1.0)
+        self.assertEqual(drones[0].target_resource, "FUEL")
+        drones, world = engine.step(drones, world, 1.0)
+        self.assertEqual(drones[0].position, (14.0, 0.0))
+        self.assertEqual(drones[0].state, DroneState.SEEK_RESOURCE)
+
+        states = []
+        for _ in range(40):
+            drones, world = engine.step(drones, world, 1.0)
+            states.append((drones[0].state, drones[0].position))
+        self.assertIn((DroneState.GATHER, (20.0, 0.0)), states)
+        self.assertIn((DroneState.DELIVER, (0.0, 0.0)), states)
+        self.assertEqual(world.resource_nodes["FUEL"], 0.0)
+        self.assertEqual(world.colony_inventory["FUEL"], 10.0)
+        self.assertEqual(drones[0].target_resource, "ICE")
+        self.assertEqual(world.nearest_resource((20.0, 0.0)), "ICE")
+
+        world.resource_nodes["FUEL"] = 5.0
+        self.assertEqual(world.nearest_resource((20.0, 0.0)), "FUEL")
+        world.resource_positions["FUEL"] = (200.0, 0.0)
+        self.assertEqual(world.nearest_resource((20.0, 0.0)), "ICE")
+        self.assertEqual(world.nearest_resource((190.0, 0.0)), "FUEL")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,9 +1,20 @@
+import random
 import unittest
 
 from orbital_colony.core_physics import CelestialBody, ColonyNode, PhysicsState
 from orbital_colony.economy_engine import CommodityState, EconomyState
 from orbital_colony.npc_ai import Drone, DroneState
-from orbital_colony.rendering_layer import RenderEngine, SceneAdapter
+from orbital_colony.rendering_layer import (
+    HAS_NUMPY,
+    FrameData,
+    RenderConfig,
+    RenderEngine,
+    RenderEntity,
+    RetainedSceneAdapter,
+    SceneAdapter,
+    on_screen,
+    rasterize,
+)
 
 
 class TestRenderingLayer(unittest.TestCase):
@@ -36,6 +47,158 @@ class TestRenderingLayer(unittest.TestCase):
         self.assertEqual(result["entities_drawn"], 0)
         self.assertIn("stability", result)
 
+    def test_retained_adapter_emits_deltas_and_keeps_entities(self) -> None:
+        adapter = RetainedSceneAdapter()
+        physics_state = PhysicsState(
+            bodies=[CelestialBody(name="A", mass=25.0, position=(1.0, 2.0), velocity=(0.5, 0.0))],
+            colony=ColonyNode(name="C", mass=3.0, position=(0.0, 0.0)),
+        )
+        economy_state = EconomyState(commodities={"FUEL": CommodityState("FUEL", 15.0, 1.0, 1.0, 100.0)})
+        drones = [Drone(id="D1"), Drone(id="D2", state=DroneState.GATHER)]
+
+        delta = adapter.update(physics_state, economy_state, drones)
+        self.assertEqual([entity.id for entity in delta.added], ["body:A", "colony:C", "drone:D1", "drone:D2"])
+        entities = list(adapter.frame.entities)
+        self.assertEqual(entities, SceneAdapter().build_frame(physics_state, economy_state, drones).entities)
+
+        delta = adapter.update(physics_state, economy_state, drones)
+        self.assertEqual((delta.added, delta.changed, delta.removed), ([], [], []))
+        self.assertTrue(all(a is b for a, b in zip(entities, adapter.frame.entities)))
+
+        drones[1].state = DroneState.DELIVER
+        physics_state.bodies[0].position = (2.0, 2.0)
+        economy_state.commodities["FUEL"].price = 16.0
+        delta = adapter.update(physics_state, economy_state, drones[1:])
+        self.assertEqual([entity.id for entity in delta.changed], ["body:A", "drone:D2"])
+        self.assertEqual(delta.removed, ["drone:D1"])
+        self.assertIs(delta.changed[0], entities[0])
+        frame = adapter.build_frame(physics_state, economy_state, drones[1:])
+        expected = SceneAdapter().build_frame(physics_state, economy_state, drones[1:])
+        self.assertEqual(frame, expected)
+
+    def test_viewport_culling_matches_brute_force(self) -> None:
+        rng = random.Random(4)
+        config = RenderConfig(width=320, height=200, world_scale=4.0, camera=(30.0, -10.0), cull_margin=8.0)
+        render = RenderEngine(config)
+        drones = [
+            Drone(id=f"D{index}", position=(rng.uniform(-400.0, 400.0), rng.uniform(-400.0, 400.0)))
+            for index in range(600)
+        ]
+        physics_state = PhysicsState(
+            bodies=[
+                CelestialBody(name="Far", mass=9.0, position=(200.0, 0.0), velocity=(-2000.0, 0.0)),
+                CelestialBody(name="Off", mass=9.0, position=(500.0, 500.0), velocity=(1.0, 0.0)),
+            ]
+        )
+        adapter = RetainedSceneAdapter(config.cull_cell_size)
+
+        for _ in range(5):
+            for drone in drones:
+                drone.position = (drone.position[0] + rng.uniform(-20.0, 20.0), drone.position[1])
+            frame = adapter.build_frame(physics_state, EconomyState(), drones[: rng.randint(400, 600)])
+            expected = [
+                entity
+                for entity in frame.entities
+                if on_screen(config, entity.position, entity.radius, entity.vector)
+            ]
+            self.assertEqual(render.visible_entities(frame), expected)
+            self.assertEqual(render.visible_entities(FrameData(entities=frame.entities)), expected)
+            stats = render.draw(frame, cull_stats=True)
+            self.assertEqual(stats["entities_drawn"], len(expected))
+            self.assertEqual(stats["entities_culled"], len(frame.entities) - len(expected))
+            self.assertIn("body:Far", [entity.id for entity in expected])
+            self.assertNotIn("body:Off", [entity.id for entity in expected])
+            self.assertEqual(render.draw(frame)["entities_drawn"], len(frame.entities))
+            self.assertNotIn("entities_culled", render.draw(frame))
+
+        culled = SceneAdapter(config).build_frame(physics_state, EconomyState(), drones)
+        full = SceneAdapter().build_frame(physics_state, EconomyState(), drones)
+        self.assertEqual(culled.entities, render.visible_entities(full))
+
+    def test_on_screen_respects_margin(self) -> None:
+        config = RenderConfig(width=100, height=100, world_scale=1.0, cull_margin=10.0, show_debug_vectors=False)
+        self.assertTrue(on_screen(config, (-55.0, 0.0), 1.0))
+        self.assertFalse(on_screen(config, (-62.0, 0.0), 1.0))
+        self.assertTrue(on_screen(config, (-62.0, 0.0), 3.0))
+        entity = RenderEntity("x", "drone", (70.0, 70.0), 1.0, (0, 0, 0))
+        stats = RenderEngine(config).draw(FrameData(entities=[entity]), cull_stats=True)
+        self.assertEqual(stats["entities_culled"], 1)
+        with self.assertRaises(ValueError):
+            RenderEngine(RenderConfig(cull_margin=-1.0))
+
+    def test_unknown_render_backend_rejected(self) -> None:
+        with self.assertRaises(ValueError):
+            RenderEngine(RenderConfig(backend="opengl"))
+
+    @unittest.skipUnless(HAS_NUMPY, "numpy not installed")
+    def test_rasterize_fills_circles_in_painter_order(self) -> None:
+        config = RenderConfig(width=40, height=30, world_scale=1.0, show_debug_vectors=False)
+        entities = [
+            RenderEntity(id="a", kind="body", position=(0.0, 0.0), radius=5.0, color=(200, 10, 10)),
+            RenderEntity(id="b", kind="body", position=(3.0, 0.0), radius=2.0, color=(10, 200, 10)),
+            RenderEntity(id="c", kind="body", position=(-20.0, -14.0), radius=3.0, color=(10, 10, 200)),
+        ]
+        buffer = rasterize(entities, config)
+
+        self.assertEqual(buffer.shape, (30, 40, 3))
+        self.assertEqual(tuple(buffer[15, 20]), (200, 10, 10))
+        self.assertEqual(tuple(buffer[15, 23]), (10, 200, 10))
+        self.assertEqual(tuple(buffer[15, 25]), (10, 200, 10))
+        self.assertEqual(tuple(buffer[15, 26]), (14, 20, 34))
+        self.assertEqual(tuple(buffer[0, 0]), (10, 10, 200))
+        self.assertEqual(tuple(buffer[29, 39]), (14, 20, 34))
+
+    @unittest.skipUnless(HAS_NUMPY, "numpy not installed")
+    def test_rasterize_draws_debug_vectors_over_their_circle(self) -> None:
+        config = RenderConfig(width=40, height=30, world_scale=1.0)
+        entity = RenderEntity(
+            id="a", kind="body", position=(0.0, 0.0), radius=2.0, color=(200, 10, 10), vector=(2.0, 1.0)
+        )
+        buffer = rasterize([entity], config)
+
+        self.assertEqual(tuple(buffer[15, 20]), (230, 230, 230))
+        self.assertEqual(tuple(buffer[19, 28]), (230, 230, 230))
+        self.assertEqual(tuple(buffer[17, 24]), (230, 230, 230))
+        self.assertEqual(tuple(buffer[14, 20]), (200, 10, 10))
+
+        hidden = rasterize([entity], RenderConfig(width=40, height=30, world_scale=1.0, show_debug_vectors=False))
+        self.assertEqual(tuple(hidden[15, 20]), (200, 10, 10))
+        self.assertEqual(tuple(hidden[19, 28]), (14, 20, 34))
+
+    @unittest.skipUnless(HAS_NUMPY, "numpy not installed")
+    def test_rasterize_clips_huge_circles_and_vectors_to_the_viewport(self) -> None:
+        config = RenderConfig(width=40, height=30, world_scale=1.0)
+        entities = [
+            RenderEntity(id="a", kind="body", position=(0.0, 0.0), radius=8000.0, color=(200, 10, 10)),
+            RenderEntity(id="b", kind="body", position=(-8010.0, 0.0), radius=8000.0, color=(10, 200, 10)),
+            RenderEntity(
+                id="c", kind="drone", position=(-30.0, -5.0), radius=1.0, color=(10, 10, 200), vector=(1e12, 0.0)
+            ),
+        ]
+        buffer = rasterize(entities, config)
+
+        self.assertEqual(tuple(buffer[15, 0]), (10, 200, 10))
+        self.assertEqual(tuple(buffer[15, 10]), (10, 200, 10))
+        self.assertEqual(tuple(buffer[15, 11]), (200, 10, 10))
+        self.assertEqual(tuple(buffer[29, 39]), (200, 10, 10))
+        self.assertTrue(all(tuple(pixel) == (230, 230, 230) for pixel in buffer[10]))
+
+    @unittest.skipUnless(HAS_NUMPY, "numpy not installed")
+    def test_numpy_backend_rasterizes_headless(self) -> None:
+        adapter = SceneAdapter()
+        physics_state = PhysicsState(
+            bodies=[CelestialBody(name="A", mass=25.0, position=(1.0, 2.0), velocity=(0.5, 0.0))],
+            colony=ColonyNode(name="C", mass=3.0, position=(0.0, 0.0)),
+        )
+        frame = adapter.build_frame(physics_state, EconomyState(), [])
+        engine = RenderEngine(RenderConfig(width=64, height=48, world_scale=4.0, backend="numpy"))
+        stats = engine.draw(frame)
+
+        self.assertEqual(stats["entities_drawn"], 2)
+        self.assertEqual(engine.buffer.shape, (48, 64, 3))
+        self.assertEqual(tuple(engine.buffer[24 + 8 + 5, 32 + 4]), (96, 148, 255))
+        self.assertTrue((engine.rasterize(frame) == engine.buffer).all())
+
 
 if __name__ == "__main__":
     unittest.main()